@@ -0,0 +1,34 @@
+"""task image hash
+
+Revision ID: 5c1e2b7d9a40
+Revises: 246f80949d10
+Create Date: 2026-10-19 12:40:11.482913
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '5c1e2b7d9a40'
+down_revision: Union[str, None] = '246f80949d10'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column('tasks', sa.Column('image_hash', sa.BigInteger(), nullable=True))
+    op.create_index(
+        op.f('tasks_user_id_created_at_image_hash_idx'),
+        'tasks',
+        ['user_id', sa.text('created_at DESC')],
+        unique=False,
+        postgresql_where=sa.text('image_hash IS NOT NULL'),
+    )
+
+
+def downgrade() -> None:
+    op.drop_index(op.f('tasks_user_id_created_at_image_hash_idx'), table_name='tasks')
+    op.drop_column('tasks', 'image_hash')
@@ -0,0 +1,59 @@
+"""task indexes: foreign keys and user history instead of duplicate primary key indexes
+
+Revision ID: 8d3f5a61c2e7
+Revises: 5c1e2b7d9a40
+Create Date: 2026-10-19 15:02:37.118204
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '8d3f5a61c2e7'
+down_revision: Union[str, None] = '5c1e2b7d9a40'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# Every primary key already has its unique *_pkey index
+DUPLICATE_PK_INDEXES = {
+    'users_id_idx': 'users',
+    'tasks_id_idx': 'tasks',
+    'task_products_id_idx': 'task_products',
+    'task_sports_id_idx': 'task_sports',
+    'task_ingredients_id_idx': 'task_ingredients',
+}
+# tasks.user_id is the leading column of tasks_user_id_created_at_idx, which serves the foreign key too
+FOREIGN_KEY_INDEXES = {
+    'task_products_task_id_idx': ('task_products', 'task_id'),
+    'task_sports_task_id_idx': ('task_sports', 'task_id'),
+    'task_ingredients_product_id_idx': ('task_ingredients', 'product_id'),
+}
+
+
+def upgrade() -> None:
+    # CONCURRENTLY can not run inside a transaction; if_not_exists lets a failed run be repeated
+    with op.get_context().autocommit_block():
+        op.create_index(
+            'tasks_user_id_created_at_idx',
+            'tasks',
+            ['user_id', sa.text('created_at DESC')],
+            unique=False,
+            postgresql_concurrently=True,
+            if_not_exists=True,
+        )
+        for name, (table, column) in FOREIGN_KEY_INDEXES.items():
+            op.create_index(name, table, [column], unique=False, postgresql_concurrently=True, if_not_exists=True)
+        for name, table in DUPLICATE_PK_INDEXES.items():
+            op.drop_index(name, table_name=table, postgresql_concurrently=True, if_exists=True)
+
+
+def downgrade() -> None:
+    with op.get_context().autocommit_block():
+        for name, table in DUPLICATE_PK_INDEXES.items():
+            op.create_index(name, table, ['id'], unique=False, postgresql_concurrently=True, if_not_exists=True)
+        for name, (table, _) in FOREIGN_KEY_INDEXES.items():
+            op.drop_index(name, table_name=table, postgresql_concurrently=True, if_exists=True)
+        op.drop_index('tasks_user_id_created_at_idx', table_name='tasks', postgresql_concurrently=True, if_exists=True)
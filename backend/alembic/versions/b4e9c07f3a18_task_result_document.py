@@ -0,0 +1,65 @@
+"""task result document
+
+Revision ID: b4e9c07f3a18
+Revises: 8d3f5a61c2e7
+Create Date: 2026-10-19 16:21:54.306117
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'b4e9c07f3a18'
+down_revision: Union[str, None] = '8d3f5a61c2e7'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+BACKFILL_BATCH = 5000
+
+# Same shape as the TaskProduct and TaskSport dumps the repository writes. Only finished tasks: a task still
+# running writes its own result, and empty arrays set now would hide the rows it adds to the tables meanwhile
+BACKFILL = sa.text("""
+UPDATE tasks SET result = jsonb_build_object(
+    'products', COALESCE((
+        SELECT jsonb_agg(jsonb_build_object(
+            'name', p.name, 'weight', p.weight, 'calories', p.calories, 'proteins', p.proteins,
+            'fats', p.fats, 'carbohydrates', p.carbohydrates, 'fiber', p.fiber, 'commentary', p.commentary,
+            'ingredients', COALESCE((
+                SELECT jsonb_agg(jsonb_build_object(
+                    'name', i.name, 'weight', i.weight, 'calories', i.calories, 'proteins', i.proteins,
+                    'fats', i.fats, 'carbohydrates', i.carbohydrates, 'fiber', i.fiber
+                ) ORDER BY i.created_at, i.id)
+                FROM task_ingredients i WHERE i.product_id = p.id
+            ), '[]'::jsonb)
+        ) ORDER BY p.created_at, p.id)
+        FROM task_products p WHERE p.task_id = tasks.id
+    ), '[]'::jsonb),
+    'sports', COALESCE((
+        SELECT jsonb_agg(jsonb_build_object(
+            'name', s.name, 'calories', s.calories, 'length', s.length
+        ) ORDER BY s.created_at, s.id)
+        FROM task_sports s WHERE s.task_id = tasks.id
+    ), '[]'::jsonb)
+)
+WHERE id IN (
+    SELECT id FROM tasks WHERE result IS NULL AND status = 'finished' LIMIT :batch FOR UPDATE SKIP LOCKED
+)
+""")
+
+
+def upgrade() -> None:
+    op.add_column('tasks', sa.Column('result', postgresql.JSONB(astext_type=sa.Text()), nullable=True))
+    # Short transactions, so task writes are never blocked for long; the repository reads the tables
+    # for any row this has not reached yet
+    with op.get_context().autocommit_block():
+        connection = op.get_bind()
+        while connection.execute(BACKFILL, {'batch': BACKFILL_BATCH}).rowcount:
+            pass
+
+
+def downgrade() -> None:
+    op.drop_column('tasks', 'result')
@@ -0,0 +1,81 @@
+"""task kind and history index
+
+Revision ID: d81a6f2c4e57
+Revises: b4e9c07f3a18
+Create Date: 2026-10-19 17:45:09.613420
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'd81a6f2c4e57'
+down_revision: Union[str, None] = 'b4e9c07f3a18'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+BACKFILL_BATCH = 5000
+
+# Older tasks get their kind from their result; queued or failed ones without a result stay unknown.
+# The old mapper stored every meal dish as a sport too, so products decide first.
+HAS_PRODUCTS = """EXISTS (SELECT 1 FROM task_products p WHERE p.task_id = t.id)
+    OR jsonb_array_length(COALESCE(t.result->'products', '[]'::jsonb)) > 0"""
+HAS_SPORTS = """EXISTS (SELECT 1 FROM task_sports s WHERE s.task_id = t.id)
+    OR jsonb_array_length(COALESCE(t.result->'sports', '[]'::jsonb)) > 0"""
+HAS_RESULT = {
+    'meal': HAS_PRODUCTS,
+    'sport': f"({HAS_SPORTS}) AND NOT ({HAS_PRODUCTS})",
+}
+
+
+def upgrade() -> None:
+    op.add_column('tasks', sa.Column('kind', sa.String(), nullable=True))
+    with op.get_context().autocommit_block():
+        connection = op.get_bind()
+        for kind, has_result in HAS_RESULT.items():
+            backfill = sa.text(f"""
+                UPDATE tasks SET kind = :kind WHERE id IN (
+                    SELECT t.id FROM tasks t WHERE t.kind IS NULL AND ({has_result}) LIMIT :batch
+                )
+            """)
+            while connection.execute(backfill, {'kind': kind, 'batch': BACKFILL_BATCH}).rowcount:
+                pass
+
+        # Keyset pages of the history, with and without the kind filter; the first also serves the user_id key
+        op.create_index(
+            'tasks_user_id_created_at_id_idx',
+            'tasks',
+            ['user_id', sa.text('created_at DESC'), sa.text('id DESC')],
+            unique=False,
+            postgresql_concurrently=True,
+            if_not_exists=True,
+        )
+        op.create_index(
+            'tasks_user_id_kind_created_at_id_idx',
+            'tasks',
+            ['user_id', 'kind', sa.text('created_at DESC'), sa.text('id DESC')],
+            unique=False,
+            postgresql_concurrently=True,
+            if_not_exists=True,
+        )
+        op.drop_index('tasks_user_id_created_at_idx', table_name='tasks', postgresql_concurrently=True, if_exists=True)
+
+
+def downgrade() -> None:
+    with op.get_context().autocommit_block():
+        op.create_index(
+            'tasks_user_id_created_at_idx',
+            'tasks',
+            ['user_id', sa.text('created_at DESC')],
+            unique=False,
+            postgresql_concurrently=True,
+            if_not_exists=True,
+        )
+        op.drop_index(
+            'tasks_user_id_kind_created_at_id_idx', table_name='tasks', postgresql_concurrently=True, if_exists=True
+        )
+        op.drop_index('tasks_user_id_created_at_id_idx', table_name='tasks', postgresql_concurrently=True, if_exists=True)
+    op.drop_column('tasks', 'kind')
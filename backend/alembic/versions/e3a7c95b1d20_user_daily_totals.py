@@ -0,0 +1,106 @@
+"""user daily totals and task parent
+
+Revision ID: e3a7c95b1d20
+Revises: d81a6f2c4e57
+Create Date: 2026-10-19 18:32:40.118275
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'e3a7c95b1d20'
+down_revision: Union[str, None] = 'd81a6f2c4e57'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# Sums of the finished tasks so far, by the rule of RunTaskUseCase._add_daily_totals: an edit chain counts once,
+# as its newest finished task, on the date of its root's created_at (a timestamp without time zone, so `::date`
+# takes the stored date as `.date()` does, no zone conversion). The result document is read when a task has one
+# and the tables otherwise. The old mapper stored every meal dish as a sport too: sports only count for tasks
+# without products. Edits made before parent_id existed were not linked to the task they edit, nothing in their
+# rows tells them from new meals, so each of them is a chain of its own.
+BACKFILL = sa.text("""
+WITH RECURSIVE chains AS (
+    SELECT id, id AS root_id, created_at AS root_created_at FROM tasks WHERE parent_id IS NULL
+    UNION ALL
+    SELECT t.id, c.root_id, c.root_created_at FROM tasks t JOIN chains c ON t.parent_id = c.id
+), counted AS (
+    SELECT DISTINCT ON (c.root_id) t.id, t.user_id, t.result, c.root_created_at::date AS day
+    FROM chains c JOIN tasks t ON t.id = c.id
+    WHERE t.status = 'finished'
+    ORDER BY c.root_id, t.created_at DESC, t.id DESC
+)
+INSERT INTO user_daily_totals (user_id, day, calories, proteins, fats, carbohydrates, fiber, sport_calories)
+SELECT t.user_id, t.day,
+    SUM(p.calories), SUM(p.proteins), SUM(p.fats), SUM(p.carbohydrates), SUM(p.fiber), SUM(s.calories)
+FROM counted t
+CROSS JOIN LATERAL (
+    SELECT COUNT(*) AS count, COALESCE(SUM(calories), 0) AS calories, COALESCE(SUM(proteins), 0) AS proteins,
+        COALESCE(SUM(fats), 0) AS fats, COALESCE(SUM(carbohydrates), 0) AS carbohydrates,
+        COALESCE(SUM(fiber), 0) AS fiber
+    FROM (
+        SELECT (e->>'calories')::float AS calories, (e->>'proteins')::float AS proteins, (e->>'fats')::float AS fats,
+            (e->>'carbohydrates')::float AS carbohydrates, (e->>'fiber')::float AS fiber
+        FROM jsonb_array_elements(t.result->'products') e
+        UNION ALL
+        SELECT tp.calories, tp.proteins, tp.fats, tp.carbohydrates, tp.fiber
+        FROM task_products tp WHERE tp.task_id = t.id AND NOT COALESCE(t.result ? 'products', false)
+    ) products
+) p
+CROSS JOIN LATERAL (
+    SELECT COALESCE(SUM(calories), 0) AS calories
+    FROM (
+        SELECT (e->>'calories')::float AS calories FROM jsonb_array_elements(t.result->'sports') e
+        UNION ALL
+        SELECT ts.calories FROM task_sports ts WHERE ts.task_id = t.id AND NOT COALESCE(t.result ? 'sports', false)
+    ) sports
+    WHERE p.count = 0
+) s
+GROUP BY t.user_id, t.day
+ON CONFLICT (user_id, day) DO NOTHING
+""")
+
+
+def upgrade() -> None:
+    op.add_column('tasks', sa.Column('parent_id', sa.Uuid(), nullable=True))
+    op.create_foreign_key(
+        op.f('tasks_parent_id_fkey'), 'tasks', 'tasks', ['parent_id'], ['id'], ondelete='SET NULL'
+    )
+    op.create_table('user_daily_totals',
+    sa.Column('user_id', sa.Uuid(), nullable=False),
+    sa.Column('day', sa.Date(), nullable=False),
+    sa.Column('calories', sa.Float(), server_default=sa.text('0'), nullable=False),
+    sa.Column('proteins', sa.Float(), server_default=sa.text('0'), nullable=False),
+    sa.Column('fats', sa.Float(), server_default=sa.text('0'), nullable=False),
+    sa.Column('carbohydrates', sa.Float(), server_default=sa.text('0'), nullable=False),
+    sa.Column('fiber', sa.Float(), server_default=sa.text('0'), nullable=False),
+    sa.Column('sport_calories', sa.Float(), server_default=sa.text('0'), nullable=False),
+    sa.Column('id', sa.Uuid(), server_default=sa.text('gen_random_uuid()'), nullable=False),
+    sa.Column('created_at', sa.DateTime(), server_default=sa.text('now()'), nullable=False),
+    sa.Column('updated_at', sa.DateTime(), nullable=True),
+    sa.ForeignKeyConstraint(['user_id'], ['users.id'], name=op.f('user_daily_totals_user_id_fkey'), ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('id', name=op.f('user_daily_totals_pkey')),
+    sa.UniqueConstraint('user_id', 'day', name=op.f('user_daily_totals_user_id_key'))
+    )
+    op.execute(BACKFILL)
+    with op.get_context().autocommit_block():
+        op.create_index(
+            op.f('tasks_parent_id_idx'),
+            'tasks',
+            ['parent_id'],
+            unique=False,
+            postgresql_concurrently=True,
+            if_not_exists=True,
+        )
+
+
+def downgrade() -> None:
+    with op.get_context().autocommit_block():
+        op.drop_index(op.f('tasks_parent_id_idx'), table_name='tasks', postgresql_concurrently=True, if_exists=True)
+    op.drop_table('user_daily_totals')
+    op.drop_constraint(op.f('tasks_parent_id_fkey'), 'tasks', type_='foreignkey')
+    op.drop_column('tasks', 'parent_id')
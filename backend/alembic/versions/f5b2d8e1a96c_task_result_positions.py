@@ -0,0 +1,39 @@
+"""task result positions
+
+Revision ID: f5b2d8e1a96c
+Revises: e3a7c95b1d20
+Create Date: 2026-10-19 21:05:37.624019
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'f5b2d8e1a96c'
+down_revision: Union[str, None] = 'e3a7c95b1d20'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# Rows written so far were read back by (created_at, id): their positions keep that order
+BACKFILL = """
+UPDATE {table} SET position = ordered.position
+FROM (
+    SELECT id, row_number() OVER (PARTITION BY {parent} ORDER BY created_at, id) - 1 AS position FROM {table}
+) AS ordered
+WHERE {table}.id = ordered.id
+"""
+TABLES = {"task_products": "task_id", "task_ingredients": "product_id", "task_sports": "task_id"}
+
+
+def upgrade() -> None:
+    for table, parent in TABLES.items():
+        op.add_column(table, sa.Column('position', sa.Integer(), server_default='0', nullable=False))
+        op.execute(BACKFILL.format(table=table, parent=parent))
+
+
+def downgrade() -> None:
+    for table in TABLES:
+        op.drop_column(table, 'position')
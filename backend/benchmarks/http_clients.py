@@ -0,0 +1,126 @@
+"""Latency of the aiohttp (HTTP/1.1) and httpx (HTTP/2) backends under concurrency
+
+Both talk to local stand-ins that answer after an artificial delay, like a slow model response:
+an aiohttp server for HTTP/1.1 and a minimal h2c server (prior knowledge, no TLS) for HTTP/2.
+
+    cd backend && python -m benchmarks.http_clients --requests 2000 --concurrency 200 --delay 0.05
+"""
+
+import argparse
+import asyncio
+import json
+import statistics
+import time
+
+import h2.config
+import h2.connection
+import h2.events
+from aiohttp import web
+
+from src.core.config import HttpUpstreamSettings
+from src.core.http.client import AsyncHttpClient, IHttpClient
+from src.core.http.httpx_client import Http2Client
+
+BODY = json.dumps({"choices": [{"message": {"content": "{}"}}]}).encode()
+
+
+class H2Protocol(asyncio.Protocol):
+    def __init__(self, delay: float, sockets: list) -> None:
+        self.delay = delay
+        self.connection = h2.connection.H2Connection(h2.config.H2Configuration(client_side=False))
+        sockets.append(self)
+
+    def connection_made(self, transport: asyncio.Transport) -> None:
+        self.transport = transport
+        self.connection.initiate_connection()
+        self.transport.write(self.connection.data_to_send())
+
+    def data_received(self, data: bytes) -> None:
+        for event in self.connection.receive_data(data):
+            if isinstance(event, h2.events.StreamEnded):
+                asyncio.get_running_loop().call_later(self.delay, self.respond, event.stream_id)
+            elif isinstance(event, h2.events.DataReceived):
+                self.connection.acknowledge_received_data(event.flow_controlled_length, event.stream_id)
+        self.transport.write(self.connection.data_to_send())
+
+    def respond(self, stream_id: int) -> None:
+        if self.transport.is_closing():
+            return
+        headers = [(":status", "200"), ("content-type", "application/json"), ("content-length", str(len(BODY)))]
+        self.connection.send_headers(stream_id, headers)
+        self.connection.send_data(stream_id, BODY, end_stream=True)
+        self.transport.write(self.connection.data_to_send())
+
+
+async def start_http1_server(delay: float, sockets: set) -> web.AppRunner:
+    async def handler(request: web.Request) -> web.Response:
+        sockets.add(request.transport.get_extra_info("peername"))
+        await request.read()
+        await asyncio.sleep(delay)
+        return web.Response(body=BODY, content_type="application/json")
+
+    app = web.Application()
+    app.router.add_post("/", handler)
+    runner = web.AppRunner(app)
+    await runner.setup()
+    await web.TCPSite(runner, "127.0.0.1", 0).start()
+    return runner
+
+
+async def run(client: type[IHttpClient], url: str, requests: int, concurrency: int) -> list[float]:
+    semaphore = asyncio.Semaphore(concurrency)
+    latencies = []
+
+    async def one() -> None:
+        async with semaphore:
+            started = time.perf_counter()
+            response = await client.post(url, json={"model": "gpt-4.1-mini", "messages": []})
+            await response.read()
+            latencies.append(time.perf_counter() - started)
+
+    await asyncio.gather(*(one() for _ in range(requests)))
+    return latencies
+
+
+def report(name: str, latencies: list[float], sockets: int, elapsed: float) -> None:
+    quantiles = statistics.quantiles(latencies, n=100)
+    print(
+        f"{name:<16} p50={quantiles[49] * 1000:7.1f}ms p99={quantiles[98] * 1000:7.1f}ms"
+        f" rps={len(latencies) / elapsed:8.1f} sockets={sockets}"
+    )
+
+
+async def main(requests: int, concurrency: int, delay: float) -> None:
+    upstream = {"default": HttpUpstreamSettings(limit=concurrency, limit_per_host=concurrency)}
+
+    http1_sockets: set = set()
+    runner = await start_http1_server(delay, http1_sockets)
+    port = runner.addresses[0][1]
+    AsyncHttpClient.upstreams = upstream
+    await AsyncHttpClient.open_clients()
+    started = time.perf_counter()
+    latencies = await run(AsyncHttpClient, f"http://127.0.0.1:{port}/", requests, concurrency)
+    report("aiohttp http/1.1", latencies, len(http1_sockets), time.perf_counter() - started)
+    await AsyncHttpClient.close_clients()
+    await runner.cleanup()
+
+    http2_sockets: list = []
+    server = await asyncio.get_running_loop().create_server(lambda: H2Protocol(delay, http2_sockets), "127.0.0.1", 0)
+    port = server.sockets[0].getsockname()[1]
+    Http2Client.upstreams = upstream
+    Http2Client.http1 = False  # h2c with prior knowledge, over TLS ALPN negotiates the same
+    await Http2Client.open_clients()
+    started = time.perf_counter()
+    latencies = await run(Http2Client, f"http://127.0.0.1:{port}/", requests, concurrency)
+    report("httpx http/2", latencies, len(http2_sockets), time.perf_counter() - started)
+    await Http2Client.close_clients()
+    server.close()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--requests", type=int, default=2000)
+    parser.add_argument("--concurrency", type=int, default=200)
+    parser.add_argument("--delay", type=float, default=0.05)
+    args = parser.parse_args()
+    asyncio.run(main(args.requests, args.concurrency, args.delay))
@@ -0,0 +1,63 @@
+"""Encoding of TaskReadDTO responses and decoding of model output: stdlib json against the fast codec
+
+    cd backend && python -m benchmarks.json_codec --products 20 --ingredients 15
+"""
+
+import argparse
+import json
+import timeit
+import uuid
+
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse
+
+from src.core import json_codec
+from src.core.responses import FastJSONResponse
+from src.task.domain.dtos import TaskReadDTO
+from src.task.domain.entities import TaskStatus
+
+
+def make_task(products: int, ingredients: int) -> TaskReadDTO:
+    ingredient = {
+        "name": "Картофель отварной",
+        "weight": 123.4,
+        "calories": 98.7,
+        "proteins": 2.1,
+        "fats": 0.4,
+        "carbohydrates": 20.3,
+        "fiber": 1.8,
+    }
+    product = {**ingredient, "name": "Пюре с котлетой", "ingredients": [ingredient] * ingredients}
+    return TaskReadDTO.model_validate(
+        {"id": uuid.uuid4(), "status": TaskStatus.finished, "products": [product] * products, "sports": []}
+    )
+
+
+def measure(name: str, func, number: int) -> None:
+    seconds = min(timeit.repeat(func, number=number, repeat=5)) / number
+    print(f"{name:<36} {seconds * 1e6:9.1f} us")
+
+
+def main(products: int, ingredients: int, number: int) -> None:
+    task = make_task(products, ingredients)
+    content = jsonable_encoder(task)
+    body = json_codec.dumps(content)
+    print(f"TaskReadDTO with {products} products x {ingredients} ingredients, {len(body)} bytes")
+
+    measure("render, stdlib JSONResponse", lambda: JSONResponse(content), number)
+    measure("render, FastJSONResponse", lambda: FastJSONResponse(content), number)
+    measure("encode + render, stdlib", lambda: JSONResponse(jsonable_encoder(task)), number)
+    measure("encode + render, fast codec", lambda: FastJSONResponse(jsonable_encoder(task)), number)
+
+    text = body.decode()
+    measure("decode model output, stdlib", lambda: json.loads(text), number)
+    measure("decode model output, fast codec", lambda: json_codec.loads(text), number)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--products", type=int, default=20)
+    parser.add_argument("--ingredients", type=int, default=15)
+    parser.add_argument("--number", type=int, default=200)
+    args = parser.parse_args()
+    main(args.products, args.ingredients, args.number)
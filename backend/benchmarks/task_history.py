@@ -0,0 +1,84 @@
+"""Latency of one history page against its depth: keyset cursor against OFFSET
+
+Runs against DATABASE_URI (migrated), inside one transaction that is rolled back at the end.
+
+    cd backend && DATABASE_URI=postgresql+asyncpg://... python -m benchmarks.task_history --history 20000
+"""
+
+import argparse
+import asyncio
+import statistics
+import time
+import uuid
+import datetime as dt
+
+from sqlalchemy import insert, select, text
+from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
+
+from src.core.config import settings
+from src.task.domain.entities import TaskCursor
+from src.task.infrastructure.db.orm import TaskDB
+from src.task.infrastructure.db.task_repository import PGTaskRepository
+from src.user.infrastructure.models import UserDB
+
+
+async def make_user(session: AsyncSession, history: int) -> uuid.UUID:
+    user = UserDB(apphud_id=str(uuid.uuid4()), gender="f")
+    session.add(user)
+    await session.flush()
+    start = dt.datetime.now() - dt.timedelta(minutes=history)
+    rows = [
+        {
+            "user_id": user.id,
+            "app_bundle": "bench",
+            "status": "finished",
+            "kind": "meal",
+            "created_at": start + dt.timedelta(minutes=i),
+        }
+        for i in range(history)
+    ]
+    await session.execute(insert(TaskDB), rows)
+    await session.execute(text("ANALYZE tasks"))
+    return user.id
+
+
+async def median_latency(call, number: int) -> float:
+    latencies = []
+    for _ in range(number):
+        started = time.perf_counter()
+        await call()
+        latencies.append(time.perf_counter() - started)
+    return statistics.median(latencies)
+
+
+async def main(history: int, limit: int, number: int) -> None:
+    engine = create_async_engine(settings.DATABASE_URI)
+    async with engine.connect() as connection:
+        async with AsyncSession(bind=connection, expire_on_commit=False) as session:
+            user_id = await make_user(session, history)
+            repository = PGTaskRepository(session)
+            positions = (
+                select(TaskDB.created_at, TaskDB.id)
+                .filter_by(user_id=user_id)
+                .order_by(TaskDB.created_at.desc(), TaskDB.id.desc())
+            )
+            for depth in (0, history // 100, history // 10, history // 2, history - limit):
+                row = (await session.execute(positions.offset(depth - 1).limit(1))).one() if depth else None
+                before = TaskCursor(created_at=row.created_at, id=row.id) if row else None
+                keyset = await median_latency(
+                    lambda before=before: repository.get_by_user_id(user_id, before, limit), number
+                )
+                offset_query = positions.offset(depth).limit(limit)
+                offset = await median_latency(lambda query=offset_query: session.execute(query), number)
+                print(f"depth {depth:>7}   keyset page p50={keyset * 1000:6.2f}ms   OFFSET ids p50={offset * 1000:7.2f}ms")
+        await connection.rollback()
+    await engine.dispose()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--history", type=int, default=20000)
+    parser.add_argument("--limit", type=int, default=20)
+    parser.add_argument("--number", type=int, default=20)
+    args = parser.parse_args()
+    asyncio.run(main(args.history, args.limit, args.number))
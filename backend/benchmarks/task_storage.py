@@ -0,0 +1,79 @@
+"""Write and read latency of task results per storage mode: normalized tables, both, JSONB document
+
+Runs against DATABASE_URI (migrated), inside one transaction that is rolled back at the end.
+
+    cd backend && DATABASE_URI=postgresql+asyncpg://... python -m benchmarks.task_storage --tasks 200
+"""
+
+import argparse
+import asyncio
+import statistics
+import time
+import uuid
+
+from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
+
+from src.core.config import settings
+from src.task.domain.entities import TaskCreate, TaskProduct, TaskProductIngredient, TaskStatus, TaskUpdate
+from src.task.infrastructure.db.task_repository import PGTaskRepository
+from src.user.infrastructure.models import UserDB
+
+
+def make_update(products: int, ingredients: int) -> TaskUpdate:
+    ingredient = TaskProductIngredient(name="Картофель", weight=120, calories=98, proteins=2.1, fats=0.4)
+    product = TaskProduct(
+        name="Пюре с котлетой", weight=350, calories=520, commentary="Порция среднего размера",
+        ingredients=[ingredient] * ingredients,
+    )
+    return TaskUpdate(status=TaskStatus.finished, products=[product] * products, sports=[])
+
+
+def report(name: str, latencies: list[float]) -> None:
+    quantiles = statistics.quantiles(latencies, n=100)
+    print(f"{name:<20} p50={quantiles[49] * 1000:7.2f}ms p95={quantiles[94] * 1000:7.2f}ms")
+
+
+async def measure(session: AsyncSession, storage: str, user_id: uuid.UUID, data: TaskUpdate, tasks: int) -> None:
+    repository = PGTaskRepository(session, storage)
+    task_ids = [(await repository.create(TaskCreate(user_id=user_id, app_bundle="bench"))).id for _ in range(tasks)]
+
+    writes = []
+    for task_id in task_ids:
+        started = time.perf_counter()
+        await repository.update_by_pk(task_id, data)
+        writes.append(time.perf_counter() - started)
+    session.expunge_all()
+
+    reads = []
+    for task_id in task_ids:
+        started = time.perf_counter()
+        await repository.get_by_pk(task_id)
+        reads.append(time.perf_counter() - started)
+        session.expunge_all()
+
+    report(f"{storage} write", writes)
+    report(f"{storage} read", reads)
+
+
+async def main(tasks: int, products: int, ingredients: int) -> None:
+    engine = create_async_engine(settings.DATABASE_URI)
+    data = make_update(products, ingredients)
+    print(f"{tasks} tasks, {products} products x {ingredients} ingredients")
+    async with engine.connect() as connection:
+        async with AsyncSession(bind=connection, expire_on_commit=False) as session:
+            user = UserDB(apphud_id=str(uuid.uuid4()))
+            session.add(user)
+            await session.flush()
+            for storage in ("normalized", "dual", "document"):
+                await measure(session, storage, user.id, data, tasks)
+        await connection.rollback()
+    await engine.dispose()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--tasks", type=int, default=200)
+    parser.add_argument("--products", type=int, default=5)
+    parser.add_argument("--ingredients", type=int, default=6)
+    args = parser.parse_args()
+    asyncio.run(main(args.tasks, args.products, args.ingredients))
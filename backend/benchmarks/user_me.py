@@ -0,0 +1,84 @@
+"""Latency of the /me user read against the size of the user's task history
+
+Compares the old read, which selectin-loaded every task with its products and sports, with the row-only read.
+Runs against DATABASE_URI (migrated), inside one transaction that is rolled back at the end.
+
+    cd backend && DATABASE_URI=postgresql+asyncpg://... python -m benchmarks.user_me --history 0 100 1000 5000
+"""
+
+import argparse
+import asyncio
+import statistics
+import time
+import uuid
+
+from sqlalchemy import insert, select
+from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
+from sqlalchemy.orm import selectinload
+
+from src.core.config import settings
+from src.task.infrastructure.db.orm import TaskDB, TaskProductDB
+from src.user.infrastructure.models import UserDB
+from src.user.infrastructure.repository import UserRepository
+
+
+async def make_user(session: AsyncSession, history: int) -> uuid.UUID:
+    user = UserDB(apphud_id=str(uuid.uuid4()), gender="m")
+    session.add(user)
+    await session.flush()
+    task_ids = [uuid.uuid4() for _ in range(history)]
+    if task_ids:
+        await session.execute(
+            insert(TaskDB),
+            [{"id": task_id, "user_id": user.id, "app_bundle": "bench", "status": "finished"} for task_id in task_ids],
+        )
+        await session.execute(
+            insert(TaskProductDB), [{"task_id": task_id, "name": "Пюре", "weight": 300} for task_id in task_ids * 3]
+        )
+    session.expunge_all()
+    return user.id
+
+
+async def eager_read(session: AsyncSession, user_id: uuid.UUID) -> None:
+    """The read before: every task with its products, ingredients and sports"""
+    query = (
+        select(UserDB)
+        .where(UserDB.id == user_id)
+        .options(
+            selectinload(UserDB.tasks).options(
+                selectinload(TaskDB.products).selectinload(TaskProductDB.ingredients), selectinload(TaskDB.sports)
+            )
+        )
+    )
+    (await session.execute(query)).scalar_one()
+
+
+async def measure(session: AsyncSession, read, user_id: uuid.UUID, number: int) -> float:
+    latencies = []
+    for _ in range(number):
+        started = time.perf_counter()
+        await read(session, user_id)
+        latencies.append(time.perf_counter() - started)
+        session.expunge_all()
+    return statistics.median(latencies)
+
+
+async def main(histories: list[int], number: int) -> None:
+    engine = create_async_engine(settings.DATABASE_URI)
+    async with engine.connect() as connection:
+        async with AsyncSession(bind=connection, expire_on_commit=False) as session:
+            for history in histories:
+                user_id = await make_user(session, history)
+                eager = await measure(session, eager_read, user_id, number)
+                row_only = await measure(session, lambda s, pk: UserRepository(s).get_by_pk(pk), user_id, number)
+                print(f"{history:>6} tasks   eager p50={eager * 1000:8.2f}ms   row only p50={row_only * 1000:6.2f}ms")
+        await connection.rollback()
+    await engine.dispose()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--history", type=int, nargs="+", default=[0, 100, 1000, 5000])
+    parser.add_argument("--number", type=int, default=20)
+    args = parser.parse_args()
+    asyncio.run(main(args.history, args.number))
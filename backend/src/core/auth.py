@@ -1,3 +1,4 @@
+import hmac
 from uuid import UUID
 from typing import Annotated
 from datetime import datetime, timedelta
@@ -10,6 +11,7 @@ from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
 from src.core.config import settings
 
 security = HTTPBearer()
+optional_security = HTTPBearer(auto_error=False)
 
 
 class TokenData(BaseModel):
@@ -70,7 +72,7 @@ async def get_current_user_id(credentials: Annotated[HTTPAuthorizationCredential
 
 
 async def get_current_user_id_optional(
-    credentials: Annotated[HTTPAuthorizationCredentials | None, Depends(security)],
+    credentials: Annotated[HTTPAuthorizationCredentials | None, Depends(optional_security)],
 ) -> UUID | None:
     if credentials is None:
         return None
@@ -79,3 +81,13 @@ async def get_current_user_id_optional(
         return token_data.user_id
     except HTTPException:
         return None
+
+
+async def verify_api_token(credentials: Annotated[HTTPAuthorizationCredentials, Depends(security)]) -> None:
+    """Service endpoints like /metrics take the static API_TOKEN instead of a user's token"""
+    if not hmac.compare_digest(credentials.credentials.encode(), settings.API_TOKEN.encode()):
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Could not validate credentials",
+            headers={"WWW-Authenticate": "Bearer"},
+        )
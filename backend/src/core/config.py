@@ -1,10 +1,38 @@
 import os
 from typing import Literal
 
-from pydantic import AnyUrl, PostgresDsn, ValidationInfo, field_validator, model_validator
+from pydantic import AnyUrl, BaseModel, PostgresDsn, ValidationInfo, field_validator, model_validator
 from pydantic_settings import BaseSettings
 
 
+class HttpUpstreamSettings(BaseModel):
+    """Connection pool and timeouts of one upstream host, seconds unless stated otherwise"""
+
+    limit: int = 100
+    limit_per_host: int = 100
+    keepalive_timeout: float = 30.0
+    dns_ttl: int = 300
+    family: int = 0
+    connect_timeout: float = 10.0
+    read_timeout: float = 30.0
+    total_timeout: float | None = None
+    proxy: str | None = None
+
+    @field_validator("proxy", mode="before")
+    def blank_proxy_is_none(cls, v: str | None) -> str | None:
+        return v or None
+
+
+class TokenLimitSettings(BaseModel):
+    """Estimated token limit of the variable part of a runner prompt: user text plus previous result
+
+    Over the limit the input is truncated, summarized (previous result compacted, then text truncated) or rejected.
+    """
+
+    max_tokens: int
+    action: Literal["truncate", "summarize", "reject"] = "truncate"
+
+
 class Settings(BaseSettings):
     ENVIRONMENT: Literal['test', 'prod'] = 'prod'
     DOMAIN: str
@@ -14,6 +42,59 @@ class Settings(BaseSettings):
     SECRET_KEY: str = "123"
 
     OPENAI_API_TOKEN: str
+    OPENAI_PROXY_URL: str | None = None
+    OPENAI_MODEL_PRIMARY: str = "gpt-4.1-mini"
+    OPENAI_MODEL_LIGHT: str = "gpt-4.1-nano"
+    OPENAI_MODEL_FALLBACK: str = "gpt-4o-mini"
+    OPENAI_MODEL_LIGHT_MAX_INPUT: dict[str, int] = {"meal_text": 120, "sport_text": 300}
+    OPENAI_MODEL_P95_BUDGET_SECONDS: float = 40.0
+    OPENAI_MODEL_LATENCY_WINDOW_SECONDS: float = 300.0
+    OPENAI_MODEL_CIRCUIT_FAILURES: int = 5
+    OPENAI_MODEL_CIRCUIT_RESET_SECONDS: float = 60.0
+    OPENAI_MODEL_CIRCUIT_HALF_OPEN_PROBES: int = 1
+
+    TASK_RESULT_CACHE_SIZE: int = 10_000
+    TASK_RESULT_STORAGE: Literal["normalized", "dual", "document"] = "normalized"
+    TASK_INPUT_TOKEN_LIMITS: dict[str, TokenLimitSettings] = {
+        "meal_text": TokenLimitSettings(max_tokens=500),
+        "sport_text": TokenLimitSettings(max_tokens=500),
+        "meal_edit": TokenLimitSettings(max_tokens=3000, action="summarize"),
+        "sport_edit": TokenLimitSettings(max_tokens=1500, action="summarize"),
+    }
+    TASK_USER_TOKEN_BUCKET_CAPACITY: int = 20_000
+    TASK_USER_TOKEN_BUCKET_REFILL_PER_SECOND: float = 10.0
+    TASK_INPUT_MEMORY_BUDGET: int = 64 * 1024 * 1024
+    TASK_INPUT_INFLIGHT_LIMIT: int = 1024 * 1024 * 1024
+    TASK_INPUT_WAIT_SECONDS: float = 10.0
+    STORAGE_PATH: str = "storage"
+
+    HTTP_CLIENT_BACKEND: Literal["aiohttp", "httpx"] = "aiohttp"
+    HTTP_UPSTREAMS: dict[str, HttpUpstreamSettings] = {
+        "default": HttpUpstreamSettings(),
+        "api.openai.com": HttpUpstreamSettings(keepalive_timeout=90.0, read_timeout=180.0),
+    }
+    HTTP_WARMUP_URLS: list[str] = ["https://api.openai.com/v1/models"]
+    HTTP_WARMUP_CONNECTIONS: int = 2
+
+    FOOD_DATABASE_PATH: str = "storage/foods.bin"
+    FOOD_MATCH_MIN_SCORE: float = 0.8
+    FOOD_MATCH_MIN_MARGIN: float = 0.1
+    SPORT_MATCH_MIN_SCORE: float = 0.75
+    SPORT_MATCH_MIN_MARGIN: float = 0.1
+    MEAL_EDIT_MATCH_MIN_SCORE: float = 0.6
+    MEAL_EDIT_MATCH_MIN_MARGIN: float = 0.1
+
+    SEMANTIC_CACHE_ENABLED: bool = True
+    SEMANTIC_CACHE_PATH: str = "storage/semantic_cache"
+    SEMANTIC_CACHE_CAPACITY: int = 50_000
+    SEMANTIC_CACHE_THRESHOLD: float = 0.93
+    # "openai" is a paid embeddings call on every text meal, hits and misses alike
+    SEMANTIC_CACHE_EMBEDDER: Literal["openai", "hashing"] = "hashing"
+    SEMANTIC_CACHE_DIMENSIONS: int = 256
+
+    IMAGE_DUPLICATE_MAX_DISTANCE: int = 6
+    IMAGE_DUPLICATE_LOOKBACK: int = 20
+    IMAGE_DUPLICATE_WINDOW_SECONDS: float = 3600.0
 
     PROJECT_NAME: str = os.environ.get("PROJECT_NAME", "UNNAMED PROJECT")
 
@@ -25,6 +106,17 @@ class Settings(BaseSettings):
     DB_PORT: str | None = os.environ.get("DB_PORT")
     DATABASE_URI: str | None = None
     ALEMBIC_DATABASE_URI: str | None = None
+    # One worker of 20 + 20 stays well under the bundled max_connections = 100
+    DATABASE_POOL_SIZE: int = 20
+    DATABASE_POOL_MAX_OVERFLOW: int = 20
+    DATABASE_POOL_TIMEOUT: float = 10.0
+    DATABASE_POOL_RECYCLE: int = 1800
+    DATABASE_POOL_PRE_PING: bool = True
+    DATABASE_PGBOUNCER: bool = False
+    DATABASE_REPLICA_URI: str | None = None
+    DATABASE_REPLICA_MAX_LAG_SECONDS: float = 10.0
+    DATABASE_REPLICA_LAG_CHECK_SECONDS: float = 5.0
+    DATABASE_READ_YOUR_WRITES_SECONDS: float = 5.0
 
     @staticmethod
     def _build_dsn(scheme: str, values: dict) -> str:
@@ -49,6 +141,21 @@ class Settings(BaseSettings):
             raise ValueError("Define not default secret_key env")
         return self
 
+    @field_validator("OPENAI_PROXY_URL", mode="before")
+    def blank_proxy_is_none(cls, v: str | None) -> str | None:
+        """`OPENAI_PROXY_URL=` of example.env means no proxy, httpx and aiohttp fail on an empty proxy URL"""
+        return v or None
+
+    @model_validator(mode="after")
+    def apply_openai_proxy(self):
+        """Only OpenAI goes through the proxy, database and webhooks connect directly"""
+        if self.OPENAI_PROXY_URL is None:
+            return self
+        upstream = self.HTTP_UPSTREAMS.get("api.openai.com") or HttpUpstreamSettings()
+        if upstream.proxy is None:
+            self.HTTP_UPSTREAMS["api.openai.com"] = upstream.model_copy(update={"proxy": self.OPENAI_PROXY_URL})
+        return self
+
     @field_validator("DATABASE_URI")
     def assemble_db_connection(cls, v: str | None, info: ValidationInfo) -> str:
         if isinstance(v, str):
@@ -1,13 +1,12 @@
-import json as json_lib
 from io import BytesIO
 from typing import Type, Literal, TypeVar, Callable, Awaitable
 from urllib.parse import urljoin
 
-import aiohttp
 from loguru import logger
-from pydantic import BaseModel, ValidationError
+from pydantic import BaseModel, TypeAdapter, ValidationError
 
-from src.core.http.client import IHttpClient
+from src.core import json_codec
+from src.core.http.client import IHttpClient, IHttpResponse
 from src.core.http.exceptions import HttpApiRequestException, HttpApiResponseException
 
 T = TypeVar("T", bound=BaseModel)
@@ -48,7 +47,14 @@ class HttpApiClient(AuthMixin):
         except ValidationError as e:
             raise HttpApiResponseException(e) from e
 
-    async def request(
+    def validate_content(self, content: bytes, adapter: TypeAdapter[T]) -> T:
+        """Raw JSON body to a model in one pass, skipping the ApiResponse copy"""
+        try:
+            return adapter.validate_json(content)
+        except ValidationError as e:
+            raise HttpApiResponseException(e) from e
+
+    async def _send(
         self,
         method: Literal["GET", "POST", "PUT", "DELETE", "PATCH"],
         endpoint: str,
@@ -57,7 +63,7 @@ class HttpApiClient(AuthMixin):
         headers: dict | None = None,
         cookies: dict | None = None,
         **kwargs,
-    ) -> ApiResponse:
+    ) -> IHttpResponse:
         headers = headers or {}
         cookies = cookies or {}
         request_params = {
@@ -69,18 +75,37 @@ class HttpApiClient(AuthMixin):
             **kwargs,
         }
 
-        func: Callable[..., Awaitable[aiohttp.ClientResponse]] = getattr(self.client, method.lower())
+        func: Callable[..., Awaitable[IHttpResponse]] = getattr(self.client, method.lower())
         response = await func(**request_params)
         if not response.ok:
-            raise HttpApiRequestException(await response.text())
+            raise HttpApiRequestException(await response.text(), status=response.status)
+        return response
+
+    async def request_content(
+        self, method: Literal["GET", "POST", "PUT", "DELETE", "PATCH"], endpoint: str, **kwargs
+    ) -> bytes:
+        """Body of a successful response as is, for callers validating it with `validate_content`"""
+        content = await (await self._send(method, endpoint, **kwargs)).read()
+        if not content:
+            raise HttpApiResponseException("Empty response")
+        return content
+
+    async def request(
+        self,
+        method: Literal["GET", "POST", "PUT", "DELETE", "PATCH"],
+        endpoint: str,
+        json: dict | None = None,
+        params: dict | None = None,
+        headers: dict | None = None,
+        cookies: dict | None = None,
+        **kwargs,
+    ) -> ApiResponse:
+        response = await self._send(method, endpoint, json, params, headers, cookies, **kwargs)
 
         try:
-            data = await response.json()
-        except aiohttp.ContentTypeError as e:
-            try:
-                data = json_lib.loads(await response.text())
-            except json_lib.JSONDecodeError:
-                raise HttpApiResponseException("Empty response") from e
+            data = json_codec.loads(await response.read())
+        except json_codec.JSONDecodeError as e:
+            raise HttpApiResponseException("Empty response") from e
 
         response_data = ApiResponse(
             data=data,
@@ -116,7 +141,7 @@ class HttpApiClient(AuthMixin):
             params: Query parameters
             headers: Additional headers
             cookies: Additional cookies
-            **kwargs: Additional parameters for aiohttp request
+            **kwargs: Additional parameters for the HTTP client request
 
         Returns:
             ApiResponse with parsed JSON response
@@ -124,46 +149,36 @@ class HttpApiClient(AuthMixin):
         headers = headers or {}
         cookies = cookies or {}
 
-        # Create multipart form data
-        form_data = aiohttp.FormData()
-
-        # Add JSON data as form fields (encode as JSON strings)
-        if data:
-            for key, value in data.items():
-                if isinstance(value, (dict, list)):
-                    # Encode complex objects as JSON strings
-                    form_data.add_field(key, json_lib.dumps(value), content_type="application/json")
-                else:
-                    # Add simple values as strings
-                    form_data.add_field(key, str(value))
-
-        # Add files
-        if files:
-            for field_name, file_obj in files:
-                file_obj.seek(0)
-                form_data.add_field(field_name, file_obj, filename="image.jpg")
+        # Form fields, complex objects are encoded as JSON strings
+        form_data = {
+            key: json_codec.dumps_str(value) if isinstance(value, (dict, list)) else str(value)
+            for key, value in (data or {}).items()
+        }
+
+        form_files = []
+        for field_name, file_obj in files or []:
+            file_obj.seek(0)
+            form_files.append((field_name, "image.jpg", file_obj))
 
         request_params = {
             "url": urljoin(self.source_url, endpoint),
             "headers": {**self.headers, **headers},
             "data": form_data,
+            "files": form_files,
             "params": params,
             "cookies": {**self.cookies, **cookies},
             **kwargs,
         }
 
-        func: Callable[..., Awaitable[aiohttp.ClientResponse]] = getattr(self.client, method.lower())
+        func: Callable[..., Awaitable[IHttpResponse]] = getattr(self.client, method.lower())
         response = await func(**request_params)
         if not response.ok:
-            raise HttpApiRequestException(await response.text())
+            raise HttpApiRequestException(await response.text(), status=response.status)
 
         try:
-            response_data = await response.json()
-        except aiohttp.ContentTypeError as e:
-            try:
-                response_data = json_lib.loads(await response.text())
-            except json_lib.JSONDecodeError:
-                raise HttpApiResponseException("Empty response") from e
+            response_data = json_codec.loads(await response.read())
+        except json_codec.JSONDecodeError as e:
+            raise HttpApiResponseException("Empty response") from e
 
         api_response = ApiResponse(
             data=response_data,
@@ -1,79 +1,177 @@
 import abc
-from socket import AF_INET
+import asyncio
+from typing import Any, Mapping, Protocol
 
 import aiohttp
 from loguru import logger
+from yarl import URL
+
+from src.core import json_codec
+from src.core.config import settings, HttpUpstreamSettings
 
 logger = logger.bind(name="httpclient")
 
 
+class IHttpResponse(Protocol):
+    """The part of a response the API clients rely on, aiohttp.ClientResponse satisfies it as is"""
+
+    status: int
+    ok: bool
+    headers: Mapping[str, str]
+    cookies: Mapping
+
+    async def read(self) -> bytes: ...
+
+    async def text(self) -> str: ...
+
+    async def json(self) -> Any: ...
+
+
 class IHttpClient(abc.ABC):
+    """Request kwargs shared by all backends: json, data, files, content, params, headers, cookies
+
+    Multipart bodies are `data` (form fields) plus `files` as (field, filename, file object) tuples.
+    `content` is a raw body, bytes or an async iterator of bytes streamed as it is produced.
+    """
+
     @classmethod
     @abc.abstractmethod
-    async def get(cls, url: str, **kwargs) -> aiohttp.ClientResponse: ...
+    async def get(cls, url: str, **kwargs) -> IHttpResponse: ...
 
     @classmethod
     @abc.abstractmethod
-    async def post(cls, url: str, **kwargs) -> aiohttp.ClientResponse: ...
+    async def post(cls, url: str, **kwargs) -> IHttpResponse: ...
 
     @classmethod
     @abc.abstractmethod
-    async def put(cls, url: str, **kwargs) -> aiohttp.ClientResponse: ...
+    async def put(cls, url: str, **kwargs) -> IHttpResponse: ...
 
     @classmethod
     @abc.abstractmethod
-    async def delete(cls, url: str, **kwargs) -> aiohttp.ClientResponse: ...
+    async def delete(cls, url: str, **kwargs) -> IHttpResponse: ...
 
     @classmethod
     @abc.abstractmethod
-    async def patch(cls, url: str, **kwargs) -> aiohttp.ClientResponse: ...
+    async def patch(cls, url: str, **kwargs) -> IHttpResponse: ...
+
+    @classmethod
+    @abc.abstractmethod
+    async def open_clients(cls) -> None: ...
+
+    @classmethod
+    @abc.abstractmethod
+    async def close_clients(cls) -> None: ...
+
+    @classmethod
+    @abc.abstractmethod
+    async def warm_up(cls, url: str, connections: int) -> None: ...
 
 
 class AsyncHttpClient(IHttpClient):
-    aiohttp_client: aiohttp.ClientSession | None = None
-    CONNECTION_TIMEOUT: int = 30
-    SIZE_POOL_AIOHTTP: int = 100
+    """One aiohttp session per configured upstream host, everything else shares the "default" one
+
+    Sessions are opened by the application lifespan and closed with it, lazily on first use otherwise.
+    """
+
+    sessions: dict[str, aiohttp.ClientSession] = {}
+    upstreams: dict[str, HttpUpstreamSettings] = settings.HTTP_UPSTREAMS
+
+    @classmethod
+    def _upstream_name(cls, url: str | None) -> str:
+        host = URL(url).host if url else None
+        return host if host in cls.upstreams else "default"
 
     @classmethod
-    def get_aiohttp_client(cls) -> aiohttp.ClientSession:
-        if cls.aiohttp_client is None:
-            timeout = aiohttp.ClientTimeout(total=cls.CONNECTION_TIMEOUT)
-            connector = aiohttp.TCPConnector(
-                family=AF_INET,
-                limit_per_host=cls.SIZE_POOL_AIOHTTP,
-            )
-            cls.aiohttp_client = aiohttp.ClientSession(
-                timeout=timeout,
-                connector=connector,
-            )
+    def _make_session(cls, upstream: HttpUpstreamSettings) -> aiohttp.ClientSession:
+        timeout = aiohttp.ClientTimeout(
+            total=upstream.total_timeout,
+            connect=upstream.connect_timeout,
+            sock_read=upstream.read_timeout,
+        )
+        connector = aiohttp.TCPConnector(
+            family=upstream.family,
+            limit=upstream.limit,
+            limit_per_host=upstream.limit_per_host,
+            keepalive_timeout=upstream.keepalive_timeout,
+            ttl_dns_cache=upstream.dns_ttl,
+        )
+        return aiohttp.ClientSession(
+            timeout=timeout, connector=connector, proxy=upstream.proxy, json_serialize=json_codec.dumps_str
+        )
 
-        return cls.aiohttp_client
+    @classmethod
+    def get_aiohttp_client(cls, url: str | None = None) -> aiohttp.ClientSession:
+        name = cls._upstream_name(url)
+        session = cls.sessions.get(name)
+        if session is None or session.closed:
+            session = cls.sessions[name] = cls._make_session(cls.upstreams.get(name) or HttpUpstreamSettings())
+        return session
+
+    @classmethod
+    async def open_clients(cls) -> None:
+        for name in cls.upstreams:
+            cls.sessions[name] = cls._make_session(cls.upstreams[name])
+
+    @classmethod
+    async def warm_up(cls, url: str, connections: int) -> None:
+        """Pre-open TLS connections, the pool keeps them for the upstream keepalive_timeout"""
+        session = cls.get_aiohttp_client(url)
+
+        async def open_connection() -> None:
+            # Any status will do, only the handshake matters
+            async with session.head(url) as response:
+                await response.read()
+
+        results = await asyncio.gather(*(open_connection() for _ in range(connections)), return_exceptions=True)
+        errors = [result for result in results if isinstance(result, Exception)]
+        if errors:
+            logger.warning(f"Warm-up of {url}: {len(errors)}/{connections} connections failed: {errors[0]!r}")
+        else:
+            logger.info(f"Warmed up {connections} connections to {url}")
 
     @classmethod
     async def close_aiohttp_client(cls) -> None:
-        if cls.aiohttp_client:
-            await cls.aiohttp_client.close()
-            cls.aiohttp_client = None
+        sessions, cls.sessions = cls.sessions, {}
+        for session in sessions.values():
+            await session.close()
+
+    @classmethod
+    async def close_clients(cls) -> None:
+        await cls.close_aiohttp_client()
+
+    @staticmethod
+    def _to_aiohttp_kwargs(kwargs: dict) -> dict:
+        if "content" in kwargs:
+            kwargs["data"] = kwargs.pop("content")
+        files = kwargs.pop("files", None)
+        if not files:
+            return kwargs
+        form_data = aiohttp.FormData()
+        for key, value in (kwargs.pop("data", None) or {}).items():
+            form_data.add_field(key, str(value))
+        for field_name, filename, file in files:
+            form_data.add_field(field_name, file, filename=filename)
+        return kwargs | {"data": form_data}
 
     @classmethod
-    async def get(cls, url: str, **kwargs) -> aiohttp.ClientResponse:
-        client = cls.get_aiohttp_client()
+    async def get(cls, url: str, **kwargs) -> IHttpResponse:
+        client = cls.get_aiohttp_client(url)
 
         logger.debug(f"Started GET {url}")
         response = await client.get(url, **kwargs)
         return response
 
     @classmethod
-    async def post(cls, url: str, **kwargs) -> aiohttp.ClientResponse:
-        client = cls.get_aiohttp_client()
+    async def post(cls, url: str, **kwargs) -> IHttpResponse:
+        client = cls.get_aiohttp_client(url)
 
         logger.debug(f"Started POST: {url}")
-        response = await client.post(url, **kwargs)
+        response = await client.post(url, **cls._to_aiohttp_kwargs(kwargs))
         return response
 
     @classmethod
-    async def put(cls, url: str, **kwargs) -> aiohttp.ClientResponse:
-        client = cls.get_aiohttp_client()
+    async def put(cls, url: str, **kwargs) -> IHttpResponse:
+        client = cls.get_aiohttp_client(url)
 
         logger.debug(f"Started PUT: {url}")
         response = await client.put(url, **kwargs)
@@ -81,16 +179,16 @@ class AsyncHttpClient(IHttpClient):
         return response
 
     @classmethod
-    async def delete(cls, url: str, **kwargs) -> aiohttp.ClientResponse:
-        client = cls.get_aiohttp_client()
+    async def delete(cls, url: str, **kwargs) -> IHttpResponse:
+        client = cls.get_aiohttp_client(url)
 
         logger.debug(f"Started DELETE: {url}")
         response = await client.delete(url, **kwargs)
         return response
 
     @classmethod
-    async def patch(cls, url: str, **kwargs) -> aiohttp.ClientResponse:
-        client = cls.get_aiohttp_client()
+    async def patch(cls, url: str, **kwargs) -> IHttpResponse:
+        client = cls.get_aiohttp_client(url)
 
         logger.debug(f"Started PATCH: {url}")
         response = await client.patch(url, **kwargs)
@@ -1,5 +1,14 @@
+from src.core.config import settings
 from src.core.http.client import IHttpClient, AsyncHttpClient
 
 
+def get_http_client_class() -> type[IHttpClient]:
+    if settings.HTTP_CLIENT_BACKEND == "httpx":
+        from src.core.http.httpx_client import Http2Client
+
+        return Http2Client
+    return AsyncHttpClient
+
+
 def get_http_client() -> IHttpClient:
-    return AsyncHttpClient()
+    return get_http_client_class()()
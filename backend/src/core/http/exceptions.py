@@ -1,5 +1,7 @@
 class HttpApiRequestException(Exception):
-    pass
+    def __init__(self, message: str, status: int | None = None) -> None:
+        super().__init__(message)
+        self.status = status
 
 
 class HttpApiResponseException(Exception):
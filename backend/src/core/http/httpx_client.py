@@ -0,0 +1,130 @@
+import asyncio
+from typing import Any, Mapping
+
+import httpx
+from loguru import logger
+
+from src.core import json_codec
+from src.core.config import settings, HttpUpstreamSettings
+from src.core.http.client import IHttpClient
+
+logger = logger.bind(name="httpclient")
+
+
+class HttpxResponse:
+    """IHttpResponse over an already read httpx.Response"""
+
+    def __init__(self, response: httpx.Response) -> None:
+        self._response = response
+        self.status = response.status_code
+        self.ok = response.status_code < 400
+        self.headers: Mapping[str, str] = response.headers
+        self.cookies: Mapping = response.cookies
+        self.http_version = response.http_version
+
+    async def read(self) -> bytes:
+        return self._response.content
+
+    async def text(self) -> str:
+        return self._response.text
+
+    async def json(self) -> Any:
+        return json_codec.loads(self._response.content)
+
+
+class Http2Client(IHttpClient):
+    """One httpx client per configured upstream host, HTTP/2 multiplexes requests over a single connection
+
+    Takes the same kwargs as AsyncHttpClient, the pool settings of an upstream map to httpx.Limits.
+    """
+
+    clients: dict[str, httpx.AsyncClient] = {}
+    upstreams: dict[str, HttpUpstreamSettings] = settings.HTTP_UPSTREAMS
+    http1: bool = True
+
+    @classmethod
+    def _upstream_name(cls, url: str | None) -> str:
+        host = httpx.URL(url).host if url else None
+        return host if host in cls.upstreams else "default"
+
+    @classmethod
+    def _make_client(cls, upstream: HttpUpstreamSettings) -> httpx.AsyncClient:
+        timeout = httpx.Timeout(
+            upstream.total_timeout,
+            connect=upstream.connect_timeout,
+            read=upstream.read_timeout,
+            write=upstream.read_timeout,
+        )
+        limits = httpx.Limits(
+            max_connections=upstream.limit or None,
+            max_keepalive_connections=upstream.limit_per_host or None,
+            keepalive_expiry=upstream.keepalive_timeout,
+        )
+        return httpx.AsyncClient(http1=cls.http1, http2=True, timeout=timeout, limits=limits, proxy=upstream.proxy)
+
+    @classmethod
+    def get_httpx_client(cls, url: str | None = None) -> httpx.AsyncClient:
+        name = cls._upstream_name(url)
+        client = cls.clients.get(name)
+        if client is None or client.is_closed:
+            client = cls.clients[name] = cls._make_client(cls.upstreams.get(name) or HttpUpstreamSettings())
+        return client
+
+    @classmethod
+    async def open_clients(cls) -> None:
+        for name in cls.upstreams:
+            cls.clients[name] = cls._make_client(cls.upstreams[name])
+
+    @classmethod
+    async def close_clients(cls) -> None:
+        clients, cls.clients = cls.clients, {}
+        for client in clients.values():
+            await client.aclose()
+
+    @classmethod
+    async def warm_up(cls, url: str, connections: int) -> None:
+        """Pre-open the connection, over HTTP/2 one is enough for any number of concurrent requests"""
+        client = cls.get_httpx_client(url)
+        results = await asyncio.gather(*(client.head(url) for _ in range(connections)), return_exceptions=True)
+        errors = [result for result in results if isinstance(result, Exception)]
+        if errors:
+            logger.warning(f"Warm-up of {url}: {len(errors)}/{connections} requests failed: {errors[0]!r}")
+        else:
+            logger.info(f"Warmed up {url} over {results[0].http_version}")
+
+    @staticmethod
+    def _to_httpx_kwargs(kwargs: dict) -> dict:
+        if not kwargs.get("cookies"):
+            kwargs.pop("cookies", None)
+        if kwargs.get("json") is not None:
+            kwargs["content"] = json_codec.dumps(kwargs.pop("json"))
+            kwargs["headers"] = {"Content-Type": "application/json", **(kwargs.get("headers") or {})}
+        if kwargs.get("files"):
+            kwargs["files"] = [(field, (filename, file)) for field, filename, file in kwargs["files"]]
+        return kwargs
+
+    @classmethod
+    async def _request(cls, method: str, url: str, **kwargs) -> HttpxResponse:
+        logger.debug(f"Started {method} {url}")
+        response = await cls.get_httpx_client(url).request(method, url, **cls._to_httpx_kwargs(kwargs))
+        return HttpxResponse(response)
+
+    @classmethod
+    async def get(cls, url: str, **kwargs) -> HttpxResponse:
+        return await cls._request("GET", url, **kwargs)
+
+    @classmethod
+    async def post(cls, url: str, **kwargs) -> HttpxResponse:
+        return await cls._request("POST", url, **kwargs)
+
+    @classmethod
+    async def put(cls, url: str, **kwargs) -> HttpxResponse:
+        return await cls._request("PUT", url, **kwargs)
+
+    @classmethod
+    async def delete(cls, url: str, **kwargs) -> HttpxResponse:
+        return await cls._request("DELETE", url, **kwargs)
+
+    @classmethod
+    async def patch(cls, url: str, **kwargs) -> HttpxResponse:
+        return await cls._request("PATCH", url, **kwargs)
@@ -0,0 +1,79 @@
+import os
+import base64
+import secrets
+from io import BytesIO
+from typing import BinaryIO, AsyncIterator
+
+from src.core import json_codec
+
+
+def file_size(file: BinaryIO) -> int:
+    """Size of an in-memory buffer or of an open file on disk, without reading it"""
+    if isinstance(file, BytesIO):
+        return file.getbuffer().nbytes
+    return os.fstat(file.fileno()).st_size
+
+
+class StreamingJsonBody:
+    """JSON request body with files spliced in as base64 while it is being sent
+
+    The payload is serialized once with a marker string in place of each file; the file is then encoded
+    chunk by chunk, from the BytesIO buffer without copying it or from disk, between the JSON pieces around
+    its marker. Peak memory is the JSON skeleton plus one chunk, whatever the file size.
+    """
+
+    CHUNK_SIZE = 3 * 64 * 1024  # a multiple of 3, so no chunk but the last gets base64 padding
+
+    def __init__(self, payload: dict, files: dict[str, BinaryIO]) -> None:
+        """`files` maps a marker used as a string value somewhere in `payload` to the file to put there"""
+        body = json_codec.dumps(payload)
+        positions = sorted((self._find(body, marker), marker) for marker in files)
+        self._parts: list[bytes | BinaryIO] = []
+        start = 0
+        for position, marker in positions:
+            self._parts += [body[start:position], files[marker]]
+            start = position + len(marker.encode())
+        self._parts.append(body[start:])
+
+    @staticmethod
+    def new_marker() -> str:
+        return f"__file_{secrets.token_hex(8)}__"
+
+    @staticmethod
+    def _find(body: bytes, marker: str) -> int:
+        position = body.find(marker.encode())
+        if position < 0:
+            raise ValueError(f"Marker {marker} is not in the payload")
+        return position
+
+    def __len__(self) -> int:
+        return sum(
+            len(part) if isinstance(part, bytes) else (file_size(part) + 2) // 3 * 4 for part in self._parts
+        )
+
+    def _encode(self, file: BinaryIO) -> AsyncIterator[bytes]:
+        if isinstance(file, BytesIO):
+            return self._encode_buffer(file)
+        return self._encode_stream(file)
+
+    async def _encode_buffer(self, file: BytesIO) -> AsyncIterator[bytes]:
+        with file.getbuffer() as view:
+            for start in range(0, len(view), self.CHUNK_SIZE):
+                yield base64.b64encode(view[start:start + self.CHUNK_SIZE])
+
+    async def _encode_stream(self, file: BinaryIO) -> AsyncIterator[bytes]:
+        file.seek(0)
+        while chunk := file.read(self.CHUNK_SIZE):
+            yield base64.b64encode(chunk)
+
+    async def chunks(self) -> AsyncIterator[bytes]:
+        for part in self._parts:
+            if isinstance(part, bytes):
+                yield part
+            else:
+                async for chunk in self._encode(part):
+                    yield chunk
+
+    @property
+    def headers(self) -> dict[str, str]:
+        return {"Content-Type": "application/json", "Content-Length": str(len(self))}
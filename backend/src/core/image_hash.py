@@ -0,0 +1,33 @@
+from io import BytesIO
+
+from PIL import Image, ImageOps
+
+_HASH_SIZE = 8
+
+
+def dhash(file: BytesIO) -> int:
+    """64-bit difference hash as a signed integer, so it fits a Postgres BIGINT
+
+    Robust to rescaling, recompression and small crops; the buffer position is restored afterwards.
+    """
+    position = file.tell()
+    file.seek(0)
+    try:
+        with Image.open(file) as image:
+            # JPEG decoder can downscale while decoding, much cheaper than a full-size decode
+            image.draft("L", (_HASH_SIZE * 4, _HASH_SIZE * 4))
+            image = ImageOps.exif_transpose(image).convert("L")
+            pixels = image.resize((_HASH_SIZE + 1, _HASH_SIZE), Image.Resampling.BOX).tobytes()
+    finally:
+        file.seek(position)
+
+    value = 0
+    for row in range(_HASH_SIZE):
+        offset = row * (_HASH_SIZE + 1)
+        for col in range(_HASH_SIZE):
+            value = (value << 1) | (pixels[offset + col] > pixels[offset + col + 1])
+    return value - (1 << 64) if value >= 1 << 63 else value
+
+
+def hamming_distance(first: int, second: int) -> int:
+    return ((first ^ second) & ((1 << 64) - 1)).bit_count()
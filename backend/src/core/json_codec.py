@@ -0,0 +1,35 @@
+"""JSON encoding used on the hot paths: orjson when installed, stdlib json otherwise
+
+Output matches `json.dumps(obj, ensure_ascii=False, separators=(",", ":"))` in both cases.
+"""
+
+import json
+from typing import Any, Callable
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover
+    orjson = None
+
+JSONDecodeError = json.JSONDecodeError  # orjson.JSONDecodeError subclasses it
+
+if orjson is not None:
+    _OPTIONS = orjson.OPT_NON_STR_KEYS
+
+    def dumps(obj: Any, *, sort_keys: bool = False, default: Callable[[Any], Any] | None = None) -> bytes:
+        return orjson.dumps(obj, default=default, option=_OPTIONS | (orjson.OPT_SORT_KEYS if sort_keys else 0))
+
+    def loads(data: bytes | bytearray | memoryview | str) -> Any:
+        return orjson.loads(data)
+
+else:
+
+    def dumps(obj: Any, *, sort_keys: bool = False, default: Callable[[Any], Any] | None = None) -> bytes:
+        return json.dumps(obj, ensure_ascii=False, separators=(",", ":"), sort_keys=sort_keys, default=default).encode()
+
+    def loads(data: bytes | bytearray | memoryview | str) -> Any:
+        return json.loads(bytes(data) if isinstance(data, memoryview) else data)
+
+
+def dumps_str(obj: Any, *, sort_keys: bool = False, default: Callable[[Any], Any] | None = None) -> str:
+    return dumps(obj, sort_keys=sort_keys, default=default).decode()
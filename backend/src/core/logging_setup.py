@@ -1,9 +1,49 @@
+import traceback
+
 from loguru import logger
 from fastapi import FastAPI, Request, Response
 from starlette.background import BackgroundTask
 
+from src.core import json_codec
 from src.core.config import settings
 
+TEXT_FORMAT = "{time:MMMM D, YYYY > HH:mm:ss!UTC} | {level} | {message}"
+
+
+def serialize_record(record) -> str:
+    """Format callable writing the same document as loguru's serialize=True, encoded with the fast JSON codec"""
+    exception = record["exception"]
+    text = TEXT_FORMAT.format(time=record["time"], level=record["level"].name, message=record["message"]) + "\n"
+    if exception is not None:
+        # Loguru appends the traceback to the text as well, without it the log only says that something failed
+        text += "".join(traceback.format_exception(exception.type, exception.value, exception.traceback))
+        exception = {
+            "type": None if exception.type is None else exception.type.__name__,
+            "value": exception.value,
+            "traceback": bool(exception.traceback),
+        }
+    document = {
+        "text": text,
+        "record": {
+            "elapsed": {"repr": record["elapsed"], "seconds": record["elapsed"].total_seconds()},
+            "exception": exception,
+            "extra": {key: value for key, value in record["extra"].items() if key != "_serialized"},
+            "file": {"name": record["file"].name, "path": record["file"].path},
+            "function": record["function"],
+            "level": {"icon": record["level"].icon, "name": record["level"].name, "no": record["level"].no},
+            "line": record["line"],
+            "message": record["message"],
+            "module": record["module"],
+            "name": record["name"],
+            "process": {"id": record["process"].id, "name": record["process"].name},
+            "thread": {"id": record["thread"].id, "name": record["thread"].name},
+            "time": {"repr": record["time"], "timestamp": record["time"].timestamp()},
+        },
+    }
+    # The returned template is formatted by loguru, so the document goes through extra instead of inline
+    record["extra"]["_serialized"] = json_codec.dumps_str(document, default=str)
+    return "{extra[_serialized]}\n"
+
 
 def add_app_name(record):
     record["extra"]["app_name"] = settings.PROJECT_NAME
@@ -33,8 +73,7 @@ def setup_fastapi_logging(app: FastAPI):
     fastapi_logger = fastapi_logger.patch(add_app_name)
     fastapi_logger.add(
         "/app/logs/fastapi.json",
-        format="{time:MMMM D, YYYY > HH:mm:ss!UTC} | {level} | {message}",
-        serialize=True,
+        format=serialize_record,
         rotation="30 MB",
         filter=lambda record: record["extra"].get("name") == "fastapi"
     )
@@ -61,8 +100,7 @@ def setup_fastapi_logging(app: FastAPI):
 
 logger.add(
     "/app/logs/app.json",
-    format="{time:MMMM D, YYYY > HH:mm:ss!UTC} | {level} | {message}",
-    serialize=True,
+    format=serialize_record,
     rotation="30 MB",
     filter=add_app_name,
 )
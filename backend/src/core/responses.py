@@ -0,0 +1,12 @@
+from typing import Any
+
+from fastapi.responses import JSONResponse
+
+from src.core import json_codec
+
+
+class FastJSONResponse(JSONResponse):
+    """Default response class of the API, encodes with the fast JSON codec"""
+
+    def render(self, content: Any) -> bytes:
+        return json_codec.dumps(content)
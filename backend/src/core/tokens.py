@@ -0,0 +1,49 @@
+"""Local estimate of OpenAI prompt tokens, no tokenizer files needed
+
+Splits text the way the o200k pre-tokenizer does (words with their leading space, digit groups of up to
+three, punctuation runs) and charges each piece by the average characters per token of its script. Tends
+to overestimate slightly, which is the safe side for limits and rate accounting.
+"""
+
+import re
+import math
+
+_PIECES = re.compile(r" ?[^\W\d_]+| ?\d{1,3}| ?[^\s\w]+|\s+")
+_CYRILLIC = re.compile(r"[Ѐ-ӿ]")
+_LATIN = re.compile(r"[A-Za-z]")
+
+LATIN_CHARS_PER_TOKEN = 4.0
+CYRILLIC_CHARS_PER_TOKEN = 3.0
+OTHER_CHARS_PER_TOKEN = 1.5
+PUNCTUATION_CHARS_PER_TOKEN = 2.0
+
+
+def _piece_tokens(piece: str) -> int:
+    word = piece.lstrip(" ")
+    if not word or word.isspace():
+        return 1
+    if word.isdigit():
+        return 1
+    if _CYRILLIC.match(word):
+        per_token = CYRILLIC_CHARS_PER_TOKEN
+    elif _LATIN.match(word):
+        per_token = LATIN_CHARS_PER_TOKEN
+    elif not word[0].isalpha():
+        per_token = PUNCTUATION_CHARS_PER_TOKEN
+    else:
+        per_token = OTHER_CHARS_PER_TOKEN
+    return math.ceil(len(word) / per_token)
+
+
+def estimate_tokens(text: str) -> int:
+    return sum(_piece_tokens(match.group()) for match in _PIECES.finditer(text))
+
+
+def truncate_to_tokens(text: str, max_tokens: int) -> str:
+    """Longest prefix of whole pieces, so no word is cut, estimated at no more than `max_tokens`"""
+    tokens = 0
+    for match in _PIECES.finditer(text):
+        tokens += _piece_tokens(match.group())
+        if tokens > max_tokens:
+            return text[:match.start()].rstrip()
+    return text
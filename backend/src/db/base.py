@@ -18,7 +18,7 @@ class Base(DeclarativeBase):
 
 
 class BaseMixin:
-    id: Mapped[UUID] = mapped_column(server_default=text("gen_random_uuid()"), primary_key=True, index=True)
+    id: Mapped[UUID] = mapped_column(server_default=text("gen_random_uuid()"), primary_key=True)
     created_at: Mapped[dt.datetime] = mapped_column(server_default=text("now()"), default=dt.datetime.now)
     updated_at: Mapped[dt.datetime | None] = mapped_column(nullable=True, onupdate=text("now()"))
 
@@ -1,9 +1,64 @@
-from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+from uuid import uuid4
 
+from sqlalchemy import make_url
+from sqlalchemy.ext.asyncio import AsyncEngine, async_sessionmaker, create_async_engine
+
+from src.core import json_codec
 from src.core.config import settings
+from src.db.pool import InstrumentedAsyncAdaptedQueuePool
 
 DATABASE_URL = settings.DATABASE_URI
 
-engine = create_async_engine(DATABASE_URL)
+
+def _prepared_statement_name() -> str:
+    return f"__asyncpg_{uuid4()}__"
+
+
+def _connect_args(url: str) -> dict:
+    """Behind PgBouncer transaction pooling consecutive statements may run on different server connections:
+    no statement cache, and unique names for the statements asyncpg still prepares"""
+    if not settings.DATABASE_PGBOUNCER:
+        return {}
+    driver = make_url(url).get_driver_name()
+    if driver == "asyncpg":
+        return {
+            "statement_cache_size": 0,
+            "prepared_statement_cache_size": 0,
+            "prepared_statement_name_func": _prepared_statement_name,
+        }
+    if driver == "psycopg":
+        return {"prepare_threshold": None}
+    return {}
+
+
+def _create_engine(url: str, name: str) -> AsyncEngine:
+    pool_options = {}
+    if make_url(url).get_backend_name() != "sqlite":
+        pool_options = {
+            "poolclass": InstrumentedAsyncAdaptedQueuePool,
+            "pool_logging_name": name,
+            "pool_size": settings.DATABASE_POOL_SIZE,
+            "max_overflow": settings.DATABASE_POOL_MAX_OVERFLOW,
+            "pool_timeout": settings.DATABASE_POOL_TIMEOUT,
+            "pool_recycle": settings.DATABASE_POOL_RECYCLE,
+            "pool_pre_ping": settings.DATABASE_POOL_PRE_PING,
+        }
+    return create_async_engine(
+        url,
+        json_serializer=json_codec.dumps_str,
+        json_deserializer=json_codec.loads,
+        connect_args=_connect_args(url),
+        **pool_options,
+    )
+
+
+engine = _create_engine(DATABASE_URL, "primary")
 
 async_session_maker = async_sessionmaker(engine, expire_on_commit=False)
+
+# Streaming replica for reads that can be a little behind, none when not configured
+replica_engine = (
+    _create_engine(settings.DATABASE_REPLICA_URI, "replica") if settings.DATABASE_REPLICA_URI else None
+)
+
+replica_session_maker = async_sessionmaker(replica_engine, expire_on_commit=False) if replica_engine else None
@@ -0,0 +1,31 @@
+import time
+
+from prometheus_client import Gauge, Histogram
+from sqlalchemy.pool import AsyncAdaptedQueuePool
+
+DB_POOL_WAIT = Histogram(
+    "db_pool_wait_seconds",
+    "Time to get a connection from the pool, a new overflow connection included",
+    ["pool"],
+    buckets=(0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30),
+)
+DB_POOL_CHECKED_OUT = Gauge("db_pool_checked_out", "Connections in use", ["pool"])
+
+
+class InstrumentedAsyncAdaptedQueuePool(AsyncAdaptedQueuePool):
+    """Queue pool exporting its wait time and checked-out count, labeled by the engine's `pool_logging_name`
+
+    The label goes through `logging_name` because `recreate()`, on dispose, passes only the standard arguments on.
+    """
+
+    def __init__(self, *args, **kwargs) -> None:
+        super().__init__(*args, **kwargs)
+        self._metrics_label = kwargs.get("logging_name") or "default"
+        DB_POOL_CHECKED_OUT.labels(pool=self._metrics_label).set_function(self.checkedout)
+
+    def _do_get(self):
+        start = time.perf_counter()
+        try:
+            return super()._do_get()
+        finally:
+            DB_POOL_WAIT.labels(pool=self._metrics_label).observe(time.perf_counter() - start)
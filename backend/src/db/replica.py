@@ -0,0 +1,108 @@
+import time
+import asyncio
+from uuid import UUID
+from collections import OrderedDict
+
+from loguru import logger
+from prometheus_client import Counter, Gauge
+from sqlalchemy import Select, text
+from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy.ext.asyncio import AsyncEngine, async_sessionmaker
+from sqlalchemy.orm import Session
+
+from src.core.config import settings
+from src.db.engine import async_session_maker, engine, replica_engine, replica_session_maker
+
+DB_REPLICA_LAG = Gauge("db_replica_lag_seconds", "Replay delay of the read replica behind the primary")
+DB_READ_SESSIONS = Counter("db_read_sessions_total", "Read-only sessions by where they were sent", ["route"])
+
+# Nothing to replay means caught up; on the primary itself both positions are null
+REPLICA_LAG = text("""
+SELECT CASE WHEN pg_last_wal_receive_lsn() IS NOT DISTINCT FROM pg_last_wal_replay_lsn() THEN 0
+    ELSE COALESCE(EXTRACT(EPOCH FROM now() - pg_last_xact_replay_timestamp()), 0) END
+""")
+
+
+class ReplicaRouter:
+    """Picks the session maker of read-only units of work: the replica unless it is too far behind or
+    the user wrote recently
+
+    A user's reads stay on the primary for `window` seconds after their write, or for the current lag
+    when that is longer. Writes are remembered per worker, idle users evicted LRU. Until the first lag
+    check, and after a failed one, everything reads from the primary.
+    """
+
+    def __init__(
+        self,
+        primary: async_sessionmaker,
+        replica: async_sessionmaker | None,
+        window: float,
+        max_lag: float,
+        max_users: int = 100_000,
+    ) -> None:
+        self.primary = primary
+        self.replica = replica
+        self.window = window
+        self.max_lag = max_lag
+        self.max_users = max_users
+        self.lag: float | None = None
+        self._writes: OrderedDict[UUID, float] = OrderedDict()
+
+    def record_write(self, user_id: UUID) -> None:
+        if self.replica is None:
+            return
+        self._writes[user_id] = time.monotonic()
+        self._writes.move_to_end(user_id)
+        while len(self._writes) > self.max_users:
+            self._writes.popitem(last=False)
+
+    def route(self, user_id: UUID | None = None) -> str:
+        if self.replica is None:
+            return "primary"
+        if self.lag is None or self.lag > self.max_lag:
+            return "replica_lag"
+        written_at = self._writes.get(user_id) if user_id is not None else None
+        if written_at is not None and time.monotonic() - written_at < max(self.window, self.lag):
+            return "recent_write"
+        return "replica"
+
+    def session_maker(self, user_id: UUID | None = None) -> async_sessionmaker:
+        route = self.route(user_id)
+        DB_READ_SESSIONS.labels(route=route).inc()
+        return self.replica if route == "replica" else self.primary
+
+    async def check_lag(self, replica: AsyncEngine) -> None:
+        try:
+            async with replica.connect() as connection:
+                self.lag = float((await connection.execute(REPLICA_LAG)).scalar_one())
+        except (SQLAlchemyError, OSError) as e:
+            logger.warning(f"Replica lag check failed, reading from the primary: {e}")
+            self.lag = None
+            DB_REPLICA_LAG.set(float("nan"))
+            return
+        DB_REPLICA_LAG.set(self.lag)
+
+    async def monitor(self, replica: AsyncEngine, interval: float) -> None:
+        while True:
+            await self.check_lag(replica)
+            await asyncio.sleep(interval)
+
+
+replica_router = ReplicaRouter(
+    async_session_maker,
+    replica_session_maker,
+    settings.DATABASE_READ_YOUR_WRITES_SECONDS,
+    settings.DATABASE_REPLICA_MAX_LAG_SECONDS,
+)
+
+
+class ReplicaReadSession(Session):
+    """Session of the admin pages: SELECTs on the replica while the router allows it, the rest on the primary"""
+
+    def get_bind(self, mapper=None, clause=None, **kw):
+        if not self._flushing and isinstance(clause, Select) and replica_router.route() == "replica":
+            return replica_engine.sync_engine
+        return super().get_bind(mapper, clause=clause, **kw)
+
+
+admin_session_maker = async_sessionmaker(engine, sync_session_class=ReplicaReadSession, expire_on_commit=False)
@@ -1,4 +1,10 @@
-from src.core.http.client import AsyncHttpClient
+from src.core.http.dependencies import get_http_client
+from src.integration.infrastructure.model_router import model_router
+from src.integration.infrastructure.food_database import get_local_meal_recognizer
+from src.integration.infrastructure.sport_calculator import local_sport_recognizer
+from src.integration.infrastructure.meal_edit_interpreter import meal_edit_interpreter
+from src.integration.infrastructure.semantic_cache import semantic_cache
+from src.core.config import settings
 from src.integration.infrastructure.meal_audio_task_runner import OpenaiMealAudioTaskRunner
 from src.integration.infrastructure.meal_edit_recognition_task_runner import OpenaiMealEditRecognitionTaskRunner
 from src.integration.infrastructure.meal_image_task_runner import OpenaiMealImageTaskRunner
@@ -10,28 +16,33 @@ from src.task.application.interfaces.task_runner import ITaskRunner
 
 
 def get_integration_meal_image_task_runner() -> ITaskRunner:
-    return OpenaiMealImageTaskRunner(AsyncHttpClient())
+    return OpenaiMealImageTaskRunner(get_http_client(), model_router)
 
 
 def get_integration_meal_text_task_runner() -> ITaskRunner:
-    return OpenaiMealTextTaskRunner(AsyncHttpClient())
+    return OpenaiMealTextTaskRunner(
+        get_http_client(),
+        model_router,
+        get_local_meal_recognizer(),
+        semantic_cache if settings.SEMANTIC_CACHE_ENABLED else None,
+    )
 
 
 def get_integration_meal_audio_task_runner() -> ITaskRunner:
-    return OpenaiMealAudioTaskRunner(AsyncHttpClient())
+    return OpenaiMealAudioTaskRunner(get_http_client(), model_router)
 
 
 def get_integration_meal_edit_recognition_task_runner() -> ITaskRunner:
-    return OpenaiMealEditRecognitionTaskRunner(AsyncHttpClient())
+    return OpenaiMealEditRecognitionTaskRunner(get_http_client(), model_router, meal_edit_interpreter)
 
 
 def get_integration_sport_text_task_runner() -> ITaskRunner:
-    return OpenaiSportTextTaskRunner(AsyncHttpClient())
+    return OpenaiSportTextTaskRunner(get_http_client(), model_router, local_sport_recognizer)
 
 
 def get_integration_sport_audio_task_runner() -> ITaskRunner:
-    return OpenaiSportAudioTaskRunner(AsyncHttpClient())
+    return OpenaiSportAudioTaskRunner(get_http_client(), model_router)
 
 
 def get_integration_sport_edit_recognition_task_runner() -> ITaskRunner:
-    return OpenaiSportEditRecognitionTaskRunner(AsyncHttpClient())
+    return OpenaiSportEditRecognitionTaskRunner(get_http_client(), model_router)
@@ -1,7 +1,7 @@
 from enum import Enum
 from typing import Literal
 
-from pydantic import BaseModel
+from pydantic import BaseModel, Field
 
 
 class IntegrationTaskStatus(str, Enum):
@@ -11,12 +11,52 @@ class IntegrationTaskStatus(str, Enum):
     failed = "failed"
 
 
+class IntegrationResultKind(str, Enum):
+    products = "products"
+    sports = "sports"
+
+
+class IntegrationUserProfileDTO(BaseModel):
+    gender: Literal["f", "m"] | None = None
+    age: int | None = None
+    height: int | None = None
+
+
 class IntegrationTaskRunParamsDTO(BaseModel):
     language: Literal["russian", "english"]
 
 
+class TaskProductIngredientDTO(BaseModel):
+    name: str | None = None
+    weight: float | None = None
+    calories: float | None = None
+    proteins: float | None = Field(None, description="Клетчатка")
+    fats: float | None = None
+    carbohydrates: float | None = None
+    fiber: float | None = Field(None, description="Белки")
+
+
+class TaskProductDTO(BaseModel):
+    name: str | None = None
+    weight: float | None = None
+    calories: float | None = None
+    proteins: float | None = Field(None, description="Клетчатка")
+    fats: float | None = None
+    carbohydrates: float | None = None
+    fiber: float | None = Field(None, description="Белки")
+
+    ingredients: list[TaskProductIngredientDTO]
+
+
+class TaskSportDTO(BaseModel):
+    name: str | None = None
+    calories: float | None = None
+    length: int | None = None
+
+
 class IntegrationTaskResultDTO(BaseModel):
     status: IntegrationTaskStatus
     external_task_id: str | None = None
-    result: list[dict] | None = None
+    kind: IntegrationResultKind | None = None
+    result: list[TaskProductDTO] | list[TaskSportDTO] | None = None
     error: str | None = None
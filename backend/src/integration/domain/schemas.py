@@ -1,7 +1,9 @@
 from typing import Literal, Any, Optional
 from enum import Enum
 
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, Field, TypeAdapter
+
+from src.integration.domain.dtos import TaskProductDTO, TaskSportDTO
 
 
 class ContentType(str, Enum):
@@ -55,3 +57,31 @@ class OpenaiResponse(BaseModel):
     raw: Optional[dict[str, Any]] = None
 
     model_config = {"extra": "allow"}
+
+
+class OpenaiOutputResponse(BaseModel):
+    """The part of a /v1/responses body the runners read, other fields are skipped while parsing"""
+
+    output: Optional[list[MessageItem]] = None
+
+
+openai_output_adapter = TypeAdapter(OpenaiOutputResponse)
+
+
+class MealOutput(BaseModel):
+    """The `output_text` JSON of the meal runners, as their json_schema declares it"""
+
+    dishes: list[TaskProductDTO]
+
+
+class SportOutput(BaseModel):
+    """The `output_text` JSON of the sport runners"""
+
+    sports: list[TaskSportDTO]
+
+
+meal_output_adapter = TypeAdapter(MealOutput)
+sport_output_adapter = TypeAdapter(SportOutput)
+# Results of the local recognizers and the semantic cache, which are plain dicts
+products_adapter = TypeAdapter(list[TaskProductDTO])
+sports_adapter = TypeAdapter(list[TaskSportDTO])
@@ -1,19 +1,19 @@
 import base64
 from io import BytesIO
-import json
 
 from src.core.config import settings
 from src.core.http.client import IHttpClient
 from src.task.domain.entities import TaskRun
-from src.integration.domain.dtos import IntegrationTaskStatus, IntegrationTaskResultDTO
+from src.integration.domain.dtos import IntegrationResultKind, IntegrationTaskStatus, IntegrationTaskResultDTO
 from src.core.http.api_client import HttpApiClient
-from src.integration.domain.schemas import OpenaiResponse, OutputText, StructuredData
+from src.integration.domain.schemas import OutputText, StructuredData, meal_output_adapter, openai_output_adapter
 from src.task.application.interfaces.task_runner import ITaskRunner
 
 
 class OpenaiConsultationTaskRunner(HttpApiClient, ITaskRunner[IntegrationTaskResultDTO]):
     token: str = settings.OPENAI_API_TOKEN
     api_url: str = "https://api.openai.com"
+    result_kind: IntegrationResultKind = IntegrationResultKind.products
 
     def __init__(self, client: IHttpClient) -> None:
         super().__init__(client=client, source_url=self.api_url, token=self.token)
@@ -88,16 +88,16 @@ class OpenaiConsultationTaskRunner(HttpApiClient, ITaskRunner[IntegrationTaskRes
 
     async def start(self, data: TaskRun) -> IntegrationTaskResultDTO:
         payload = self._make_payload([data.file], MESSAGE_ANALYZE_PROMPT.format(language=data.language))
-        response = await self.request("POST", "/v1/responses", json=payload)
-        result = self.validate_response(response.data, OpenaiResponse)
+        content = await self.request_content("POST", "/v1/responses", json=payload)
+        result = self.validate_content(content, openai_output_adapter)
 
         if not result.output:
             raise ValueError("Empty output")
         if not isinstance(result.output[0].content[0], OutputText):
             raise ValueError(f"Unexpected content type in response: {type(result.output[0].content[0])}")
-        result = json.loads(result.output[0].content[0].text).get("dishes")
+        result = meal_output_adapter.validate_json(result.output[0].content[0].text).dishes
 
-        return IntegrationTaskResultDTO(status=IntegrationTaskStatus.finished, result=result)
+        return IntegrationTaskResultDTO(status=IntegrationTaskStatus.finished, kind=self.result_kind, result=result)
 
 
 MESSAGE_ANALYZE_PROMPT = """
@@ -0,0 +1,61 @@
+import abc
+import zlib
+
+import numpy as np
+from pydantic import BaseModel
+
+from src.core.config import settings
+from src.core.http.client import IHttpClient
+from src.core.http.api_client import HttpApiClient
+from src.integration.infrastructure.fuzzy_index import normalize, trigrams
+
+
+class IEmbedder(abc.ABC):
+    dimensions: int
+
+    @abc.abstractmethod
+    async def embed(self, texts: list[str]) -> np.ndarray:
+        """float32 matrix of shape (len(texts), dimensions), rows are not required to be normalized"""
+
+
+class HashingEmbedder(IEmbedder):
+    """Local deterministic embedding: hashed stemmed words and character trigrams, no cross-language matching"""
+
+    def __init__(self, dimensions: int) -> None:
+        self.dimensions = dimensions
+
+    async def embed(self, texts: list[str]) -> np.ndarray:
+        result = np.zeros((len(texts), self.dimensions), dtype=np.float32)
+        for row, text in enumerate(texts):
+            normalized = normalize(text)
+            for feature in (*normalized.split(), *trigrams(normalized)):
+                digest = zlib.crc32(feature.encode())
+                result[row, digest % self.dimensions] += 1.0 if digest & 0x80000000 else -1.0
+        return result
+
+
+class _EmbeddingItem(BaseModel):
+    index: int
+    embedding: list[float]
+
+
+class _EmbeddingsResponse(BaseModel):
+    data: list[_EmbeddingItem]
+
+
+class OpenaiEmbedder(HttpApiClient, IEmbedder):
+    token: str = settings.OPENAI_API_TOKEN
+    api_url: str = "https://api.openai.com"
+    model: str = "text-embedding-3-small"
+
+    def __init__(self, client: IHttpClient, dimensions: int) -> None:
+        super().__init__(client=client, source_url=self.api_url, token=self.token)
+        self.dimensions = dimensions
+
+    async def embed(self, texts: list[str]) -> np.ndarray:
+        response = await self.request(
+            "POST", "/v1/embeddings", json={"model": self.model, "input": texts, "dimensions": self.dimensions}
+        )
+        result = self.validate_response(response.data, _EmbeddingsResponse)
+        items = sorted(result.data, key=lambda item: item.index)
+        return np.asarray([item.embedding for item in items], dtype=np.float32)
@@ -0,0 +1,209 @@
+import os
+import re
+import csv
+import mmap
+import struct
+from functools import cache
+from typing import NamedTuple
+from pathlib import Path
+
+from loguru import logger
+
+from src.core.config import settings
+from src.integration.infrastructure.fuzzy_index import TrigramIndex, covers
+
+FOODS_SOURCE_PATH = Path(__file__).parent / "data" / "foods.tsv"
+
+
+class FoodMacros(NamedTuple):
+    """Per 100 g, portion_weight is the weight of one piece or serving in grams"""
+
+    calories: float
+    proteins: float
+    fats: float
+    carbohydrates: float
+    fiber: float
+    portion_weight: float
+
+
+class FoodDatabase:
+    """Macros table compiled from foods.tsv into a flat float32 file and mapped into memory"""
+
+    MAGIC = b"FDB1"
+    _HEADER = struct.Struct("<4sII")
+    _FIELDS_COUNT = len(FoodMacros._fields)
+
+    def __init__(self, names: list[tuple[str, str]], index: TrigramIndex[int], table: mmap.mmap) -> None:
+        self.names = names
+        self.index = index
+        self._table = table
+        self._values = memoryview(table)[self._HEADER.size :].cast("f")
+
+    def __len__(self) -> int:
+        return len(self.names)
+
+    def macros(self, food_id: int) -> FoodMacros:
+        offset = food_id * self._FIELDS_COUNT
+        return FoodMacros(*self._values[offset : offset + self._FIELDS_COUNT])
+
+    def name(self, food_id: int, language: str) -> str:
+        name_en, name_ru = self.names[food_id]
+        return name_ru if language == "russian" else name_en
+
+    @classmethod
+    def open(cls, source_path: str | Path, table_path: str | Path) -> "FoodDatabase":
+        with open(source_path, encoding="utf-8", newline="") as f:
+            rows = list(csv.DictReader(f, delimiter="\t"))
+
+        if not cls._is_table_fresh(source_path, table_path, len(rows)):
+            cls._build_table(rows, table_path)
+        with open(table_path, "rb") as f:
+            table = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+        index = TrigramIndex[int]()
+        names = []
+        for food_id, row in enumerate(rows):
+            names.append((row["name_en"], row["name_ru"]))
+            for alias in (row["name_en"], row["name_ru"], *filter(None, row["aliases"].split("|"))):
+                index.add(alias, food_id)
+        logger.info(f"Loaded food database: {len(names)} foods, {len(index)} aliases")
+        return cls(names, index, table)
+
+    @classmethod
+    def _is_table_fresh(cls, source_path: str | Path, table_path: str | Path, count: int) -> bool:
+        if not os.path.exists(table_path) or os.path.getmtime(table_path) < os.path.getmtime(source_path):
+            return False
+        with open(table_path, "rb") as f:
+            header = f.read(cls._HEADER.size)
+        if len(header) != cls._HEADER.size:
+            return False
+        magic, fields_count, rows_count = cls._HEADER.unpack(header)
+        return magic == cls.MAGIC and fields_count == cls._FIELDS_COUNT and rows_count == count
+
+    @classmethod
+    def _build_table(cls, rows: list[dict], table_path: str | Path) -> None:
+        os.makedirs(os.path.dirname(table_path) or ".", exist_ok=True)
+        record = struct.Struct(f"<{cls._FIELDS_COUNT}f")
+        tmp_path = f"{table_path}.{os.getpid()}.tmp"
+        with open(tmp_path, "wb") as f:
+            f.write(cls._HEADER.pack(cls.MAGIC, cls._FIELDS_COUNT, len(rows)))
+            for row in rows:
+                f.write(record.pack(*(float(row[field]) for field in FoodMacros._fields)))
+        os.replace(tmp_path, table_path)
+
+
+class ParsedFoodInput(NamedTuple):
+    name: str
+    amount: float
+    unit: str | None
+
+
+_UNITS: dict[str, tuple[str, float]] = {
+    **dict.fromkeys(("g", "gr", "gram", "grams", "г", "гр", "грамм", "грамма", "граммов"), ("mass", 1)),
+    **dict.fromkeys(("kg", "кг", "килограмм"), ("mass", 1000)),
+    # Grams per millilitre differ from food to food and the table has no densities
+    **dict.fromkeys(("ml", "мл"), ("volume", 1)),
+    **dict.fromkeys(("l", "л", "литр"), ("volume", 1000)),
+    **dict.fromkeys(("pc", "pcs", "piece", "pieces", "шт", "штук", "штуки", "штука"), ("portion", 1)),
+    **dict.fromkeys(("slice", "slices", "кусок", "куска", "кусков"), ("portion", 1)),
+    **dict.fromkeys(("cup", "cups", "чашка", "чашки", "стакан", "стакана"), ("portion", 1)),
+}
+_NUMBER_WORDS = {
+    **dict.fromkeys(("a", "an", "one", "один", "одна", "одно"), "1"),
+    **dict.fromkeys(("two", "два", "две"), "2"),
+    **dict.fromkeys(("three", "три"), "3"),
+    **dict.fromkeys(("four", "четыре"), "4"),
+    **dict.fromkeys(("five", "пять"), "5"),
+    **dict.fromkeys(("half", "половина", "пол"), "0.5"),
+}
+_NEGATION_RE = re.compile(r"\b(?:no|not|without|don'?t|didn'?t|never|skip(?:ped)?|без|не|нет|ни)\b", re.IGNORECASE)
+_COMPOUND_RE = re.compile(r",(?!\d)|[;+&\n]|\b(?:and|with|plus|и|с|со|на)\b", re.IGNORECASE)
+_AMOUNT = r"(?P<amount>\d+(?:[.,]\d+)?)"
+_UNIT = r"(?:\s*(?P<unit>" + "|".join(sorted(map(re.escape, _UNITS), key=len, reverse=True)) + r")\.?)?"
+_AMOUNT_FIRST_RE = re.compile(rf"^{_AMOUNT}{_UNIT}\s+(?:of\s+)?(?P<name>[^\d]+)$", re.IGNORECASE)
+_AMOUNT_LAST_RE = re.compile(rf"^(?P<name>[^\d]+?)\s+{_AMOUNT}{_UNIT}$", re.IGNORECASE)
+_NAME_ONLY_RE = re.compile(r"^(?P<name>[^\d]+)$")
+
+
+def parse_food_input(text: str) -> ParsedFoodInput | None:
+    """Single food with an optional quantity: "banana", "200g chicken breast", "два яйца", "рис 150 г" """
+    text = text.strip().lower()
+    if not text or _COMPOUND_RE.search(text) or _NEGATION_RE.search(text):
+        return None
+    first, _, rest = text.partition(" ")
+    if first in _NUMBER_WORDS and rest:
+        text = f"{_NUMBER_WORDS[first]} {rest}"
+
+    for pattern in (_AMOUNT_FIRST_RE, _AMOUNT_LAST_RE, _NAME_ONLY_RE):
+        match = pattern.match(text)
+        if match is None:
+            continue
+        groups = match.groupdict()
+        amount = float(groups["amount"].replace(",", ".")) if groups.get("amount") else 1.0
+        return ParsedFoodInput(name=groups["name"].strip(), amount=amount, unit=groups.get("unit"))
+    return None
+
+
+class LocalMealRecognizer:
+    """Answers simple single-food inputs from the food database, None means "ask the model" """
+
+    MAX_UNITLESS_COUNT = 10
+    COMMENTARY = {
+        "russian": "Рассчитано по базе продуктов для {weight:g} г.",
+        "english": "Calculated from the food database for {weight:g} g.",
+    }
+
+    def __init__(self, database: FoodDatabase, min_score: float, min_margin: float) -> None:
+        self.database = database
+        self.min_score = min_score
+        self.min_margin = min_margin
+
+    def recognize(self, text: str, language: str) -> list[dict] | None:
+        parsed = parse_food_input(text)
+        if parsed is None:
+            return None
+        match = self.database.index.lookup(parsed.name, self.min_score, self.min_margin)
+        # "chocolate cake" is close to "chocolate", every word has to be part of the food's name
+        if match is None or not covers(match.alias, parsed.name, self.min_score):
+            return None
+
+        macros = self.database.macros(match.key)
+        weight = self._weight(parsed, macros)
+        if weight is None or weight <= 0:
+            return None
+
+        ratio = weight / 100
+        ingredient = {
+            "name": self.database.name(match.key, language),
+            "weight": round(weight, 1),
+            "calories": round(macros.calories * ratio, 1),
+            "proteins": round(macros.proteins * ratio, 1),
+            "fats": round(macros.fats * ratio, 1),
+            "carbohydrates": round(macros.carbohydrates * ratio, 1),
+            "fiber": round(macros.fiber * ratio, 1),
+        }
+        commentary = self.COMMENTARY.get(language, self.COMMENTARY["english"]).format(weight=ingredient["weight"])
+        return [{**ingredient, "commentary": commentary, "ingredients": [ingredient]}]
+
+    def _weight(self, parsed: ParsedFoodInput, macros: FoodMacros) -> float | None:
+        if parsed.unit is None:
+            if parsed.amount > self.MAX_UNITLESS_COUNT:
+                # "150 rice" is grams or pieces, not worth guessing
+                return None
+            return parsed.amount * macros.portion_weight
+        kind, factor = _UNITS[parsed.unit]
+        if kind == "volume":
+            return None
+        if kind == "portion":
+            return parsed.amount * factor * macros.portion_weight
+        return parsed.amount * factor
+
+
+@cache
+def get_local_meal_recognizer() -> LocalMealRecognizer:
+    """Built on first use, the lifespan makes that the startup: opening the database writes FOOD_DATABASE_PATH"""
+    return LocalMealRecognizer(
+        FoodDatabase.open(FOODS_SOURCE_PATH, settings.FOOD_DATABASE_PATH),
+        min_score=settings.FOOD_MATCH_MIN_SCORE,
+        min_margin=settings.FOOD_MATCH_MIN_MARGIN,
+    )
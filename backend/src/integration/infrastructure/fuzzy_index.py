@@ -0,0 +1,118 @@
+import re
+from typing import Generic, TypeVar, NamedTuple
+from collections import Counter
+
+TKey = TypeVar("TKey")
+
+_WORD_RE = re.compile(r"[a-zа-я0-9]+")
+_RUSSIAN_ENDINGS = sorted(
+    (
+        "ами", "ями", "ого", "его", "ому", "ему", "ыми", "ими",
+        "ой", "ей", "ий", "ый", "ая", "яя", "ое", "ее", "ые", "ие", "ую", "юю",
+        "ов", "ев", "ам", "ям", "ах", "ях", "ом", "ем",
+        "а", "я", "ы", "и", "о", "е", "у", "ю", "ь",
+    ),
+    key=len,
+    reverse=True,
+)
+
+
+def _stem(word: str) -> str:
+    if "а" <= word[0] <= "я":
+        for ending in _RUSSIAN_ENDINGS:
+            if word.endswith(ending) and len(word) - len(ending) >= 3:
+                return word[: -len(ending)]
+        return word
+    if len(word) > 4 and word.endswith("ies"):
+        return word[:-3] + "y"
+    if len(word) > 3 and word.endswith("oes"):
+        return word[:-2]
+    if len(word) > 3 and word.endswith("s") and not word.endswith("ss"):
+        return word[:-1]
+    return word
+
+
+def normalize(text: str) -> str:
+    """Lowercase, fold ё and strip word endings, so "куриной грудки" == "куриная грудка" and "eggs" == "egg" """
+    return " ".join(_stem(word) for word in _WORD_RE.findall(text.lower().replace("ё", "е")))
+
+
+def trigrams(normalized: str) -> set[str]:
+    result = set()
+    for word in normalized.split():
+        padded = f"  {word} "
+        result.update(padded[i : i + 3] for i in range(len(padded) - 2))
+    return result
+
+
+def dice(first: set[str], second: set[str]) -> float:
+    return 2 * len(first & second) / (len(first) + len(second)) if first or second else 0.0
+
+
+def covers(alias: str, query: str, min_score: float) -> bool:
+    """Every word of the query is a word of the normalized alias, give or take a typo
+
+    A close overall score still lets extra words through: "fried rice" scores well against "rice".
+    """
+    alias_words = [trigrams(word) for word in alias.split()]
+    return all(
+        any(dice(trigrams(word), alias_word) >= min_score for alias_word in alias_words)
+        for word in normalize(query).split()
+    )
+
+
+class FuzzyMatch(NamedTuple, Generic[TKey]):
+    key: TKey
+    alias: str
+    score: float
+
+
+class TrigramIndex(Generic[TKey]):
+    """Inverted trigram index with Dice similarity ranking, like pg_trgm but in process"""
+
+    def __init__(self) -> None:
+        self._aliases: list[tuple[str, TKey, int]] = []
+        self._exact: dict[str, int] = {}
+        self._postings: dict[str, list[int]] = {}
+
+    def __len__(self) -> int:
+        return len(self._aliases)
+
+    def add(self, alias: str, key: TKey) -> None:
+        normalized = normalize(alias)
+        if not normalized or normalized in self._exact:
+            return
+        alias_id = len(self._aliases)
+        grams = trigrams(normalized)
+        self._aliases.append((normalized, key, len(grams)))
+        self._exact[normalized] = alias_id
+        for gram in grams:
+            self._postings.setdefault(gram, []).append(alias_id)
+
+    def search(self, query: str, limit: int = 5) -> list[FuzzyMatch[TKey]]:
+        """Best match per key, ordered by score"""
+        normalized = normalize(query)
+        if normalized in self._exact:
+            alias, key, _ = self._aliases[self._exact[normalized]]
+            exact = [FuzzyMatch(key, alias, 1.0)]
+        else:
+            exact = []
+
+        grams = trigrams(normalized)
+        shared = Counter(alias_id for gram in grams for alias_id in self._postings.get(gram, ()))
+        best: dict[TKey, FuzzyMatch[TKey]] = {match.key: match for match in exact}
+        for alias_id, count in shared.items():
+            alias, key, size = self._aliases[alias_id]
+            score = 2 * count / (len(grams) + size)
+            if key not in best or best[key].score < score:
+                best[key] = FuzzyMatch(key, alias, score)
+        return sorted(best.values(), key=lambda match: match.score, reverse=True)[:limit]
+
+    def lookup(self, query: str, min_score: float, min_margin: float) -> FuzzyMatch[TKey] | None:
+        """Single confident match: good enough and clearly better than the runner-up"""
+        matches = self.search(query, limit=2)
+        if not matches or matches[0].score < min_score:
+            return None
+        if len(matches) > 1 and matches[0].score - matches[1].score < min_margin:
+            return None
+        return matches[0]
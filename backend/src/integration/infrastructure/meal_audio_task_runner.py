@@ -2,35 +2,36 @@ import base64
 from io import BytesIO
 import json
 
-from src.core.config import settings
 from src.core.http.client import IHttpClient
 from src.integration.infrastructure.meal_edit_recognition_task_runner import OpenaiMealEditRecognitionTaskRunner
 from src.integration.infrastructure.meal_text_task_runner import OpenaiMealTextTaskRunner
 from src.task.domain.entities import TaskRun
 from src.integration.domain.dtos import IntegrationTaskStatus, IntegrationTaskResultDTO
-from src.core.http.api_client import HttpApiClient
+from src.integration.infrastructure.openai_task_runner import OpenaiTaskRunner
+from src.integration.infrastructure.model_router import ModelRouter
 from src.integration.domain.schemas import OpenaiResponse, OutputText, StructuredData
 from src.task.application.interfaces.task_runner import ITaskRunner
 
 
-class OpenaiMealAudioTaskRunner(HttpApiClient, ITaskRunner[IntegrationTaskResultDTO]):
-    token: str = settings.OPENAI_API_TOKEN
-    api_url: str = "https://api.openai.com"
+class OpenaiMealAudioTaskRunner(OpenaiTaskRunner, ITaskRunner[IntegrationTaskResultDTO]):
+    runner_type: str = "meal_audio"
+    transcription_model: str = "gpt-4o-transcribe"
 
-    def __init__(self, client: IHttpClient) -> None:
-        super().__init__(client=client, source_url=self.api_url, token=self.token)
-        self.text_runner = OpenaiMealTextTaskRunner(client)
+    def __init__(self, client: IHttpClient, router: ModelRouter) -> None:
+        super().__init__(client, router)
+        self.text_runner = OpenaiMealTextTaskRunner(client, router)
 
     async def start(self, data: TaskRun) -> IntegrationTaskResultDTO:
         if data.file is None:
             raise ValueError("Empty input")
 
-        response = await self.multipart_request(
-            "POST",
-            "/v1/audio/translations",
-            data={"model": "gpt-4o-transcribe", "prompt": MESSAGE_ANALYZE_PROMPT},
-            files=[("file", data.file)],
-        )
+        async with self.router.track(self.transcription_model):
+            response = await self.multipart_request(
+                "POST",
+                "/v1/audio/translations",
+                data={"model": self.transcription_model, "prompt": MESSAGE_ANALYZE_PROMPT},
+                files=[("file", data.file)],
+            )
         result = self.validate_response(response.data, OpenaiResponse)
 
         if not result.output:
@@ -0,0 +1,220 @@
+import re
+from copy import deepcopy
+from typing import NamedTuple
+
+from src.core.config import settings
+from src.integration.infrastructure.fuzzy_index import TrigramIndex, covers
+
+_FIELDS = ("weight", "calories", "proteins", "fats", "carbohydrates", "fiber")
+_AMOUNT = r"(\d+(?:[.,]\d+)?)"
+_GRAMS = r"(?:\s*(?:g|gr|grams?|г|гр|грамм(?:а|ов)?)(?![a-zа-я])\.?)?"
+_TARGET = r"([^\d]*?)"
+
+_SPLIT_RE = re.compile(r",(?!\d)\s*|;\s*|\s+(?:and|и|also|а также|then|потом)\s+")
+_REMOVE_RE = re.compile(
+    r"^(?:please\s+|пожалуйста\s+)?"
+    r"(?:remove|delete|drop|exclude|without|no|убери|убрать|удали|удалить|исключи|исключить|без|не было)"
+    r"\s+(.+)$"
+)
+_INSTEAD_RE = re.compile(
+    rf"^(?:it was\s+|было\s+)?{_AMOUNT}{_GRAMS}\s*{_TARGET}"
+    rf"\s+(?:instead of|not|вместо|а не)\s+{_AMOUNT}{_GRAMS}\s*{_TARGET}$"
+)
+_SET_AFTER_RE = re.compile(rf"^{_TARGET}\s+(?:was\s+|is\s+|было\s+|весит\s+)?{_AMOUNT}{_GRAMS}$")
+_SET_BEFORE_RE = re.compile(rf"^{_AMOUNT}{_GRAMS}\s+(?:of\s+)?{_TARGET}$")
+_SCALE_WORDS = {
+    **dict.fromkeys(("double", "twice", "удвой", "удвоить", "двойная", "двойной", "двойную", "вдвое больше"), 2.0),
+    **dict.fromkeys(("triple", "утрой", "утроить", "тройная", "тройной", "тройную", "втрое больше"), 3.0),
+    **dict.fromkeys(("half", "halve", "половина", "половину", "вдвое меньше"), 0.5),
+}
+_SCALE_RE = re.compile(
+    r"^(" + "|".join(sorted(map(re.escape, _SCALE_WORDS), key=len, reverse=True)) + r")"
+    r"(?:\s+(?:the|of|of the|a|an|portion of|порция|порцию|порции))*(?:\s+(.*))?$"
+)
+# "add rice 100g" or "ещё рис 50 г" put more food on the plate, they are not new weights of what is there
+_ADDITIVE_RE = re.compile(
+    r"^\+|(?<![a-zа-я])(?:add|adding|added|plus|extra|more|another|additional|"
+    r"добавь|добавить|добавил|добавила|добавлю|плюс|еще|больше|дополнительно|сверху)(?![a-zа-я])"
+)
+_WHOLE_MEAL = frozenset(
+    ("", "it", "all", "portion", "the portion", "everything", "всё", "все", "порция", "порцию", "порции")
+)
+
+
+class ItemKey(NamedTuple):
+    product: int
+    ingredient: int | None
+
+
+class MealEditInterpreter:
+    """Applies mechanical meal edits locally: "remove bread", "150g instead of 200g", "double the rice"
+
+    Returns None for anything it can not parse or resolve unambiguously, so the caller asks the model.
+    """
+
+    def __init__(self, min_score: float, min_margin: float) -> None:
+        self.min_score = min_score
+        self.min_margin = min_margin
+
+    def apply(self, text: str, previous_result: dict | None) -> list[dict] | None:
+        if not previous_result or not previous_result.get("products"):
+            return None
+        products = deepcopy(previous_result["products"])
+        index = self._build_index(products)
+
+        for clause in _SPLIT_RE.split(text.strip().lower().replace("ё", "е").rstrip(".!")):
+            if not clause or not self._apply_clause(clause.strip(), products, index):
+                return None
+
+        result = []
+        for product in products:
+            if product is None:
+                continue
+            if "ingredients" in product and product["ingredients"]:
+                product["ingredients"] = [i for i in product["ingredients"] if i is not None]
+                if not product["ingredients"]:
+                    continue
+            result.append(product)
+        return result or None
+
+    @staticmethod
+    def _build_index(products: list[dict]) -> TrigramIndex[ItemKey]:
+        index = TrigramIndex[ItemKey]()
+        for product_id, product in enumerate(products):
+            for ingredient_id, ingredient in enumerate(product.get("ingredients") or ()):
+                if ingredient.get("name"):
+                    index.add(ingredient["name"], ItemKey(product_id, ingredient_id))
+            if product.get("name"):
+                index.add(product["name"], ItemKey(product_id, None))
+        return index
+
+    def _apply_clause(self, clause: str, products: list[dict | None], index: TrigramIndex[ItemKey]) -> bool:
+        if match := _REMOVE_RE.match(clause):
+            key = self._resolve(match.group(1), products, index)
+            return key is not None and self._remove(products, key)
+
+        if match := _INSTEAD_RE.match(clause):
+            new, target, old, other_target = match.groups()
+            new_weight, old_weight = _to_float(new), _to_float(old)
+            target = (target or other_target).strip()
+            if target:
+                key = self._resolve(target, products, index)
+            else:
+                key = self._find_by_weight(products, old_weight)
+            item = self._item(products, key) if key else None
+            if item is None or not item.get("weight"):
+                return False
+            return self._scale(products, key, new_weight / item["weight"])
+
+        if match := _SCALE_RE.match(clause):
+            factor, target = _SCALE_WORDS[match.group(1)], (match.group(2) or "").strip()
+            if target in _WHOLE_MEAL:
+                return all(
+                    self._scale(products, ItemKey(product_id, None), factor)
+                    for product_id, product in enumerate(products)
+                    if product is not None
+                )
+            key = self._resolve(target, products, index)
+            return key is not None and self._scale(products, key, factor)
+
+        for pattern, (target_group, amount_group) in ((_SET_AFTER_RE, (1, 2)), (_SET_BEFORE_RE, (2, 1))):
+            if match := pattern.match(clause):
+                key = self._resolve(match.group(target_group), products, index)
+                item = self._item(products, key) if key else None
+                if item is None or not item.get("weight"):
+                    return False
+                return self._scale(products, key, _to_float(match.group(amount_group)) / item["weight"])
+        return False
+
+    def _resolve(self, target: str, products: list[dict | None], index: TrigramIndex[ItemKey]) -> ItemKey | None:
+        target = re.sub(r"^(?:the|a|an|some|all|the whole)\s+", "", target.strip())
+        if not target or _ADDITIVE_RE.search(target):
+            return None
+        match = index.lookup(target, self.min_score, self.min_margin)
+        if match is None or self._item(products, match.key) is None:
+            return None
+        if not covers(match.alias, target, self.min_score):
+            return None
+        # "курица" is close to "Курица с рисом" too, a whole dish is only edited when named exactly
+        if match.key.ingredient is None and match.score < 1.0:
+            return None
+        return match.key
+
+    @staticmethod
+    def _find_by_weight(products: list[dict | None], weight: float) -> ItemKey | None:
+        candidates = []
+        for product_id, product in enumerate(products):
+            if product is None:
+                continue
+            if _same_weight(product.get("weight"), weight):
+                candidates.append(ItemKey(product_id, None))
+            for ingredient_id, ingredient in enumerate(product.get("ingredients") or ()):
+                if ingredient is not None and _same_weight(ingredient.get("weight"), weight):
+                    candidates.append(ItemKey(product_id, ingredient_id))
+        # A single-ingredient dish matches twice, the ingredient and the dish are the same thing
+        if len(candidates) == 2 and candidates[0].product == candidates[1].product:
+            return candidates[0]
+        return candidates[0] if len(candidates) == 1 else None
+
+    @staticmethod
+    def _item(products: list[dict | None], key: ItemKey) -> dict | None:
+        product = products[key.product]
+        if product is None or key.ingredient is None:
+            return product
+        return product["ingredients"][key.ingredient]
+
+    def _remove(self, products: list[dict | None], key: ItemKey) -> bool:
+        if key.ingredient is None:
+            products[key.product] = None
+            return True
+        product = products[key.product]
+        if not _has_macros(product["ingredients"][key.ingredient]):
+            return False
+        _add_delta(product, product["ingredients"][key.ingredient], {})
+        product["ingredients"][key.ingredient] = None
+        return True
+
+    def _scale(self, products: list[dict | None], key: ItemKey, factor: float) -> bool:
+        if factor <= 0:
+            return False
+        product = products[key.product]
+        if key.ingredient is None:
+            for item in (product, *(i for i in product.get("ingredients") or () if i is not None)):
+                for field in _FIELDS:
+                    if item.get(field) is not None:
+                        item[field] = round(item[field] * factor, 1)
+            return True
+
+        ingredient = product["ingredients"][key.ingredient]
+        if not _has_macros(ingredient):
+            return False
+        scaled = {field: round(ingredient[field] * factor, 1) for field in _FIELDS if ingredient.get(field) is not None}
+        _add_delta(product, ingredient, scaled)
+        ingredient.update(scaled)
+        return True
+
+
+def _add_delta(product: dict, old: dict, new: dict) -> None:
+    """Shift product totals by the ingredient change instead of re-summing, the model's totals may not add up"""
+    for field in _FIELDS:
+        if product.get(field) is not None and old.get(field) is not None:
+            product[field] = round(max(product[field] - old[field] + new.get(field, 0), 0), 1)
+
+
+def _has_macros(ingredient: dict) -> bool:
+    """A summarized previous result keeps only ingredient names and weights, totals can't be shifted then"""
+    return ingredient.get("calories") is not None
+
+
+def _same_weight(value: float | None, weight: float) -> bool:
+    return value is not None and abs(value - weight) < 0.5
+
+
+def _to_float(value: str) -> float:
+    return float(value.replace(",", "."))
+
+
+meal_edit_interpreter = MealEditInterpreter(
+    min_score=settings.MEAL_EDIT_MATCH_MIN_SCORE,
+    min_margin=settings.MEAL_EDIT_MATCH_MIN_MARGIN,
+)
@@ -1,31 +1,34 @@
 import base64
 from io import BytesIO
-import json
+from loguru import logger
 
-from src.core.config import settings
-from src.core.http.client import IHttpClient
 from src.task.domain.entities import TaskRun
-from src.integration.domain.dtos import IntegrationTaskStatus, IntegrationTaskResultDTO
-from src.core.http.api_client import HttpApiClient
-from src.integration.domain.schemas import OpenaiResponse, OutputText, StructuredData
+from src.integration.domain.dtos import IntegrationResultKind, IntegrationTaskStatus, IntegrationTaskResultDTO
+from src.integration.domain.schemas import meal_output_adapter, products_adapter
+from src.integration.infrastructure.openai_task_runner import OpenaiTaskRunner
+from src.integration.infrastructure.model_router import InputModality, ModelRouter
+from src.integration.infrastructure.meal_edit_interpreter import MealEditInterpreter
+from src.core.http.client import IHttpClient
 from src.task.application.interfaces.task_runner import ITaskRunner
 
 
-class OpenaiMealEditRecognitionTaskRunner(HttpApiClient, ITaskRunner[IntegrationTaskResultDTO]):
-    token: str = settings.OPENAI_API_TOKEN
-    api_url: str = "https://api.openai.com"
+class OpenaiMealEditRecognitionTaskRunner(OpenaiTaskRunner, ITaskRunner[IntegrationTaskResultDTO]):
+    runner_type: str = "meal_edit"
+    result_kind: IntegrationResultKind = IntegrationResultKind.products
 
-    def __init__(self, client: IHttpClient) -> None:
-        super().__init__(client=client, source_url=self.api_url, token=self.token)
+    def __init__(self, client: IHttpClient, router: ModelRouter, interpreter: MealEditInterpreter | None = None) -> None:
+        super().__init__(client, router)
+        self.interpreter = interpreter
 
-    def _make_payload(self, text: str, prompt: str) -> dict:
+    def _make_payload(self, previous_result: str, text: str, prompt: str, model: str) -> dict:
         payload = {
-            "model": "gpt-4.1-mini",
+            "model": model,
             "input": [
                 {
                     "role": "user",
                     "content": [
                         {"type": "input_text", "text": prompt},
+                        {"type": "input_text", "text": previous_result},
                         {"type": "input_text", "text": text}
                     ],
                 }
@@ -87,17 +90,22 @@ class OpenaiMealEditRecognitionTaskRunner(HttpApiClient, ITaskRunner[Integration
         if data.text is None:
             raise ValueError("Empty input")
 
-        payload = self._make_payload(data.text, MESSAGE_ANALYZE_PROMPT.format(language=data.language))
-        response = await self.request("POST", "/v1/responses", json=payload)
-        result = self.validate_response(response.data, OpenaiResponse)
+        if self.interpreter is not None and (result := self.interpreter.apply(data.text, data.previous_result)):
+            logger.info(f"Finished MealEditTask locally with {result=}")
+            return IntegrationTaskResultDTO(
+                status=IntegrationTaskStatus.finished,
+                kind=self.result_kind,
+                result=products_adapter.validate_python(result),
+            )
 
-        if not result.output:
-            raise ValueError("Empty output")
-        if not isinstance(result.output[0].content[0], OutputText):
-            raise ValueError(f"Unexpected content type in response: {type(result.output[0].content[0])}")
-        result = json.loads(result.output[0].content[0].text).get("dishes")
+        previous_result = self._dump_previous_result(data)
+        route = self._route(InputModality.text, len(previous_result) + len(data.text))
+        payload = self._make_payload(
+            previous_result, data.text, MESSAGE_ANALYZE_PROMPT.format(language=data.language), route.model
+        )
+        result = meal_output_adapter.validate_json(await self._request_output_text(payload)).dishes
 
-        return IntegrationTaskResultDTO(status=IntegrationTaskStatus.finished, result=result)
+        return IntegrationTaskResultDTO(status=IntegrationTaskStatus.finished, kind=self.result_kind, result=result)
 
 
 MESSAGE_ANALYZE_PROMPT = """
@@ -113,6 +121,8 @@ Modify the nutritional values (calories, proteins, fats, and carbohydrates) and
 
 Receive a JSON structure containing nutritional information for a dish and its ingredients. Accept user input to specify changes, which may include adding, removing, or replacing entire dishes or specific ingredients, along with recalculating their nutritional values. Implement these changes while ensuring the data remains correctly formatted.
 
+The first input after these instructions is the current data as compact JSON: `products` is the list of dishes, each with its `ingredients`. The second input is the user's correction.
+
 # Steps
 
 1. Obtain the JSON structure containing the nutritional information for the dish and its ingredients.
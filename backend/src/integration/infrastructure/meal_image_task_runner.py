@@ -1,30 +1,22 @@
-import base64
-from io import BytesIO
-import json
+from typing import BinaryIO
 
-from src.core.config import settings
-from src.core.http.client import IHttpClient
 from src.task.domain.entities import TaskRun
-from src.integration.domain.dtos import IntegrationTaskStatus, IntegrationTaskResultDTO
-from src.core.http.api_client import HttpApiClient
-from src.integration.domain.schemas import OpenaiResponse, OutputText, StructuredData
+from src.integration.domain.dtos import IntegrationResultKind, IntegrationTaskStatus, IntegrationTaskResultDTO
+from src.integration.domain.schemas import meal_output_adapter
+from src.core.http.streaming_body import StreamingJsonBody, file_size
+from src.integration.infrastructure.openai_task_runner import OpenaiTaskRunner
+from src.integration.infrastructure.model_router import InputModality
 from src.task.application.interfaces.task_runner import ITaskRunner
 
 
-class OpenaiMealImageTaskRunner(HttpApiClient, ITaskRunner[IntegrationTaskResultDTO]):
-    token: str = settings.OPENAI_API_TOKEN
-    api_url: str = "https://api.openai.com"
+class OpenaiMealImageTaskRunner(OpenaiTaskRunner, ITaskRunner[IntegrationTaskResultDTO]):
+    runner_type: str = "meal_image"
+    result_kind: IntegrationResultKind = IntegrationResultKind.products
 
-    def __init__(self, client: IHttpClient) -> None:
-        super().__init__(client=client, source_url=self.api_url, token=self.token)
-
-    def _encode_images(self, images: list[BytesIO]) -> list[str]:
-        return [base64.b64encode(image.read()).decode() for image in images]
-
-    def _make_payload(self, images: list[BytesIO], prompt: str) -> dict:
-        images_encoded = self._encode_images(images)
+    def _make_payload(self, markers: list[str], prompt: str, model: str) -> dict:
+        """Images are referenced by marker, their base64 is streamed into the request body"""
         payload = {
-            "model": "gpt-4.1-mini",
+            "model": model,
             "input": [
                 {
                     "role": "user",
@@ -32,8 +24,8 @@ class OpenaiMealImageTaskRunner(HttpApiClient, ITaskRunner[IntegrationTaskResult
                         {"type": "input_text", "text": prompt},
                     ]
                     + [
-                        {"type": "input_image", "image_url": f"data:image/jpeg;base64,{image}"}
-                        for image in images_encoded
+                        {"type": "input_image", "image_url": f"data:image/jpeg;base64,{marker}"}
+                        for marker in markers
                     ],
                 }
             ],
@@ -93,17 +85,14 @@ class OpenaiMealImageTaskRunner(HttpApiClient, ITaskRunner[IntegrationTaskResult
     async def start(self, data: TaskRun) -> IntegrationTaskResultDTO:
         if data.file is None:
             raise ValueError("Empty input")
-        payload = self._make_payload([data.file], MESSAGE_ANALYZE_PROMPT.replace("{language}", data.language))
-        response = await self.request("POST", "/v1/responses", json=payload)
-        result = self.validate_response(response.data, OpenaiResponse)
-
-        if not result.output:
-            raise ValueError("Empty output")
-        if not isinstance(result.output[0].content[0], OutputText):
-            raise ValueError(f"Unexpected content type in response: {type(result.output[0].content[0])}")
-        result = json.loads(result.output[0].content[0].text).get("dishes")
-
-        return IntegrationTaskResultDTO(status=IntegrationTaskStatus.finished, result=result)
+        route = self._route(InputModality.image, file_size(data.file))
+        files: dict[str, BinaryIO] = {StreamingJsonBody.new_marker(): data.file}
+        payload = self._make_payload(
+            list(files), MESSAGE_ANALYZE_PROMPT.replace("{language}", data.language), route.model
+        )
+        result = meal_output_adapter.validate_json(await self._request_output_text(payload, files)).dishes
+
+        return IntegrationTaskResultDTO(status=IntegrationTaskStatus.finished, kind=self.result_kind, result=result)
 
 
 MESSAGE_ANALYZE_PROMPT = """
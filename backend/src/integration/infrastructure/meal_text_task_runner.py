@@ -1,27 +1,36 @@
 import base64
 from io import BytesIO
-import json
 from loguru import logger
 
-from src.core.config import settings
-from src.core.http.client import IHttpClient
 from src.task.domain.entities import TaskRun
-from src.integration.domain.dtos import IntegrationTaskStatus, IntegrationTaskResultDTO
-from src.core.http.api_client import HttpApiClient
-from src.integration.domain.schemas import OpenaiResponse, OutputText, StructuredData
+from src.integration.domain.dtos import IntegrationResultKind, IntegrationTaskStatus, IntegrationTaskResultDTO
+from src.integration.domain.schemas import meal_output_adapter, products_adapter
+from src.integration.infrastructure.openai_task_runner import OpenaiTaskRunner
+from src.integration.infrastructure.model_router import InputModality, ModelRouter
+from src.integration.infrastructure.food_database import LocalMealRecognizer
+from src.integration.infrastructure.semantic_cache import SemanticCache
+from src.core.http.client import IHttpClient
 from src.task.application.interfaces.task_runner import ITaskRunner
 
 
-class OpenaiMealTextTaskRunner(HttpApiClient, ITaskRunner[IntegrationTaskResultDTO]):
-    token: str = settings.OPENAI_API_TOKEN
-    api_url: str = "https://api.openai.com"
+class OpenaiMealTextTaskRunner(OpenaiTaskRunner, ITaskRunner[IntegrationTaskResultDTO]):
+    runner_type: str = "meal_text"
+    result_kind: IntegrationResultKind = IntegrationResultKind.products
 
-    def __init__(self, client: IHttpClient) -> None:
-        super().__init__(client=client, source_url=self.api_url, token=self.token)
+    def __init__(
+        self,
+        client: IHttpClient,
+        router: ModelRouter,
+        recognizer: LocalMealRecognizer | None = None,
+        cache: SemanticCache | None = None,
+    ) -> None:
+        super().__init__(client, router)
+        self.recognizer = recognizer
+        self.cache = cache
 
-    def _make_payload(self, text: str, prompt: str) -> dict:
+    def _make_payload(self, text: str, prompt: str, model: str) -> dict:
         payload = {
-            "model": "gpt-4.1-mini",
+            "model": model,
             "input": [
                 {
                     "role": "user",
@@ -88,20 +97,39 @@ class OpenaiMealTextTaskRunner(HttpApiClient, ITaskRunner[IntegrationTaskResultD
         if data.text is None:
             raise ValueError("Empty input")
 
-        prompt = MESSAGE_ANALYZE_PROMPT.replace("{language}", data.language)
-        payload = self._make_payload(data.text, prompt)
-        response = await self.request("POST", "/v1/responses", json=payload)
-        result = self.validate_response(response.data, OpenaiResponse)
+        if self.recognizer is not None and (result := self.recognizer.recognize(data.text, data.language)):
+            logger.info(f"Finished MealTextTask locally with {result=}")
+            return IntegrationTaskResultDTO(
+                status=IntegrationTaskStatus.finished,
+                kind=self.result_kind,
+                result=products_adapter.validate_python(result),
+            )
+
+        vector = None
+        if self.cache is not None:
+            try:
+                [vector] = await self.cache.embed([data.text])
+            except Exception as e:
+                logger.warning(f"Semantic cache embedding failed: {e}")
+            else:
+                [result] = self.cache.search(vector[None, :], data.language, [data.text])
+                if result is not None:
+                    return IntegrationTaskResultDTO(
+                        status=IntegrationTaskStatus.finished,
+                        kind=self.result_kind,
+                        result=products_adapter.validate_python(result),
+                    )
 
-        if not result.output:
-            raise ValueError("Empty output")
-        if not isinstance(result.output[0].content[0], OutputText):
-            raise ValueError(f"Unexpected content type in response: {type(result.output[0].content[0])}")
-        result = json.loads(result.output[0].content[0].text).get("dishes")
+        prompt = MESSAGE_ANALYZE_PROMPT.replace("{language}", data.language)
+        route = self._route(InputModality.text, len(data.text))
+        payload = self._make_payload(data.text, prompt, route.model)
+        result = meal_output_adapter.validate_json(await self._request_output_text(payload)).dishes
 
         logger.info(f"Finished MealTextTask with {result=}")
+        if vector is not None and result:
+            self.cache.add(vector, data.language, data.text, products_adapter.dump_python(result, mode="json"))
 
-        return IntegrationTaskResultDTO(status=IntegrationTaskStatus.finished, result=result)
+        return IntegrationTaskResultDTO(status=IntegrationTaskStatus.finished, kind=self.result_kind, result=result)
 
 
 MESSAGE_ANALYZE_PROMPT = """
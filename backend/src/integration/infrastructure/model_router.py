@@ -0,0 +1,209 @@
+import time
+from enum import Enum
+from collections import deque
+from contextlib import asynccontextmanager
+
+import aiohttp
+import httpx
+from loguru import logger
+from pydantic import BaseModel
+from prometheus_client import Counter, Histogram
+
+from src.core.config import settings
+from src.core.http.exceptions import HttpApiRequestException
+
+MODEL_ROUTE_DECISIONS = Counter(
+    "openai_model_route_decisions_total",
+    "Model routing decisions made for runner calls",
+    ["runner", "model", "reason"],
+)
+MODEL_REQUEST_LATENCY = Histogram(
+    "openai_model_request_duration_seconds",
+    "Latency of OpenAI requests per model",
+    ["model", "outcome"],
+    buckets=(0.5, 1, 2, 3, 5, 8, 13, 21, 34, 55, 89, 144, 300),
+)
+
+
+class InputModality(str, Enum):
+    text = "text"
+    image = "image"
+    audio = "audio"
+
+
+class ModelRoute(BaseModel):
+    model: str
+    reason: str
+
+
+class ModelHealth:
+    """Circuit breaker and sliding latency window of a single model
+
+    Latencies older than `window_seconds` are dropped: a model routed around for being slow gets no new samples,
+    so it is tried again once its old ones expire.
+
+    `reset_seconds` after opening the circuit is half-open: `half_open_probes` requests go to the model, the others
+    are routed around it until a probe answers. Probes that never report back free their slots after another
+    `reset_seconds`.
+    """
+
+    MIN_SAMPLES = 20
+
+    def __init__(
+        self,
+        failure_threshold: int,
+        reset_seconds: float,
+        window_seconds: float,
+        half_open_probes: int = 1,
+        window_size: int = 200,
+    ) -> None:
+        self.failure_threshold = failure_threshold
+        self.reset_seconds = reset_seconds
+        self.window_seconds = window_seconds
+        self.half_open_probes = half_open_probes
+        self.latencies: deque[tuple[float, float]] = deque(maxlen=window_size)
+        self.consecutive_failures = 0
+        self.opened_at: float | None = None
+        self.probes = 0
+        self.probes_started_at: float | None = None
+
+    def _probes_in_flight(self, now: float) -> int:
+        if self.probes_started_at is None or now - self.probes_started_at >= self.reset_seconds:
+            return 0
+        return self.probes
+
+    def is_open(self) -> bool:
+        if self.opened_at is None:
+            return False
+        now = time.monotonic()
+        if now - self.opened_at < self.reset_seconds:
+            return True
+        return self._probes_in_flight(now) >= self.half_open_probes
+
+    def start_request(self) -> None:
+        """A request routed to the model, while half-open it takes a probe slot"""
+        if self.opened_at is None:
+            return
+        now = time.monotonic()
+        probes = self._probes_in_flight(now)
+        if not probes:
+            self.probes_started_at = now
+        self.probes = probes + 1
+
+    def p95(self) -> float | None:
+        expired_at = time.monotonic() - self.window_seconds
+        while self.latencies and self.latencies[0][0] < expired_at:
+            self.latencies.popleft()
+        if len(self.latencies) < self.MIN_SAMPLES:
+            return None
+        ordered = sorted(duration for _, duration in self.latencies)
+        return ordered[int(len(ordered) * 0.95) - 1]
+
+    def record_success(self, duration: float) -> None:
+        self.latencies.append((time.monotonic(), duration))
+        self.consecutive_failures = 0
+        self.opened_at = None
+        self.probes, self.probes_started_at = 0, None
+
+    def record_failure(self, duration: float) -> None:
+        self.latencies.append((time.monotonic(), duration))
+        self.consecutive_failures += 1
+        if self.consecutive_failures >= self.failure_threshold:
+            self.opened_at = time.monotonic()
+            self.probes, self.probes_started_at = 0, None
+
+
+class ModelRouter:
+    def __init__(
+        self,
+        primary_model: str,
+        light_model: str,
+        fallback_model: str,
+        light_max_input: dict[str, int],
+        p95_budget_seconds: float,
+        failure_threshold: int,
+        reset_seconds: float,
+        latency_window_seconds: float,
+        half_open_probes: int,
+    ) -> None:
+        self.primary_model = primary_model
+        self.light_model = light_model
+        self.fallback_model = fallback_model
+        self.light_max_input = light_max_input
+        self.p95_budget_seconds = p95_budget_seconds
+        self.failure_threshold = failure_threshold
+        self.reset_seconds = reset_seconds
+        self.latency_window_seconds = latency_window_seconds
+        self.half_open_probes = half_open_probes
+        self._health: dict[str, ModelHealth] = {}
+
+    def health(self, model: str) -> ModelHealth:
+        if model not in self._health:
+            self._health[model] = ModelHealth(
+                self.failure_threshold, self.reset_seconds, self.latency_window_seconds, self.half_open_probes
+            )
+        return self._health[model]
+
+    def choose(self, runner: str, modality: InputModality, input_size: int) -> ModelRoute:
+        preferred, reason = self.primary_model, "default"
+        if modality == InputModality.text and input_size <= self.light_max_input.get(runner, -1):
+            preferred, reason = self.light_model, "small_input"
+
+        for model in dict.fromkeys((preferred, self.primary_model, self.fallback_model)):
+            unhealthy_reason = self._unhealthy_reason(model)
+            if unhealthy_reason is None:
+                break
+            reason = f"{model}_{unhealthy_reason}"
+        else:
+            model, reason = preferred, "all_unhealthy"
+
+        self.health(model).start_request()
+        if model != preferred:
+            logger.warning(f"Routing {runner} to {model} instead of {preferred}: {reason}")
+        MODEL_ROUTE_DECISIONS.labels(runner=runner, model=model, reason=reason).inc()
+        return ModelRoute(model=model, reason=reason)
+
+    def _unhealthy_reason(self, model: str) -> str | None:
+        health = self.health(model)
+        if health.is_open():
+            return "circuit_open"
+        p95 = health.p95()
+        if p95 is not None and p95 > self.p95_budget_seconds:
+            return "p95_over_budget"
+        return None
+
+    @asynccontextmanager
+    async def track(self, model: str):
+        started_at = time.perf_counter()
+        try:
+            yield
+        except BaseException as e:
+            duration = time.perf_counter() - started_at
+            # A rejected request (400, 401, a bad payload) or a cancelled task says nothing about the model
+            if _is_model_failure(e):
+                self.health(model).record_failure(duration)
+            MODEL_REQUEST_LATENCY.labels(model=model, outcome="error").observe(duration)
+            raise
+        duration = time.perf_counter() - started_at
+        self.health(model).record_success(duration)
+        MODEL_REQUEST_LATENCY.labels(model=model, outcome="ok").observe(duration)
+
+
+def _is_model_failure(error: BaseException) -> bool:
+    """Timeouts, dropped connections, 5xx and 429"""
+    if isinstance(error, HttpApiRequestException):
+        return error.status is not None and (error.status >= 500 or error.status == 429)
+    return isinstance(error, (TimeoutError, aiohttp.ClientConnectionError, httpx.TransportError))
+
+
+model_router = ModelRouter(
+    primary_model=settings.OPENAI_MODEL_PRIMARY,
+    light_model=settings.OPENAI_MODEL_LIGHT,
+    fallback_model=settings.OPENAI_MODEL_FALLBACK,
+    light_max_input=settings.OPENAI_MODEL_LIGHT_MAX_INPUT,
+    p95_budget_seconds=settings.OPENAI_MODEL_P95_BUDGET_SECONDS,
+    failure_threshold=settings.OPENAI_MODEL_CIRCUIT_FAILURES,
+    reset_seconds=settings.OPENAI_MODEL_CIRCUIT_RESET_SECONDS,
+    latency_window_seconds=settings.OPENAI_MODEL_LATENCY_WINDOW_SECONDS,
+    half_open_probes=settings.OPENAI_MODEL_CIRCUIT_HALF_OPEN_PROBES,
+)
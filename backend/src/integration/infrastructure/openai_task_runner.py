@@ -0,0 +1,46 @@
+from typing import BinaryIO
+
+from src.core import json_codec
+from src.core.config import settings
+from src.core.http.client import IHttpClient
+from src.core.http.api_client import HttpApiClient
+from src.core.http.streaming_body import StreamingJsonBody
+from src.integration.domain.dtos import IntegrationResultKind
+from src.integration.domain.schemas import OutputText, openai_output_adapter
+from src.task.domain.entities import TaskRun
+from src.integration.infrastructure.model_router import ModelRouter, InputModality, ModelRoute
+
+
+class OpenaiTaskRunner(HttpApiClient):
+    token: str = settings.OPENAI_API_TOKEN
+    api_url: str = "https://api.openai.com"
+    runner_type: str
+    result_kind: IntegrationResultKind
+
+    def __init__(self, client: IHttpClient, router: ModelRouter) -> None:
+        super().__init__(client=client, source_url=self.api_url, token=self.token)
+        self.router = router
+
+    def _route(self, modality: InputModality, input_size: int) -> ModelRoute:
+        return self.router.choose(self.runner_type, modality, input_size)
+
+    @staticmethod
+    def _dump_previous_result(data: TaskRun) -> str:
+        """Compact canonical JSON, so repeated edits of one task produce identical prompts"""
+        return json_codec.dumps_str(data.previous_result or {}, sort_keys=True)
+
+    async def _request_output_text(self, payload: dict, files: dict[str, BinaryIO] | None = None) -> str:
+        """`files` are streamed into the payload in place of their markers, see StreamingJsonBody"""
+        async with self.router.track(payload["model"]):
+            if files:
+                body = StreamingJsonBody(payload, files)
+                content = await self.request_content("POST", "/v1/responses", content=body.chunks(), headers=body.headers)
+            else:
+                content = await self.request_content("POST", "/v1/responses", json=payload)
+        result = self.validate_content(content, openai_output_adapter)
+
+        if not result.output:
+            raise ValueError("Empty output")
+        if not isinstance(result.output[0].content[0], OutputText):
+            raise ValueError(f"Unexpected content type in response: {type(result.output[0].content[0])}")
+        return result.output[0].content[0].text
@@ -0,0 +1,233 @@
+import os
+import re
+import fcntl
+from pathlib import Path
+
+import numpy as np
+from loguru import logger
+from prometheus_client import Counter
+
+from src.core import json_codec
+from src.core.config import settings
+from src.core.http.dependencies import get_http_client
+from src.integration.infrastructure.embeddings import IEmbedder, HashingEmbedder, OpenaiEmbedder
+
+semantic_cache_lookups = Counter("semantic_cache_lookups_total", "Meal text semantic cache lookups", ["result"])
+
+_TOKEN_RE = re.compile(r"\d+(?:[.,]\d+)?|[a-zа-я]+")
+_NUMBER_WORDS = {
+    **dict.fromkeys(("one", "один", "одна", "одно", "одну"), "1"),
+    **dict.fromkeys(("two", "два", "две", "пара", "пару"), "2"),
+    **dict.fromkeys(("three", "три"), "3"),
+    **dict.fromkeys(("four", "четыре"), "4"),
+    **dict.fromkeys(("five", "пять"), "5"),
+    **dict.fromkeys(("half", "половина", "половину", "пол"), "0.5"),
+}
+_UNITS = {
+    **dict.fromkeys(("g", "gr", "gram", "grams", "г", "гр", "грамм", "грамма", "граммов"), "g"),
+    **dict.fromkeys(("kg", "кг", "килограмм"), "kg"),
+    **dict.fromkeys(("ml", "мл", "миллилитров"), "ml"),
+    **dict.fromkeys(("l", "л", "литр", "литра", "литров"), "l"),
+}
+
+
+def quantities(text: str) -> tuple[tuple[float, str], ...]:
+    """Amounts of a meal text with their units: "200g rice and two eggs" -> ((2.0, ""), (200.0, "g"))
+
+    Embeddings barely tell "2 eggs" from "3 eggs", so a hit also needs the same amounts.
+    """
+    tokens = _TOKEN_RE.findall(text.lower().replace("ё", "е"))
+    result = []
+    for token, following in zip(tokens, tokens[1:] + [""], strict=True):
+        number = _NUMBER_WORDS.get(token, token)
+        if number[0].isdigit():
+            result.append((float(number.replace(",", ".")), _UNITS.get(following, "")))
+    return tuple(sorted(result))
+
+
+class VectorIndex:
+    """Fixed-capacity matrix of unit float32 vectors in a memory-mapped .npy file
+
+    Payloads live in an append-only JSONL log next to it, replayed on start. Slots and the log are not shared
+    between processes: the app runs as one gunicorn worker (`-w 1`), and any other process opening the same
+    files gets a read-only view of what was there on start and does not add to it.
+    """
+
+    SEARCH_BLOCK_ROWS = 8192
+
+    def __init__(self, path: Path, capacity: int, dimensions: int) -> None:
+        self.capacity = capacity
+        self.dimensions = dimensions
+        self._matrix_path = path.with_suffix(".npy")
+        self._log_path = path.with_suffix(".jsonl")
+        self._payloads: list[dict | None] = [None] * capacity
+        self._occupied = np.zeros(capacity, dtype=bool)
+        self._last_used = np.zeros(capacity, dtype=np.int64)
+        self._clock = 0
+
+        os.makedirs(path.parent, exist_ok=True)
+        self._lock = open(path.with_suffix(".lock"), "a")
+        try:
+            fcntl.flock(self._lock, fcntl.LOCK_EX | fcntl.LOCK_NB)
+            self.writable = True
+        except BlockingIOError:
+            logger.warning(f"Semantic cache {path} is written by another process, opening it read-only")
+            self.writable = False
+        self._matrix = self._open_matrix()
+        self._replay_log()
+        self._log = open(self._log_path, "a", encoding="utf-8") if self.writable else None
+
+    def __len__(self) -> int:
+        return int(self._occupied.sum())
+
+    def _open_matrix(self) -> np.memmap:
+        if not self.writable and self._matrix_path.exists():
+            return np.load(self._matrix_path, mmap_mode="r")
+        if self._matrix_path.exists():
+            matrix = np.load(self._matrix_path, mmap_mode="r+")
+            if matrix.shape == (self.capacity, self.dimensions) and matrix.dtype == np.float32:
+                return matrix
+            logger.warning(f"Semantic cache {self._matrix_path} has shape {matrix.shape}, rebuilding")
+            del matrix
+            self._log_path.unlink(missing_ok=True)
+        return np.lib.format.open_memmap(
+            self._matrix_path, mode="w+", dtype=np.float32, shape=(self.capacity, self.dimensions)
+        )
+
+    def _replay_log(self) -> None:
+        if not self._log_path.exists():
+            return
+        lines = 0
+        with open(self._log_path, encoding="utf-8") as f:
+            for line in f:
+                lines += 1
+                try:
+                    record = json_codec.loads(line)
+                except json_codec.JSONDecodeError:
+                    continue  # torn last line after a crash
+                slot = record["slot"]
+                if slot < self.capacity:
+                    self._payloads[slot] = record["payload"]
+                    self._occupied[slot] = True
+                    self._touch(slot)
+        if lines > 2 * self.capacity and self.writable:
+            self._compact_log()
+
+    def _compact_log(self) -> None:
+        tmp_path = self._log_path.with_suffix(".jsonl.tmp")
+        order = np.argsort(self._last_used)
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            for slot in order[self._occupied[order]]:
+                f.write(json_codec.dumps_str({"slot": int(slot), "payload": self._payloads[slot]}) + "\n")
+        os.replace(tmp_path, self._log_path)
+
+    def _touch(self, slot: int) -> None:
+        self._clock += 1
+        self._last_used[slot] = self._clock
+
+    def search(self, queries: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+        """Best slot and cosine similarity per query row, slot -1 when the index is empty"""
+        best_slots = np.full(len(queries), -1, dtype=np.int64)
+        best_scores = np.full(len(queries), -np.inf, dtype=np.float32)
+        occupied = np.flatnonzero(self._occupied)
+        if not len(occupied):
+            return best_slots, best_scores
+
+        upper = int(occupied[-1]) + 1
+        for start in range(0, upper, self.SEARCH_BLOCK_ROWS):
+            stop = min(start + self.SEARCH_BLOCK_ROWS, upper)
+            scores = queries @ self._matrix[start:stop].T
+            scores[:, ~self._occupied[start:stop]] = -np.inf
+            block_best = scores.argmax(axis=1)
+            block_scores = scores[np.arange(len(queries)), block_best]
+            improved = block_scores > best_scores
+            best_slots[improved] = block_best[improved] + start
+            best_scores[improved] = block_scores[improved]
+        return best_slots, best_scores
+
+    def get(self, slot: int) -> dict | None:
+        self._touch(slot)
+        return self._payloads[slot]
+
+    def add(self, vector: np.ndarray, payload: dict) -> int | None:
+        if not self.writable:
+            return None
+        free = np.flatnonzero(~self._occupied)
+        slot = int(free[0]) if len(free) else int(self._last_used.argmin())
+        self._matrix[slot] = vector
+        self._payloads[slot] = payload
+        self._occupied[slot] = True
+        self._touch(slot)
+        self._log.write(json_codec.dumps_str({"slot": slot, "payload": payload}) + "\n")
+        self._log.flush()
+        return slot
+
+    def close(self) -> None:
+        if self.writable:
+            self._matrix.flush()
+            self._log.close()
+        self._lock.close()
+
+
+class SemanticCache:
+    """Finished meal text results keyed by input embedding, one index per answer language"""
+
+    def __init__(self, embedder: IEmbedder, directory: str | Path, capacity: int, threshold: float) -> None:
+        self.embedder = embedder
+        self.directory = Path(directory)
+        self.capacity = capacity
+        self.threshold = threshold
+        self._indexes: dict[str, VectorIndex] = {}
+
+    def _index(self, language: str) -> VectorIndex:
+        if language not in self._indexes:
+            self._indexes[language] = VectorIndex(
+                self.directory / f"meal_text_{language}", self.capacity, self.embedder.dimensions
+            )
+        return self._indexes[language]
+
+    async def embed(self, texts: list[str]) -> np.ndarray:
+        vectors = await self.embedder.embed(texts)
+        norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+        return vectors / np.where(norms == 0, 1, norms)
+
+    def search(self, vectors: np.ndarray, language: str, texts: list[str]) -> list[list[dict] | None]:
+        index = self._index(language)
+        slots, scores = index.search(vectors)
+        results = []
+        for slot, score, text in zip(slots, scores, texts, strict=True):
+            if slot < 0 or score < self.threshold:
+                semantic_cache_lookups.labels(result="miss").inc()
+                results.append(None)
+                continue
+            payload = index.get(int(slot))
+            if quantities(payload["text"]) != quantities(text):
+                semantic_cache_lookups.labels(result="quantity_mismatch").inc()
+                results.append(None)
+                continue
+            semantic_cache_lookups.labels(result="hit").inc()
+            logger.info(f"Semantic cache hit with {score=:.3f}")
+            results.append(payload["result"])
+        return results
+
+    def add(self, vector: np.ndarray, language: str, text: str, result: list[dict]) -> None:
+        self._index(language).add(vector, {"text": text, "result": result})
+
+    def close(self) -> None:
+        for index in self._indexes.values():
+            index.close()
+        self._indexes.clear()
+
+
+def _make_embedder() -> IEmbedder:
+    if settings.SEMANTIC_CACHE_EMBEDDER == "hashing":
+        return HashingEmbedder(settings.SEMANTIC_CACHE_DIMENSIONS)
+    return OpenaiEmbedder(get_http_client(), settings.SEMANTIC_CACHE_DIMENSIONS)
+
+
+semantic_cache = SemanticCache(
+    _make_embedder(),
+    settings.SEMANTIC_CACHE_PATH,
+    capacity=settings.SEMANTIC_CACHE_CAPACITY,
+    threshold=settings.SEMANTIC_CACHE_THRESHOLD,
+)
@@ -0,0 +1,152 @@
+import re
+import csv
+from typing import NamedTuple
+from pathlib import Path
+
+from loguru import logger
+
+from src.core.config import settings
+from src.integration.domain.dtos import IntegrationUserProfileDTO
+from src.integration.infrastructure.fuzzy_index import TrigramIndex, covers
+
+ACTIVITIES_SOURCE_PATH = Path(__file__).parent / "data" / "activities.tsv"
+
+
+class Activity(NamedTuple):
+    name_en: str
+    name_ru: str
+    met: float
+
+
+class ActivityTable:
+    """MET values from the Compendium of Physical Activities with ru/en aliases"""
+
+    def __init__(self, activities: list[Activity], index: TrigramIndex[int]) -> None:
+        self.activities = activities
+        self.index = index
+
+    @classmethod
+    def load(cls, source_path: str | Path) -> "ActivityTable":
+        with open(source_path, encoding="utf-8", newline="") as f:
+            rows = list(csv.DictReader(f, delimiter="\t"))
+
+        index = TrigramIndex[int]()
+        activities = []
+        for activity_id, row in enumerate(rows):
+            activities.append(Activity(row["name_en"], row["name_ru"], float(row["met"])))
+            for alias in (row["name_en"], row["name_ru"], *filter(None, row["aliases"].split("|"))):
+                index.add(alias, activity_id)
+        logger.info(f"Loaded activity table: {len(activities)} activities, {len(index)} aliases")
+        return cls(activities, index)
+
+
+class ParsedSportInput(NamedTuple):
+    activity: str
+    minutes: float
+
+
+_COMPOUND_RE = re.compile(r",(?!\d)|[;+&\n]|\b(?:and|then|plus|и|потом|затем|also|также)\b", re.IGNORECASE)
+_NOT_LETTER = r"(?![a-zа-яё])"
+_HOURS_RE = re.compile(rf"(\d+(?:[.,]\d+)?)\s*(?:hours|hour|hrs|hr|h|часов|часа|час|ч){_NOT_LETTER}\.?")
+_MINUTES_RE = re.compile(rf"(\d+)\s*(?:minutes|minute|mins|min|минуты|минуту|минут|мин){_NOT_LETTER}\.?")
+_DURATION_WORDS = {
+    "half an hour": 30,
+    "half hour": 30,
+    "полчаса": 30,
+    "полтора часа": 90,
+    "an hour": 60,
+    "one hour": 60,
+    "час": 60,
+}
+_STOP_WORDS = frozenset(
+    (
+        "i", "did", "do", "went", "go", "was", "were", "have", "had", "been", "for", "of", "the", "a", "an", "about",
+        "around", "approximately", "minutes", "today", "я", "в", "во", "течение", "около", "примерно", "сегодня",
+        "сделал", "сделала", "занимался", "занималась", "занимаюсь", "ходил", "ходила", "на", "по",
+    )
+)
+_MAX_MINUTES = 600
+
+
+def parse_sport_input(text: str) -> ParsedSportInput | None:
+    """Single activity with a duration: "running 30 minutes", "1h30min cycling", "полчаса йоги" """
+    text = text.strip().lower().replace("ё", "е")
+    if not text or _COMPOUND_RE.search(text):
+        return None
+
+    minutes = 0.0
+    for pattern, factor in ((_HOURS_RE, 60), (_MINUTES_RE, 1)):
+        for match in pattern.finditer(text):
+            minutes += float(match.group(1).replace(",", ".")) * factor
+        text = pattern.sub(" ", text)
+    if minutes == 0:
+        for phrase, phrase_minutes in _DURATION_WORDS.items():
+            if re.search(rf"\b{phrase}\b", text):
+                minutes = phrase_minutes
+                text = re.sub(rf"\b{phrase}\b", " ", text)
+                break
+    if not 0 < minutes <= _MAX_MINUTES or re.search(r"\d", text):
+        return None
+
+    words = [word for word in re.findall(r"[a-zа-я-]+", text) if word not in _STOP_WORDS]
+    if not words:
+        return None
+    return ParsedSportInput(activity=" ".join(words), minutes=minutes)
+
+
+def estimate_weight(profile: IntegrationUserProfileDTO | None) -> float:
+    """Users have no weight field, so take a typical BMI for the height and gender"""
+    gender = profile.gender if profile else None
+    if profile is None or not profile.height:
+        return {"m": 80.0, "f": 65.0}.get(gender, 72.0)
+    bmi = {"m": 24.5, "f": 22.5}.get(gender, 23.5)
+    return bmi * (profile.height / 100) ** 2
+
+
+def calories_per_minute(met: float, profile: IntegrationUserProfileDTO | None) -> float:
+    weight = estimate_weight(profile)
+    if profile is None or profile.gender is None or not profile.age or not profile.height:
+        return met * 3.5 * weight / 200
+    # Mifflin-St Jeor resting rate instead of the 3.5 ml/kg/min standard adult
+    resting = 10 * weight + 6.25 * profile.height - 5 * profile.age + (5 if profile.gender == "m" else -161)
+    return met * resting / 1440
+
+
+class LocalSportRecognizer:
+    """Computes calories for simple single-activity inputs from the MET table, None means "ask the model"
+
+    Answered locally only when the input is one duration ("30 minutes", "1h30min", "полчаса") and words that all
+    name a single table activity: "1h30min cycling", "бегала 30 минут". The table's MET is the activity at a
+    usual pace, so anything qualifying it goes to the model: intensity words ("easy cycling", "бег трусцой"),
+    distances and speeds ("ran 5 km", "running 30 minutes at 15 km/h"), exercises the table does not have
+    ("bench press 45 min") and several activities in one input.
+    """
+
+    def __init__(self, table: ActivityTable, min_score: float, min_margin: float) -> None:
+        self.table = table
+        self.min_score = min_score
+        self.min_margin = min_margin
+
+    def recognize(self, text: str, language: str, profile: IntegrationUserProfileDTO | None) -> list[dict] | None:
+        parsed = parse_sport_input(text)
+        if parsed is None:
+            return None
+        match = self.table.index.lookup(parsed.activity, self.min_score, self.min_margin)
+        if match is None or not covers(match.alias, parsed.activity, self.min_score):
+            return None
+
+        activity = self.table.activities[match.key]
+        return [
+            {
+                "name": activity.name_ru if language == "russian" else activity.name_en,
+                "length": round(parsed.minutes * 60),
+                "calories": round(calories_per_minute(activity.met, profile) * parsed.minutes, 1),
+            }
+        ]
+
+
+local_sport_recognizer = LocalSportRecognizer(
+    ActivityTable.load(ACTIVITIES_SOURCE_PATH),
+    min_score=settings.SPORT_MATCH_MIN_SCORE,
+    min_margin=settings.SPORT_MATCH_MIN_MARGIN,
+)
@@ -1,31 +1,27 @@
 import base64
 from io import BytesIO
-import json
 
-from src.core.config import settings
-from src.core.http.client import IHttpClient
 from src.task.domain.entities import TaskRun
-from src.integration.domain.dtos import IntegrationTaskStatus, IntegrationTaskResultDTO
-from src.core.http.api_client import HttpApiClient
-from src.integration.domain.schemas import OpenaiResponse, OutputText, StructuredData
+from src.integration.domain.dtos import IntegrationResultKind, IntegrationTaskStatus, IntegrationTaskResultDTO
+from src.integration.domain.schemas import sport_output_adapter
+from src.integration.infrastructure.openai_task_runner import OpenaiTaskRunner
+from src.integration.infrastructure.model_router import InputModality
 from src.task.application.interfaces.task_runner import ITaskRunner
 
 
-class OpenaiSportEditRecognitionTaskRunner(HttpApiClient, ITaskRunner[IntegrationTaskResultDTO]):
-    token: str = settings.OPENAI_API_TOKEN
-    api_url: str = "https://api.openai.com"
+class OpenaiSportEditRecognitionTaskRunner(OpenaiTaskRunner, ITaskRunner[IntegrationTaskResultDTO]):
+    runner_type: str = "sport_edit"
+    result_kind: IntegrationResultKind = IntegrationResultKind.sports
 
-    def __init__(self, client: IHttpClient) -> None:
-        super().__init__(client=client, source_url=self.api_url, token=self.token)
-
-    def _make_payload(self, text: str, prompt: str) -> dict:
+    def _make_payload(self, previous_result: str, text: str, prompt: str, model: str) -> dict:
         payload = {
-            "model": "gpt-4.1-mini",
+            "model": model,
             "input": [
                 {
                     "role": "user",
                     "content": [
                         {"type": "input_text", "text": prompt},
+                        {"type": "input_text", "text": previous_result},
                         {"type": "input_text", "text": text}
                     ],
                 }
@@ -66,17 +62,14 @@ class OpenaiSportEditRecognitionTaskRunner(HttpApiClient, ITaskRunner[Integratio
         if data.text is None:
             raise ValueError("Empty input")
 
-        payload = self._make_payload(data.text, MESSAGE_ANALYZE_PROMPT.replace("{language}", data.language))
-        response = await self.request("POST", "/v1/responses", json=payload)
-        result = self.validate_response(response.data, OpenaiResponse)
-
-        if not result.output:
-            raise ValueError("Empty output")
-        if not isinstance(result.output[0].content[0], OutputText):
-            raise ValueError(f"Unexpected content type in response: {type(result.output[0].content[0])}")
-        result = json.loads(result.output[0].content[0].text).get("sports")
+        previous_result = self._dump_previous_result(data)
+        route = self._route(InputModality.text, len(previous_result) + len(data.text))
+        payload = self._make_payload(
+            previous_result, data.text, MESSAGE_ANALYZE_PROMPT.replace("{language}", data.language), route.model
+        )
+        result = sport_output_adapter.validate_json(await self._request_output_text(payload)).sports
 
-        return IntegrationTaskResultDTO(status=IntegrationTaskStatus.finished, result=result)
+        return IntegrationTaskResultDTO(status=IntegrationTaskStatus.finished, kind=self.result_kind, result=result)
 
 
 MESSAGE_ANALYZE_PROMPT = """
@@ -90,6 +83,8 @@ Modify the calories values or sports composition. Update is based on user input
 
 Receive a JSON structure containing calories information for a sport. Accept user input to specify changes, which may include adding, removing, or replacing entire sport, along with recalculating their calories values. Implement these changes while ensuring the data remains correctly formatted.
 
+The first input after these instructions is the current data as compact JSON with a `sports` list. The second input is the user's correction.
+
 # Steps
 
 1. Obtain the JSON structure containing the nutritional information for the dish and its ingredients.
@@ -1,26 +1,28 @@
 import base64
 from io import BytesIO
-import json
+from loguru import logger
 
-from src.core.config import settings
-from src.core.http.client import IHttpClient
 from src.task.domain.entities import TaskRun
-from src.integration.domain.dtos import IntegrationTaskStatus, IntegrationTaskResultDTO
-from src.core.http.api_client import HttpApiClient
-from src.integration.domain.schemas import OpenaiResponse, OutputText, StructuredData
+from src.integration.domain.dtos import IntegrationResultKind, IntegrationTaskStatus, IntegrationTaskResultDTO
+from src.integration.domain.schemas import sport_output_adapter, sports_adapter
+from src.integration.infrastructure.openai_task_runner import OpenaiTaskRunner
+from src.integration.infrastructure.model_router import InputModality, ModelRouter
+from src.integration.infrastructure.sport_calculator import LocalSportRecognizer
+from src.core.http.client import IHttpClient
 from src.task.application.interfaces.task_runner import ITaskRunner
 
 
-class OpenaiSportTextTaskRunner(HttpApiClient, ITaskRunner[IntegrationTaskResultDTO]):
-    token: str = settings.OPENAI_API_TOKEN
-    api_url: str = "https://api.openai.com"
+class OpenaiSportTextTaskRunner(OpenaiTaskRunner, ITaskRunner[IntegrationTaskResultDTO]):
+    runner_type: str = "sport_text"
+    result_kind: IntegrationResultKind = IntegrationResultKind.sports
 
-    def __init__(self, client: IHttpClient) -> None:
-        super().__init__(client=client, source_url=self.api_url, token=self.token)
+    def __init__(self, client: IHttpClient, router: ModelRouter, recognizer: LocalSportRecognizer | None = None) -> None:
+        super().__init__(client, router)
+        self.recognizer = recognizer
 
-    def _make_payload(self, text: str, prompt: str) -> dict:
+    def _make_payload(self, text: str, prompt: str, model: str) -> dict:
         payload = {
-            "model": "gpt-4.1-mini",
+            "model": model,
             "input": [
                 {
                     "role": "user",
@@ -66,17 +68,21 @@ class OpenaiSportTextTaskRunner(HttpApiClient, ITaskRunner[IntegrationTaskResult
         if data.text is None:
             raise ValueError("Empty input")
 
-        payload = self._make_payload(data.text, MESSAGE_ANALYZE_PROMPT.replace("{language}", data.language))
-        response = await self.request("POST", "/v1/responses", json=payload)
-        result = self.validate_response(response.data, OpenaiResponse)
-
-        if not result.output:
-            raise ValueError("Empty output")
-        if not isinstance(result.output[0].content[0], OutputText):
-            raise ValueError(f"Unexpected content type in response: {type(result.output[0].content[0])}")
-        result = json.loads(result.output[0].content[0].text).get("sports")
-
-        return IntegrationTaskResultDTO(status=IntegrationTaskStatus.finished, result=result)
+        if self.recognizer is not None and (result := self.recognizer.recognize(data.text, data.language, data.profile)):
+            logger.info(f"Finished SportTextTask locally with {result=}")
+            return IntegrationTaskResultDTO(
+                status=IntegrationTaskStatus.finished,
+                kind=self.result_kind,
+                result=sports_adapter.validate_python(result),
+            )
+
+        route = self._route(InputModality.text, len(data.text))
+        payload = self._make_payload(
+            data.text, MESSAGE_ANALYZE_PROMPT.replace("{language}", data.language), route.model
+        )
+        result = sport_output_adapter.validate_json(await self._request_output_text(payload)).sports
+
+        return IntegrationTaskResultDTO(status=IntegrationTaskStatus.finished, kind=self.result_kind, result=result)
 
 
 MESSAGE_ANALYZE_PROMPT = """
@@ -1,22 +1,62 @@
-from fastapi import FastAPI
+import asyncio
+from contextlib import asynccontextmanager
 
-from src.db.engine import engine
+from fastapi import Depends, FastAPI, Response
+from prometheus_client import CONTENT_TYPE_LATEST, generate_latest
+
+from src.core.auth import verify_api_token
+from src.core.config import settings
+from src.core.http.dependencies import get_http_client_class
+from src.core.responses import FastJSONResponse
+from src.db.engine import replica_engine
+from src.db.replica import admin_session_maker, replica_router
+from src.integration.infrastructure.food_database import get_local_meal_recognizer
+from src.integration.infrastructure.semantic_cache import semantic_cache
 from src.task.api.rest import router as task_router
 from src.user.api.rest import router as user_router
 import src.core.logging_setup
 from src.core.logging_setup import setup_fastapi_logging
 
-app = FastAPI(title="Calories API")
+
+@asynccontextmanager
+async def lifespan(_: FastAPI):
+    http_client = get_http_client_class()
+    await http_client.open_clients()
+    await asyncio.to_thread(get_local_meal_recognizer)
+    warm_up = asyncio.gather(
+        *(http_client.warm_up(url, settings.HTTP_WARMUP_CONNECTIONS) for url in settings.HTTP_WARMUP_URLS)
+    )
+    replica_monitor = (
+        asyncio.create_task(replica_router.monitor(replica_engine, settings.DATABASE_REPLICA_LAG_CHECK_SECONDS))
+        if replica_engine is not None
+        else None
+    )
+    yield
+    if replica_monitor is not None:
+        replica_monitor.cancel()
+    warm_up.cancel()
+    semantic_cache.close()
+    await http_client.close_clients()
+
+
+app = FastAPI(title="Calories API", lifespan=lifespan, default_response_class=FastJSONResponse)
 setup_fastapi_logging(app)
 
 app.include_router(task_router, tags=["Task"], prefix="/api/task")
 app.include_router(user_router, tags=["User"], prefix="/api/user")
 
+
+@app.get("/metrics", include_in_schema=False, dependencies=[Depends(verify_api_token)])
+def metrics() -> Response:
+    """Prometheus scrapes with API_TOKEN as its bearer token"""
+    return Response(generate_latest(), media_type=CONTENT_TYPE_LATEST)
+
+
 from sqladmin import Admin
 from src.core.admin import authentication_backend
 from src.task.api.admin import TaskAdmin
 from src.user.api.admin import UserAdmin
 
-admin = Admin(app, engine=engine, authentication_backend=authentication_backend)
+admin = Admin(app, session_maker=admin_session_maker, authentication_backend=authentication_backend)
 admin.add_view(TaskAdmin)
 admin.add_view(UserAdmin)
@@ -1,7 +1,9 @@
+from uuid import UUID
+
 from sqladmin import ModelView, expose
 from starlette.requests import Request
 
-from src.task.api.dependencies import get_task_uow
+from src.task.infrastructure.db.unit_of_work import ReadOnlyTaskUnitOfWork
 from src.task.infrastructure.db.orm import TaskDB
 
 
@@ -15,8 +17,8 @@ class TaskAdmin(ModelView, model=TaskDB):
         if user_id is None:
             raise ValueError("user_id is none")
 
-        uow = get_task_uow()
+        uow = ReadOnlyTaskUnitOfWork()
         async with uow:
-            tasks = await uow.tasks.get_by_user_id(user_id)
+            tasks = await uow.tasks.get_by_user_id(UUID(user_id), limit=100)
 
         return await self.templates.TemplateResponse(request, "user_tasks.html", {"tasks": tasks})
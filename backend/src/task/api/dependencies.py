@@ -1,20 +1,58 @@
+from uuid import UUID
 from typing import Annotated
 
 from fastapi import Depends
 
+from src.core.auth import get_current_user_id_optional
 from src.core.http.client import IHttpClient
 from src.core.http.dependencies import get_http_client
+from src.db.dependencies import DBAsyncSessionDep
 from src.integration.api.dependencies import get_integration_meal_audio_task_runner, get_integration_meal_edit_recognition_task_runner, get_integration_meal_image_task_runner, get_integration_meal_text_task_runner, get_integration_sport_audio_task_runner, get_integration_sport_edit_recognition_task_runner, get_integration_sport_text_task_runner
-from src.task.infrastructure.db.unit_of_work import TaskUnitOfWork
+from src.task.infrastructure.db.unit_of_work import ReadOnlyTaskUnitOfWork, TaskUnitOfWork
+from src.task.infrastructure.cache.task_result_cache import task_result_cache
+from src.task.infrastructure.memory.task_input_budget import task_input_budget
+from src.task.infrastructure.rate_limit.token_bucket import task_rate_limiter
 from src.task.application.interfaces.task_uow import ITaskUnitOfWork
 from src.task.application.interfaces.task_runner import ITaskRunner
+from src.task.application.interfaces.task_result_cache import ITaskResultCache
+from src.task.application.interfaces.task_input_budget import ITaskInputBudget
+from src.task.application.interfaces.task_rate_limiter import ITaskRateLimiter
 
 
-def get_task_uow() -> ITaskUnitOfWork:
-    return TaskUnitOfWork()
+def get_task_uow(
+    session: DBAsyncSessionDep, user_id: UUID | None = Depends(get_current_user_id_optional)
+) -> ITaskUnitOfWork:
+    """On the request's session, shared with the user module"""
+    return TaskUnitOfWork(session_getter=lambda: session, user_id=user_id)
+
+
+def get_task_run_uow(user_id: UUID | None = Depends(get_current_user_id_optional)) -> ITaskUnitOfWork:
+    """Own sessions for background runs: they outlive the request and wait on the model between transactions"""
+    return TaskUnitOfWork(user_id=user_id)
+
+
+def get_task_read_uow(user_id: UUID | None = Depends(get_current_user_id_optional)) -> ITaskUnitOfWork:
+    return ReadOnlyTaskUnitOfWork(user_id=user_id)
+
+
+def get_task_result_cache() -> ITaskResultCache:
+    return task_result_cache
+
+
+def get_task_input_budget() -> ITaskInputBudget:
+    return task_input_budget
+
+
+def get_task_rate_limiter() -> ITaskRateLimiter:
+    return task_rate_limiter
 
 
 TaskUoWDepend = Annotated[ITaskUnitOfWork, Depends(get_task_uow)]
+TaskRunUoWDepend = Annotated[ITaskUnitOfWork, Depends(get_task_run_uow)]
+TaskReadUoWDepend = Annotated[ITaskUnitOfWork, Depends(get_task_read_uow)]
+TaskResultCacheDepend = Annotated[ITaskResultCache, Depends(get_task_result_cache)]
+TaskInputBudgetDepend = Annotated[ITaskInputBudget, Depends(get_task_input_budget)]
+TaskRateLimiterDepend = Annotated[ITaskRateLimiter, Depends(get_task_rate_limiter)]
 TaskImageMealRunnerDepend = Annotated[ITaskRunner, Depends(get_integration_meal_image_task_runner)]
 TaskTextMealRunnerDepend = Annotated[ITaskRunner, Depends(get_integration_meal_text_task_runner)]
 TaskAudioMealRunnerDepend = Annotated[ITaskRunner, Depends(get_integration_meal_audio_task_runner)]
@@ -1,11 +1,15 @@
-from io import BytesIO
+import asyncio
+from io import BytesIO, BufferedReader
 from uuid import UUID
+from contextlib import asynccontextmanager
 
-from fastapi import File, Depends, APIRouter, UploadFile, BackgroundTasks
+from fastapi import File, Query, Depends, APIRouter, UploadFile, BackgroundTasks
+from loguru import logger
 
 from src.core.auth import get_current_user_id
+from src.core.image_hash import dhash
 from src.task.application.use_cases.build_task_params import BuildTaskParamsUseCase
-from src.task.domain.dtos import TaskCreateWithTextDTO, TaskReadDTO, TaskCreateDTO
+from src.task.domain.dtos import TaskCreateWithTextDTO, TaskPageDTO, TaskReadDTO, TaskCreateDTO
 from src.task.api.dependencies import (
     TaskAudioMealRunnerDepend,
     TaskAudioSportRunnerDepend,
@@ -14,132 +18,223 @@ from src.task.api.dependencies import (
     TaskTextMealRunnerDepend,
     TaskTextSportRunnerDepend,
     TaskUoWDepend,
+    TaskRunUoWDepend,
+    TaskReadUoWDepend,
+    TaskResultCacheDepend,
+    TaskInputBudgetDepend,
+    TaskRateLimiterDepend,
     HttpClientDepend,
     TaskImageMealRunnerDepend,
 )
 from src.task.application.use_cases.get_task import GetTaskUseCase
+from src.task.application.use_cases.list_tasks import ListTasksUseCase
 from src.task.application.use_cases.run_task import RunTaskUseCase
 from src.task.application.use_cases.create_task import CreateTaskUseCase
+from src.task.application.use_cases.admit_task_input import AdmitTaskInputUseCase
+from src.task.application.use_cases.limit_task_input import LimitTaskInputUseCase
+from src.task.application.interfaces.task_input_budget import ITaskInputBudget
+from src.task.domain.entities import TaskInput, TaskKind
 
 router = APIRouter()
 
 
+async def _hash_image(file: BytesIO | BufferedReader) -> int | None:
+    try:
+        return await asyncio.to_thread(dhash, file)
+    except (OSError, ValueError) as e:
+        logger.warning(f"Failed to hash uploaded image {file.name}: {e}")
+        return None
+
+
+@asynccontextmanager
+async def _admitted(budget: ITaskInputBudget, task_input: TaskInput):
+    """Until the run owns the input, a failed request gives its share of the budget back
+
+    The handle on a spilled input is only for the request, the run opens the stored copy itself.
+    """
+    try:
+        yield
+    except BaseException:
+        await budget.release(task_input.size, task_input.resident)
+        raise
+    finally:
+        if not task_input.resident:
+            task_input.file.close()
+
+
 @router.post("/image/meal", response_model=TaskReadDTO)
 async def create_and_run_meal_from_image_task(
     uow: TaskUoWDepend,
+    run_uow: TaskRunUoWDepend,
+    cache: TaskResultCacheDepend,
     http_client: HttpClientDepend,
     runner: TaskImageMealRunnerDepend,
+    input_budget: TaskInputBudgetDepend,
     background_tasks: BackgroundTasks,
     data: TaskCreateDTO = Depends(TaskCreateDTO.as_form),
     user_id: UUID = Depends(get_current_user_id),
     file: UploadFile = File(),
 ):
-    file_buffer = BytesIO(await file.read())
-    file_buffer.name = file.filename
-    task = await CreateTaskUseCase(uow).execute(user_id, data, file_buffer)
-    cmd = await BuildTaskParamsUseCase(uow).execute(data, None, file_buffer)
-    background_tasks.add_task(RunTaskUseCase(uow, runner, http_client).execute, task.id, data.webhook_url, cmd)
+    task_input = await AdmitTaskInputUseCase(input_budget).execute(file)
+    async with _admitted(input_budget, task_input), uow:
+        image_hash = await _hash_image(task_input.file)
+        task = await CreateTaskUseCase(uow).execute(user_id, data, task_input.file, image_hash, kind=TaskKind.meal)
+        cmd = await BuildTaskParamsUseCase(uow, cache).execute(data, None, task_input, image_hash=image_hash)
+        await uow.commit()
+    run_task = RunTaskUseCase(run_uow, runner, http_client, cache, input_budget)
+    background_tasks.add_task(run_task.execute, task.id, data.webhook_url, cmd)
     return task
 
 
 @router.post("/text/meal", response_model=TaskReadDTO)
 async def create_and_run_meal_from_text_task(
     uow: TaskUoWDepend,
+    run_uow: TaskRunUoWDepend,
+    cache: TaskResultCacheDepend,
     http_client: HttpClientDepend,
     runner: TaskTextMealRunnerDepend,
+    rate_limiter: TaskRateLimiterDepend,
     background_tasks: BackgroundTasks,
     data: TaskCreateWithTextDTO = Depends(TaskCreateWithTextDTO.as_form),
     user_id: UUID = Depends(get_current_user_id),
 ):
-    task = await CreateTaskUseCase(uow).execute(user_id, data, None)
-    cmd = await BuildTaskParamsUseCase(uow).execute(data)
-    background_tasks.add_task(RunTaskUseCase(uow, runner, http_client).execute, task.id, data.webhook_url, cmd)
+    async with uow:
+        cmd = await BuildTaskParamsUseCase(uow, cache).execute(data)
+        cmd = await LimitTaskInputUseCase(rate_limiter).execute("meal_text", user_id, cmd)
+        task = await CreateTaskUseCase(uow).execute(user_id, data, None, kind=TaskKind.meal)
+        await uow.commit()
+    run_task = RunTaskUseCase(run_uow, runner, http_client, cache)
+    background_tasks.add_task(run_task.execute, task.id, data.webhook_url, cmd)
     return task
 
 
 @router.post("/text/sport", response_model=TaskReadDTO)
 async def create_and_run_sport_from_text_task(
     uow: TaskUoWDepend,
+    run_uow: TaskRunUoWDepend,
+    cache: TaskResultCacheDepend,
     http_client: HttpClientDepend,
     runner: TaskTextSportRunnerDepend,
+    rate_limiter: TaskRateLimiterDepend,
     background_tasks: BackgroundTasks,
     data: TaskCreateWithTextDTO = Depends(TaskCreateWithTextDTO.as_form),
     user_id: UUID = Depends(get_current_user_id),
 ):
-    task = await CreateTaskUseCase(uow).execute(user_id, data, None)
-    cmd = await BuildTaskParamsUseCase(uow).execute(data)
-    background_tasks.add_task(RunTaskUseCase(uow, runner, http_client).execute, task.id, data.webhook_url, cmd)
+    async with uow:
+        cmd = await BuildTaskParamsUseCase(uow, cache).execute(data, user_id=user_id)
+        cmd = await LimitTaskInputUseCase(rate_limiter).execute("sport_text", user_id, cmd)
+        task = await CreateTaskUseCase(uow).execute(user_id, data, None, kind=TaskKind.sport)
+        await uow.commit()
+    run_task = RunTaskUseCase(run_uow, runner, http_client, cache)
+    background_tasks.add_task(run_task.execute, task.id, data.webhook_url, cmd)
     return task
 
 
 @router.post("/audio/meal", response_model=TaskReadDTO)
 async def create_and_run_meal_from_audio_task(
     uow: TaskUoWDepend,
+    run_uow: TaskRunUoWDepend,
+    cache: TaskResultCacheDepend,
     http_client: HttpClientDepend,
     runner: TaskAudioMealRunnerDepend,
+    input_budget: TaskInputBudgetDepend,
     background_tasks: BackgroundTasks,
     data: TaskCreateDTO = Depends(TaskCreateDTO.as_form),
     user_id: UUID = Depends(get_current_user_id),
     file: UploadFile = File(),
 ):
-    file_buffer = BytesIO(await file.read())
-    file_buffer.name = file.filename
-    task = await CreateTaskUseCase(uow).execute(user_id, data, file_buffer)
-    cmd = await BuildTaskParamsUseCase(uow).execute(data, None, file_buffer)
-    background_tasks.add_task(RunTaskUseCase(uow, runner, http_client).execute, task.id, data.webhook_url, cmd)
+    task_input = await AdmitTaskInputUseCase(input_budget).execute(file)
+    async with _admitted(input_budget, task_input), uow:
+        task = await CreateTaskUseCase(uow).execute(user_id, data, task_input.file, kind=TaskKind.meal)
+        cmd = await BuildTaskParamsUseCase(uow, cache).execute(data, None, task_input)
+        await uow.commit()
+    run_task = RunTaskUseCase(run_uow, runner, http_client, cache, input_budget)
+    background_tasks.add_task(run_task.execute, task.id, data.webhook_url, cmd)
     return task
 
 
 @router.post("/audio/sport", response_model=TaskReadDTO)
 async def create_and_run_sport_from_audio_task(
     uow: TaskUoWDepend,
+    run_uow: TaskRunUoWDepend,
+    cache: TaskResultCacheDepend,
     http_client: HttpClientDepend,
     runner: TaskAudioSportRunnerDepend,
+    input_budget: TaskInputBudgetDepend,
     background_tasks: BackgroundTasks,
     data: TaskCreateDTO = Depends(TaskCreateDTO.as_form),
     user_id: UUID = Depends(get_current_user_id),
     file: UploadFile = File(),
 ):
-    file_buffer = BytesIO(await file.read())
-    file_buffer.name = file.filename
-    task = await CreateTaskUseCase(uow).execute(user_id, data, file_buffer)
-    cmd = await BuildTaskParamsUseCase(uow).execute(data, None, file_buffer)
-    background_tasks.add_task(RunTaskUseCase(uow, runner, http_client).execute, task.id, data.webhook_url, cmd)
+    task_input = await AdmitTaskInputUseCase(input_budget).execute(file)
+    async with _admitted(input_budget, task_input), uow:
+        task = await CreateTaskUseCase(uow).execute(user_id, data, task_input.file, kind=TaskKind.sport)
+        cmd = await BuildTaskParamsUseCase(uow, cache).execute(data, None, task_input)
+        await uow.commit()
+    run_task = RunTaskUseCase(run_uow, runner, http_client, cache, input_budget)
+    background_tasks.add_task(run_task.execute, task.id, data.webhook_url, cmd)
     return task
 
 
 @router.post("/edit/{task_id}/sport", response_model=TaskReadDTO)
 async def create_and_run_edit_sport_task(
     uow: TaskUoWDepend,
+    run_uow: TaskRunUoWDepend,
+    cache: TaskResultCacheDepend,
     http_client: HttpClientDepend,
     runner: TaskEditSportRunnerDepend,
+    rate_limiter: TaskRateLimiterDepend,
     background_tasks: BackgroundTasks,
     task_id: UUID,
     data: TaskCreateWithTextDTO = Depends(TaskCreateWithTextDTO.as_form),
     user_id: UUID = Depends(get_current_user_id),
 ):
-    task = await CreateTaskUseCase(uow).execute(user_id, data, None)
-    cmd = await BuildTaskParamsUseCase(uow).execute(data, task_id)
-    background_tasks.add_task(RunTaskUseCase(uow, runner, http_client).execute, task.id, data.webhook_url, cmd)
+    # One transaction: the parent is read and the edit inserted on a single connection
+    async with uow:
+        cmd = await BuildTaskParamsUseCase(uow, cache).execute(data, task_id, owner_id=user_id)
+        cmd = await LimitTaskInputUseCase(rate_limiter).execute("sport_edit", user_id, cmd)
+        task = await CreateTaskUseCase(uow).execute(user_id, data, None, kind=TaskKind.sport, parent_id=task_id)
+        await uow.commit()
+    run_task = RunTaskUseCase(run_uow, runner, http_client, cache)
+    background_tasks.add_task(run_task.execute, task.id, data.webhook_url, cmd)
     return task
 
 
 @router.post("/edit/{task_id}/meal", response_model=TaskReadDTO)
 async def create_and_run_edit_sport_meal(
     uow: TaskUoWDepend,
+    run_uow: TaskRunUoWDepend,
+    cache: TaskResultCacheDepend,
     http_client: HttpClientDepend,
     runner: TaskEditMealRunnerDepend,
+    rate_limiter: TaskRateLimiterDepend,
     background_tasks: BackgroundTasks,
     task_id: UUID,
     data: TaskCreateWithTextDTO = Depends(TaskCreateWithTextDTO.as_form),
     user_id: UUID = Depends(get_current_user_id),
 ):
-    task = await CreateTaskUseCase(uow).execute(user_id, data, None)
-    cmd = await BuildTaskParamsUseCase(uow).execute(data, task_id)
-    background_tasks.add_task(RunTaskUseCase(uow, runner, http_client).execute, task.id, data.webhook_url, cmd)
+    # One transaction: the parent is read and the edit inserted on a single connection
+    async with uow:
+        cmd = await BuildTaskParamsUseCase(uow, cache).execute(data, task_id, owner_id=user_id)
+        cmd = await LimitTaskInputUseCase(rate_limiter).execute("meal_edit", user_id, cmd)
+        task = await CreateTaskUseCase(uow).execute(user_id, data, None, kind=TaskKind.meal, parent_id=task_id)
+        await uow.commit()
+    run_task = RunTaskUseCase(run_uow, runner, http_client, cache)
+    background_tasks.add_task(run_task.execute, task.id, data.webhook_url, cmd)
     return task
 
 
+@router.get("", response_model=TaskPageDTO)
+async def list_tasks(
+    uow: TaskReadUoWDepend,
+    before: str | None = None,
+    limit: int = Query(20, ge=1, le=100),
+    kind: TaskKind | None = None,
+    user_id: UUID = Depends(get_current_user_id),
+):
+    return await ListTasksUseCase(uow).execute(user_id, before, limit, kind)
+
+
 @router.get("/{task_id}", response_model=TaskReadDTO)
-async def get_task(task_id: UUID, uow: TaskUoWDepend, _: UUID = Depends(get_current_user_id)):
+async def get_task(task_id: UUID, uow: TaskReadUoWDepend, _: UUID = Depends(get_current_user_id)):
     return await GetTaskUseCase(uow).execute(task_id)
@@ -0,0 +1,13 @@
+import abc
+
+
+class ITaskInputBudget(abc.ABC):
+    @abc.abstractmethod
+    async def acquire(self, size: int) -> bool:
+        """Reserve room for an input of `size` bytes, True when it may stay in memory until the run
+
+        Raises TaskInputBudgetExceededException when no room frees up in time.
+        """
+
+    @abc.abstractmethod
+    async def release(self, size: int, resident: bool) -> None: ...
@@ -0,0 +1,8 @@
+import abc
+from uuid import UUID
+
+
+class ITaskRateLimiter(abc.ABC):
+    @abc.abstractmethod
+    async def consume(self, user_id: UUID, cost: int) -> float:
+        """Charge `cost` estimated tokens to the user, 0 when admitted, else seconds until it would be"""
@@ -1,7 +1,7 @@
 import abc
 from uuid import UUID
 
-from src.task.domain.entities import Task, TaskCreate, TaskUpdate
+from src.task.domain.entities import Task, TaskCreate, TaskCursor, TaskKind, TaskUpdate
 
 
 class ITaskRepository(abc.ABC):
@@ -12,7 +12,23 @@ class ITaskRepository(abc.ABC):
     async def get_by_pk(self, pk: UUID) -> Task: ...
 
     @abc.abstractmethod
-    async def get_by_user_id(self, user_id: UUID) -> list[Task]: ...
+    async def get_by_user_id(
+        self, user_id: UUID, before: TaskCursor | None = None, limit: int = 20, kind: TaskKind | None = None
+    ) -> list[Task]:
+        """Newest first, the page after `before`"""
+
+    @abc.abstractmethod
+    async def get_edit_chain(self, pk: UUID) -> list[Task]:
+        """The task `pk` was edited from, at the root, then every edit under it; oldest first, the root row locked"""
+
+    @abc.abstractmethod
+    async def get_image_duplicate(
+        self, pk: UUID, image_hash: int, max_distance: int, lookback: int, window_seconds: float
+    ) -> Task | None:
+        """Closest task within the Hamming distance among the owner's last `lookback` finished photo tasks
+
+        Only tasks created in the last `window_seconds` count.
+        """
 
     @abc.abstractmethod
     async def update_by_pk(self, pk: UUID, data: TaskUpdate) -> Task: ...
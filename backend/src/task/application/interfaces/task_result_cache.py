@@ -0,0 +1,12 @@
+import abc
+from uuid import UUID
+
+from src.task.domain.entities import Task
+
+
+class ITaskResultCache(abc.ABC):
+    @abc.abstractmethod
+    async def get(self, task_id: UUID) -> Task | None: ...
+
+    @abc.abstractmethod
+    async def set(self, task: Task) -> None: ...
@@ -0,0 +1,52 @@
+import os
+import shutil
+import asyncio
+from io import BytesIO
+from uuid import uuid4
+
+from fastapi import HTTPException, UploadFile
+
+from src.core.config import settings
+from src.task.domain.entities import TaskInput
+from src.task.domain.exceptions import TaskInputBudgetExceededException
+from src.task.application.interfaces.task_input_budget import ITaskInputBudget
+from src.task.application.use_cases.create_task import stored_filename
+
+
+class AdmitTaskInputUseCase:
+    RETRY_AFTER_SECONDS = 5
+
+    def __init__(self, budget: ITaskInputBudget) -> None:
+        self.budget = budget
+
+    async def execute(self, file: UploadFile) -> TaskInput:
+        """Uploaded file admitted by its size before any of it is read, released by the run
+
+        In memory while the budget has room, otherwise streamed to storage in chunks and opened from there.
+        """
+        size = file.size or 0
+        try:
+            resident = await self.budget.acquire(size)
+        except TaskInputBudgetExceededException as e:
+            raise HTTPException(
+                503, "Too many uploads in progress", headers={"Retry-After": str(self.RETRY_AFTER_SECONDS)}
+            ) from e
+
+        if resident:
+            file_buffer = BytesIO(await file.read())
+            file_buffer.name = file.filename
+            return TaskInput(file=file_buffer, size=size, resident=True)
+
+        path = os.path.join(settings.STORAGE_PATH, stored_filename(file.filename))
+        try:
+            await asyncio.to_thread(self._spill, file, path)
+        except BaseException:
+            await self.budget.release(size, resident)
+            raise
+        return TaskInput(file=open(path, "rb"), size=size, resident=False)
+
+    @staticmethod
+    def _spill(file: UploadFile, path: str) -> None:
+        file.file.seek(0)
+        with open(path, "wb") as stored:
+            shutil.copyfileobj(file.file, stored)
@@ -1,26 +1,89 @@
-from io import BytesIO
+import os
 from uuid import UUID
+
+from fastapi import HTTPException
+from loguru import logger
+
+from src.core.config import settings
+from src.db.exceptions import DBModelNotFoundException
 from src.task.application.interfaces.task_uow import ITaskUnitOfWork
+from src.task.application.interfaces.task_result_cache import ITaskResultCache
 from src.task.domain.dtos import TaskCreateDTO, TaskCreateWithTextDTO
-from src.task.domain.entities import TaskRun
+from src.task.domain.entities import Task, TaskRun, TaskInput
+from src.integration.domain.dtos import IntegrationUserProfileDTO
 
 
 class BuildTaskParamsUseCase:
-    def __init__(self, uow: ITaskUnitOfWork) -> None:
+    def __init__(self, uow: ITaskUnitOfWork, cache: ITaskResultCache) -> None:
         self.uow = uow
+        self.cache = cache
 
-    async def execute(self, dto: TaskCreateDTO | TaskCreateWithTextDTO, old_task_id: UUID | None = None, file: BytesIO | None = None) -> TaskRun:
-        prev_task_text = await self._build_prev_task_text(old_task_id)
-        user_input_text = dto.text if hasattr(dto, 'text') else ''
+    async def execute(
+        self,
+        dto: TaskCreateDTO | TaskCreateWithTextDTO,
+        old_task_id: UUID | None = None,
+        task_input: TaskInput | None = None,
+        user_id: UUID | None = None,
+        image_hash: int | None = None,
+        owner_id: UUID | None = None,
+    ) -> TaskRun:
+        """`owner_id` is the caller editing `old_task_id`, someone else's task is not found for them"""
+        previous_result = await self._build_previous_result(old_task_id, owner_id)
+        user_input_text = dto.text if hasattr(dto, 'text') else None
         return TaskRun(
-            file=file,
-            text=prev_task_text + user_input_text,
+            **self._build_input(task_input),
+            text=user_input_text,
+            previous_result=previous_result,
             language=dto.language,
+            profile=await self._build_profile(user_id),
+            image_hash=image_hash,
         )
 
-    async def _build_prev_task_text(self, old_task_id: UUID | None) -> str:
+    @staticmethod
+    def _build_input(task_input: TaskInput | None) -> dict:
+        """Inputs over the memory budget are passed by their stored copy only"""
+        if task_input is None:
+            return {}
+        return {
+            "file": task_input.file if task_input.resident else None,
+            "file_path": os.path.join(settings.STORAGE_PATH, os.path.basename(task_input.file.name)),
+            "input_size": task_input.size,
+            "input_resident": task_input.resident,
+        }
+
+    async def _build_profile(self, user_id: UUID | None) -> IntegrationUserProfileDTO | None:
+        if user_id is None:
+            return None
+        try:
+            async with self.uow:
+                user = await self.uow.users.get_by_pk(user_id)
+        except (DBModelNotFoundException, ValueError) as e:
+            # Missing user or profile: the local sport calculator takes a standard adult, the model never sees it
+            logger.warning(f"No profile for user {user_id}: {e!r}")
+            return None
+        return IntegrationUserProfileDTO(gender=user.gender, age=user.age, height=user.height)
+
+    async def _build_previous_result(self, old_task_id: UUID | None, owner_id: UUID | None) -> dict | None:
         if old_task_id is None:
-            return ''
-        async with self.uow:
-            task = await self.uow.tasks.get_by_pk(old_task_id)
-        return '\n'.join(str(p) for p in task.products) + "\n".join(str(s) for s in task.sports)
+            return None
+        task = await self.cache.get(old_task_id)
+        if task is None:
+            try:
+                async with self.uow:
+                    task = await self.uow.tasks.get_by_pk(old_task_id)
+            except DBModelNotFoundException as e:
+                raise HTTPException(404) from e
+            await self.cache.set(task)
+        if owner_id is not None and task.user_id != owner_id:
+            raise HTTPException(404)
+        return self._to_previous_result(task)
+
+    @staticmethod
+    def _to_previous_result(task: Task) -> dict:
+        """Only the fields the model needs to apply a correction, without empty values"""
+        result = {}
+        if task.products:
+            result["products"] = [p.model_dump(exclude_none=True) for p in task.products]
+        if task.sports:
+            result["sports"] = [s.model_dump(exclude_none=True) for s in task.sports]
+        return result
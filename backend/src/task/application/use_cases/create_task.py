@@ -1,10 +1,12 @@
-from io import BytesIO
+import os
+from io import BytesIO, BufferedReader
 from uuid import UUID, uuid4
 from fastapi import HTTPException
 from loguru import logger
 
+from src.core.config import settings
 from src.task.domain.dtos import TaskCreateWithTextDTO, TaskReadDTO, TaskCreateDTO
-from src.task.domain.entities import TaskCreate
+from src.task.domain.entities import TaskCreate, TaskKind
 from src.task.application.interfaces.task_uow import ITaskUnitOfWork
 
 
@@ -13,13 +15,22 @@ class CreateTaskUseCase:
         self.uow = uow
 
     async def execute(
-        self, user_id: UUID, dto: TaskCreateDTO | TaskCreateWithTextDTO, file: BytesIO | None
+        self,
+        user_id: UUID,
+        dto: TaskCreateDTO | TaskCreateWithTextDTO,
+        file: BytesIO | BufferedReader | None,
+        image_hash: int | None = None,
+        kind: TaskKind | None = None,
+        parent_id: UUID | None = None,
     ) -> TaskReadDTO:
         command = TaskCreate(
             **dto.model_dump(exclude={"text"}),
             user_id=user_id,
             request_text=dto.text if isinstance(dto, TaskCreateWithTextDTO) else None,
             request_filename=self._save_file(file),
+            image_hash=image_hash,
+            kind=kind,
+            parent_id=parent_id,
         )
         async with self.uow:
             task = await self.uow.tasks.create(command)
@@ -27,16 +38,23 @@ class CreateTaskUseCase:
         logger.debug(f"Created {task=}")
         return TaskReadDTO(**task.model_dump())
 
-    def _save_file(self, file: BytesIO | None) -> str | None:
+    def _save_file(self, file: BytesIO | BufferedReader | None) -> str | None:
         if file is None:
             return None
+        if not isinstance(file, BytesIO):
+            # Spilled over the memory budget, the upload is stored already
+            return os.path.basename(file.name)
 
-        extension = ""
-        if "." in (file.name or ""):
-            extension = "." + file.name.rsplit(".", 1)[-1]
-        file.name = str(uuid4()) + extension
-
-        with open(f"storage/{file.name}", "wb") as f:
-            f.write(file.read())
+        file.name = stored_filename(file.name)
+        with open(os.path.join(settings.STORAGE_PATH, file.name), "wb") as f, file.getbuffer() as view:
+            f.write(view)
 
         return file.name
+
+
+def stored_filename(filename: str | None) -> str:
+    """Random name for an upload in STORAGE_PATH, keeping its extension"""
+    extension = ""
+    if "." in (filename or ""):
+        extension = "." + filename.rsplit(".", 1)[-1]
+    return str(uuid4()) + extension
@@ -0,0 +1,89 @@
+import math
+from uuid import UUID
+
+from fastapi import HTTPException
+from loguru import logger
+from prometheus_client import Counter, Histogram
+
+from src.core import json_codec
+from src.core.config import settings, TokenLimitSettings
+from src.core.tokens import estimate_tokens, truncate_to_tokens
+from src.task.domain.entities import TaskRun
+from src.task.application.interfaces.task_rate_limiter import ITaskRateLimiter
+
+TASK_INPUT_TOKENS = Histogram(
+    "task_input_tokens",
+    "Estimated tokens of user text and previous result before limits",
+    ["runner"],
+    buckets=(25, 50, 100, 200, 400, 800, 1600, 3200, 6400, 12800),
+)
+TASK_INPUT_LIMITED = Counter("task_input_limited_total", "Task inputs over their token limit", ["runner", "action"])
+
+
+class LimitTaskInputUseCase:
+    """Pre-flight token estimate: per-runner limits, then the estimate is charged to the user's rate limit"""
+
+    def __init__(self, rate_limiter: ITaskRateLimiter, limits: dict[str, TokenLimitSettings] | None = None) -> None:
+        self.rate_limiter = rate_limiter
+        self.limits = settings.TASK_INPUT_TOKEN_LIMITS if limits is None else limits
+
+    async def execute(self, runner: str, user_id: UUID, command: TaskRun) -> TaskRun:
+        command = self._apply_limit(runner, command)
+        retry_after = await self.rate_limiter.consume(user_id, self._estimate(command))
+        if retry_after:
+            raise HTTPException(
+                429, "Too many model tokens requested", headers={"Retry-After": str(math.ceil(retry_after))}
+            )
+        return command
+
+    @staticmethod
+    def _previous_tokens(previous_result: dict | None) -> int:
+        # The runners send it as compact canonical JSON
+        return estimate_tokens(json_codec.dumps_str(previous_result, sort_keys=True)) if previous_result else 0
+
+    def _estimate(self, command: TaskRun) -> int:
+        return estimate_tokens(command.text or "") + self._previous_tokens(command.previous_result)
+
+    def _apply_limit(self, runner: str, command: TaskRun) -> TaskRun:
+        tokens = self._estimate(command)
+        TASK_INPUT_TOKENS.labels(runner=runner).observe(tokens)
+        limit = self.limits.get(runner)
+        if limit is None or tokens <= limit.max_tokens:
+            return command
+
+        TASK_INPUT_LIMITED.labels(runner=runner, action=limit.action).inc()
+        logger.info(f"{runner} input is about {tokens} tokens, over {limit.max_tokens}: {limit.action}")
+        if limit.action == "reject":
+            raise HTTPException(413, f"Input is about {tokens} tokens, the limit is {limit.max_tokens}")
+
+        previous_result = command.previous_result
+        if limit.action == "summarize" and previous_result:
+            text_tokens = estimate_tokens(command.text or "")
+            previous_result = self._summarize(previous_result, limit.max_tokens - text_tokens)
+
+        text_budget = limit.max_tokens - self._previous_tokens(previous_result)
+        text = truncate_to_tokens(command.text, max(text_budget, 0)) if command.text else command.text
+        if command.text and not text:
+            raise HTTPException(413, f"Input is about {tokens} tokens, the limit is {limit.max_tokens}")
+        return command.model_copy(update={"text": text, "previous_result": previous_result})
+
+    @staticmethod
+    def _compact_product(product: dict, ingredient_fields: set[str]) -> dict:
+        compact = {key: value for key, value in product.items() if key not in ("commentary", "ingredients")}
+        if ingredient_fields:
+            compact["ingredients"] = [
+                {key: value for key, value in ingredient.items() if key in ingredient_fields}
+                for ingredient in product.get("ingredients", [])
+            ]
+        return compact
+
+    def _summarize(self, previous_result: dict, max_tokens: int) -> dict:
+        """Coarser previous result until it fits: no commentary and bare ingredients, then no ingredients"""
+        if not previous_result.get("products"):
+            return previous_result
+        for ingredient_fields in ({"name", "weight"}, set()):
+            products = [self._compact_product(p, ingredient_fields) for p in previous_result["products"]]
+            summary = {**previous_result, "products": products}
+            if self._previous_tokens(summary) <= max_tokens:
+                break
+        return summary
@@ -0,0 +1,41 @@
+import base64
+import binascii
+from uuid import UUID
+
+from fastapi import HTTPException
+from pydantic import ValidationError
+
+from src.core import json_codec
+from src.task.domain.dtos import TaskPageDTO, TaskReadDTO
+from src.task.domain.entities import TaskCursor, TaskKind
+from src.task.application.interfaces.task_uow import ITaskUnitOfWork
+
+
+class ListTasksUseCase:
+    """The user's history, newest first, a page at a time behind an opaque cursor"""
+
+    def __init__(self, uow: ITaskUnitOfWork):
+        self.uow = uow
+
+    async def execute(self, user_id: UUID, before: str | None, limit: int, kind: TaskKind | None) -> TaskPageDTO:
+        cursor = self._decode_cursor(before) if before else None
+        async with self.uow:
+            # One extra row tells whether there is a next page
+            tasks = await self.uow.tasks.get_by_user_id(user_id, cursor, limit + 1, kind)
+        page = tasks[:limit]
+        next_cursor = None
+        if len(tasks) > limit:
+            next_cursor = self._encode_cursor(TaskCursor(created_at=page[-1].created_at, id=page[-1].id))
+        return TaskPageDTO(items=[TaskReadDTO(**task.model_dump()) for task in page], next_cursor=next_cursor)
+
+    @staticmethod
+    def _encode_cursor(cursor: TaskCursor) -> str:
+        return base64.urlsafe_b64encode(json_codec.dumps(cursor.model_dump(mode="json"))).decode().rstrip("=")
+
+    @staticmethod
+    def _decode_cursor(value: str) -> TaskCursor:
+        try:
+            data = base64.urlsafe_b64decode(value + "=" * (-len(value) % 4))
+            return TaskCursor.model_validate(json_codec.loads(data))
+        except (binascii.Error, ValueError, ValidationError) as e:
+            raise HTTPException(400, "Invalid cursor") from e
@@ -1,17 +1,30 @@
 import asyncio
 from io import BytesIO
 from uuid import UUID
+from contextlib import contextmanager
+from typing import Iterator
 
 from loguru import logger
 from pydantic import HttpUrl
 
+from src.core.config import settings
 from src.core.http.client import IHttpClient
-from src.task.domain.dtos import TaskCreateWithTextDTO, TaskReadDTO, TaskCreateDTO, TaskResultDTO
+from src.user.domain.entities import DailyTotals
+from src.task.domain.dtos import (
+    TaskCreateWithTextDTO,
+    TaskReadDTO,
+    TaskCreateDTO,
+    TaskResultDTO,
+    TaskProductDTO,
+    TaskSportDTO,
+)
 from src.task.domain.mappers import IntegrationResponseToDomainMapper
 from src.task.domain.entities import Task, TaskProduct, TaskRun, TaskSport, TaskStatus, TaskUpdate
 from src.integration.domain.exceptions import IntegrationRequestException
 from src.task.application.interfaces.task_uow import ITaskUnitOfWork
 from src.task.application.interfaces.task_runner import ITaskRunner
+from src.task.application.interfaces.task_result_cache import ITaskResultCache
+from src.task.application.interfaces.task_input_budget import ITaskInputBudget
 
 
 class RunTaskUseCase:
@@ -22,16 +35,24 @@ class RunTaskUseCase:
         uow: ITaskUnitOfWork,
         runner: ITaskRunner,
         http_client: IHttpClient,
+        cache: ITaskResultCache,
+        input_budget: ITaskInputBudget | None = None,
     ) -> None:
         self.uow = uow
         self.runner = runner
         self.http_client = http_client
+        self.cache = cache
+        self.input_budget = input_budget
 
     async def execute(self, task_id: UUID, webhook_url: str | None, command: TaskRun) -> None:
         """Run it in background"""
         logger.info(f"Running task {task_id}")
         logger.debug(f"Task {task_id} params: {command}")
-        result, error = await self._run(command)
+        try:
+            result, error = await self._reuse_image_duplicate(task_id, command) or await self._run_with_input(command)
+        finally:
+            if self.input_budget is not None and command.input_size:
+                await self.input_budget.release(command.input_size, command.input_resident)
 
         if error is not None or result is None:
             result = await self._store_error(task_id, status=TaskStatus.failed, error=error)
@@ -60,18 +81,97 @@ class RunTaskUseCase:
                     sports=[TaskSport(**s.model_dump(mode="json")) for s in result.sports]
                 ),
             )
+            await self._add_daily_totals(task)
             await self.uow.commit()
+        await self.cache.set(task)
         return task
 
+    async def _add_daily_totals(self, task: Task) -> None:
+        """An edit chain counts once, as its newest finished task, on the day of the meal it started from
+
+        The result replaces the one counted so far, unless that one is from a newer edit: then this
+        result, finished late, is already superseded.
+        """
+        if task.status != TaskStatus.finished:
+            return
+        chain = await self.uow.tasks.get_edit_chain(task.id)
+        counted = max(
+            (other for other in chain if other.id != task.id and other.status == TaskStatus.finished),
+            key=lambda other: (other.created_at, other.id),
+            default=None,
+        )
+        if counted is not None and (counted.created_at, counted.id) > (task.created_at, task.id):
+            return
+        delta = self._totals(task)
+        if counted is not None:
+            counted_totals = self._totals(counted)
+            delta = {key: value - counted_totals[key] for key, value in delta.items()}
+        if any(delta.values()):
+            await self.uow.users.add_daily_totals(task.user_id, DailyTotals(day=chain[0].created_at.date(), **delta))
+
+    @staticmethod
+    def _totals(task: Task) -> dict[str, float]:
+        if task.status != TaskStatus.finished:
+            return dict.fromkeys(("calories", "proteins", "fats", "carbohydrates", "fiber", "sport_calories"), 0.0)
+        totals = {
+            key: sum(getattr(product, key) or 0 for product in task.products)
+            for key in ("calories", "proteins", "fats", "carbohydrates", "fiber")
+        }
+        totals["sport_calories"] = sum(sport.calories or 0 for sport in task.sports)
+        return totals
+
     async def _store_error(self, task_id: UUID, status: TaskStatus, error: str | None = None) -> Task:
         async with self.uow:
             task = await self.uow.tasks.update_by_pk(task_id, TaskUpdate(status=status, error=error))
             await self.uow.commit()
         return task
 
+    async def _reuse_image_duplicate(self, task_id: UUID, command: TaskRun) -> tuple[TaskResultDTO, None] | None:
+        """The same plate shot twice in a row gets the earlier answer instead of another model call"""
+        if command.image_hash is None:
+            return None
+        async with self.uow:
+            duplicate = await self.uow.tasks.get_image_duplicate(
+                task_id,
+                command.image_hash,
+                max_distance=settings.IMAGE_DUPLICATE_MAX_DISTANCE,
+                lookback=settings.IMAGE_DUPLICATE_LOOKBACK,
+                window_seconds=settings.IMAGE_DUPLICATE_WINDOW_SECONDS,
+            )
+        if duplicate is None:
+            return None
+
+        logger.info(f"Task {task_id} reuses result of near-duplicate photo task {duplicate.id}")
+        result = TaskResultDTO(
+            status=TaskStatus.finished,
+            products=[TaskProductDTO(**p.model_dump()) for p in duplicate.products],
+            sports=[TaskSportDTO(**s.model_dump()) for s in duplicate.sports],
+        )
+        return result, None
+
+    @staticmethod
+    @contextmanager
+    def _open_input(command: TaskRun) -> Iterator[TaskRun]:
+        """Input spilled over the memory budget is read from its stored copy, in chunks, by the runner"""
+        if command.file is not None or command.file_path is None:
+            yield command
+            return
+        with open(command.file_path, "rb") as file:
+            yield command.model_copy(update={"file": file})
+
+    async def _run_with_input(self, command: TaskRun) -> tuple[TaskResultDTO | None, None | str]:
+        try:
+            with self._open_input(command) as command:
+                return await self._run(command)
+        except OSError as e:
+            logger.exception(e)
+            return None, "Internal exception"
+
     async def _run(self, command: TaskRun) -> tuple[TaskResultDTO | None, None | str]:
         try:
             result = await asyncio.wait_for(self.runner.start(command), timeout=self.TIMEOUT_SECONDS)
+            # A malformed item fails validation here, it is stored as the task's error like any other failure
+            return IntegrationResponseToDomainMapper().map_one(result), None
         except asyncio.TimeoutError:
             return None, "Generation run error: Timeout"
         except IntegrationRequestException as e:
@@ -80,6 +180,3 @@ class RunTaskUseCase:
         except Exception as e:
             logger.exception(e)
             return None, "Internal exception"
-
-        result_domain = IntegrationResponseToDomainMapper().map_one(result)
-        return result_domain, None
@@ -1,12 +1,19 @@
 import inspect
+import datetime as dt
 from uuid import UUID
 from typing import Type, TypeVar
 
 from fastapi import Form
 from pydantic import Field, HttpUrl, BaseModel
 
-from src.task.domain.entities import TaskStatus
-from src.integration.domain.dtos import IntegrationTaskRunParamsDTO
+from src.task.domain.entities import TaskKind, TaskStatus
+# Result items are defined with the runner answers they are parsed from, and re-exported here
+from src.integration.domain.dtos import (
+    IntegrationTaskRunParamsDTO,
+    TaskProductDTO,
+    TaskProductIngredientDTO,
+    TaskSportDTO,
+)
 
 _T = TypeVar("_T", bound=BaseModel)
 
@@ -47,40 +54,19 @@ class TaskCreateWithTextDTO(IntegrationTaskRunParamsDTO, BaseModel):
     webhook_url: HttpUrl | None = None
 
 
-class TaskProductIngredientDTO(BaseModel):
-    name: str | None = None
-    weight: float | None = None
-    calories: float | None = None
-    proteins: float | None = Field(None, description="Клетчатка")
-    fats: float | None = None
-    carbohydrates: float | None = None
-    fiber: float | None = Field(None, description="Белки")
-
-
-class TaskProductDTO(BaseModel):
-    name: str | None = None
-    weight: float | None = None
-    calories: float | None = None
-    proteins: float | None = Field(None, description="Клетчатка")
-    fats: float | None = None
-    carbohydrates: float | None = None
-    fiber: float | None = Field(None, description="Белки")
-
-    ingredients: list[TaskProductIngredientDTO]
-
-
-class TaskSportDTO(BaseModel):
-    name: str | None = None
-    calories: float | None = None
-    length: int | None = None
-
-
 class TaskReadDTO(BaseModel):
     id: UUID
     status: TaskStatus
     products: list[TaskProductDTO]
     sports: list[TaskSportDTO]
     error: str | None = None
+    kind: TaskKind | None = None
+    created_at: dt.datetime | None = None
+
+
+class TaskPageDTO(BaseModel):
+    items: list[TaskReadDTO]
+    next_cursor: str | None = Field(None, description="`before` of the next page, none on the last one")
 
 
 class TaskResultDTO(BaseModel):
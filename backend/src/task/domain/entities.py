@@ -1,10 +1,11 @@
-from io import BytesIO
+import datetime as dt
+from io import BytesIO, BufferedReader
 from enum import Enum
 from uuid import UUID
 
 from pydantic import BaseModel, ConfigDict
 
-from src.integration.domain.dtos import IntegrationTaskRunParamsDTO
+from src.integration.domain.dtos import IntegrationTaskRunParamsDTO, IntegrationUserProfileDTO
 
 
 class TaskStatus(str, Enum):
@@ -14,6 +15,11 @@ class TaskStatus(str, Enum):
     finished = "finished"
 
 
+class TaskKind(str, Enum):
+    meal = "meal"
+    sport = "sport"
+
+
 class TaskProductIngredient(BaseModel):
     name: str | None = None
     weight: float | None = None
@@ -51,22 +57,51 @@ class Task(BaseModel):
     error: str | None = None
     request_text: str | None = None
     request_filename: str | None = None
+    kind: TaskKind | None = None
+    parent_id: UUID | None = None
+    created_at: dt.datetime | None = None
 
     products: list[TaskProduct]
     sports: list[TaskSport]
 
 
+class TaskCursor(BaseModel):
+    """Position in a user's history, newest first: the last task of the previous page"""
+
+    created_at: dt.datetime
+    id: UUID
+
+
 class TaskCreate(BaseModel):
     user_id: UUID
     app_bundle: str
     request_text: str | None = None
     request_filename: str | None = None
+    image_hash: int | None = None
+    kind: TaskKind | None = None
+    parent_id: UUID | None = None
     status: TaskStatus = TaskStatus.queued
 
 
+class TaskInput(BaseModel):
+    """Uploaded file admitted by the input budget, a handle on its stored copy when it is not resident"""
+
+    file: BytesIO | BufferedReader
+    size: int
+    resident: bool
+
+    model_config = ConfigDict(arbitrary_types_allowed=True)
+
+
 class TaskRun(IntegrationTaskRunParamsDTO, BaseModel):
-    file: BytesIO | None = None
+    file: BytesIO | BufferedReader | None = None
+    file_path: str | None = None
+    input_size: int = 0
+    input_resident: bool = True
     text: str | None = None
+    previous_result: dict | None = None
+    image_hash: int | None = None
+    profile: IntegrationUserProfileDTO | None = None
 
     model_config = ConfigDict(arbitrary_types_allowed=True)
 
@@ -0,0 +1,3 @@
+class TaskInputBudgetExceededException(Exception):
+    def __init__(self, *args: object) -> None:
+        super().__init__(*args)
@@ -1,14 +1,11 @@
-import json
-
-from pydantic import ValidationError
 from src.task.domain.dtos import TaskProductDTO, TaskResultDTO, TaskSportDTO
 from src.task.domain.entities import TaskStatus
-from src.integration.domain.dtos import IntegrationTaskStatus, IntegrationTaskResultDTO
+from src.integration.domain.dtos import IntegrationResultKind, IntegrationTaskStatus, IntegrationTaskResultDTO
 
 
 class IntegrationResponseToDomainMapper:
     def map_one(self, data: IntegrationTaskResultDTO) -> TaskResultDTO:
-        products, sports = self._map_result(data.result)
+        products, sports = self._map_result(data.kind, data.result)
 
         return TaskResultDTO(
             external_task_id=data.external_task_id,
@@ -18,21 +15,17 @@ class IntegrationResponseToDomainMapper:
             sports=sports
         )
 
-    def _map_result(self, result: list[dict] | None) -> tuple[list[TaskProductDTO], list[TaskSportDTO]]:
-        products, sports = [], []
-        try:
-            products = [TaskProductDTO(**product) for product in result or []]
-        except ValidationError:
-            pass
-        try:
-            sports = [TaskSportDTO(**sport) for sport in result or []]
-        except ValidationError:
-            pass
-
-        if result and not products and not sports:
-            raise ValueError("Unknown result")
-
-        return products, sports
+    def _map_result(
+        self, kind: IntegrationResultKind | None, result: list[TaskProductDTO] | list[TaskSportDTO] | None
+    ) -> tuple[list[TaskProductDTO], list[TaskSportDTO]]:
+        """Items come parsed by the runner, TaskResultDTO only checks they are the kind it declared"""
+        if not result:
+            return [], []
+        if kind == IntegrationResultKind.products:
+            return result, []
+        if kind == IntegrationResultKind.sports:
+            return [], result
+        raise ValueError("Unknown result")
 
     def _map_status(self, status: IntegrationTaskStatus) -> TaskStatus:
         if status == IntegrationTaskStatus.queued:
@@ -0,0 +1,31 @@
+from uuid import UUID
+from collections import OrderedDict
+
+from src.core.config import settings
+from src.task.domain.entities import Task, TaskStatus
+from src.task.application.interfaces.task_result_cache import ITaskResultCache
+
+
+class InMemoryTaskResultCache(ITaskResultCache):
+    """LRU of finished task results, shared by all requests of the worker"""
+
+    def __init__(self, maxsize: int) -> None:
+        self.maxsize = maxsize
+        self._items: OrderedDict[UUID, Task] = OrderedDict()
+
+    async def get(self, task_id: UUID) -> Task | None:
+        task = self._items.get(task_id)
+        if task is not None:
+            self._items.move_to_end(task_id)
+        return task
+
+    async def set(self, task: Task) -> None:
+        if task.status != TaskStatus.finished:
+            return
+        self._items[task.id] = task
+        self._items.move_to_end(task.id)
+        while len(self._items) > self.maxsize:
+            self._items.popitem(last=False)
+
+
+task_result_cache = InMemoryTaskResultCache(settings.TASK_RESULT_CACHE_SIZE)
@@ -1,5 +1,6 @@
 from uuid import UUID
-from sqlalchemy import ForeignKey
+from sqlalchemy import BigInteger, ForeignKey, Index, text
+from sqlalchemy.dialects.postgresql import JSONB
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 
 from src.db.base import Base, BaseMixin
@@ -8,7 +9,8 @@ from src.db.base import Base, BaseMixin
 class TaskProductIngredientDB(BaseMixin, Base):
     __tablename__ = "task_ingredients"
 
-    product_id: Mapped[UUID] = mapped_column(ForeignKey("task_products.id", ondelete="CASCADE"))
+    product_id: Mapped[UUID] = mapped_column(ForeignKey("task_products.id", ondelete="CASCADE"), index=True)
+    position: Mapped[int] = mapped_column(default=0, server_default="0", doc="Place in the product")
 
     name: Mapped[str | None]
     weight: Mapped[float | None]
@@ -24,7 +26,8 @@ class TaskProductIngredientDB(BaseMixin, Base):
 class TaskProductDB(BaseMixin, Base):
     __tablename__ = "task_products"
 
-    task_id: Mapped[UUID] = mapped_column(ForeignKey("tasks.id", ondelete="CASCADE"))
+    task_id: Mapped[UUID] = mapped_column(ForeignKey("tasks.id", ondelete="CASCADE"), index=True)
+    position: Mapped[int] = mapped_column(default=0, server_default="0", doc="Place in the result")
 
     name: Mapped[str | None]
     weight: Mapped[float | None]
@@ -35,14 +38,17 @@ class TaskProductDB(BaseMixin, Base):
     fiber: Mapped[float | None] = mapped_column(doc="Клетчатка")
     commentary: Mapped[str | None]
 
-    ingredients: Mapped[list["TaskProductIngredientDB"]] = relationship(back_populates="product", lazy="selectin")
+    ingredients: Mapped[list["TaskProductIngredientDB"]] = relationship(
+        back_populates="product", lazy="selectin", order_by="TaskProductIngredientDB.position"
+    )
     task: Mapped['TaskDB'] = relationship(back_populates="products")
 
 
 class TaskSportDB(BaseMixin, Base):
     __tablename__ = "task_sports"
 
-    task_id: Mapped[UUID] = mapped_column(ForeignKey("tasks.id", ondelete="CASCADE"))
+    task_id: Mapped[UUID] = mapped_column(ForeignKey("tasks.id", ondelete="CASCADE"), index=True)
+    position: Mapped[int] = mapped_column(default=0, server_default="0", doc="Place in the result")
     name: Mapped[str | None]
     calories: Mapped[float | None]
     length: Mapped[int | None]
@@ -59,7 +65,28 @@ class TaskDB(BaseMixin, Base):
     error: Mapped[str | None]
     request_text: Mapped[str | None]
     request_filename: Mapped[str | None]
-
-    products: Mapped[list['TaskProductDB']] = relationship(back_populates="task", lazy="selectin")
-    sports: Mapped[list['TaskSportDB']] = relationship(back_populates="task", lazy="selectin")
+    image_hash: Mapped[int | None] = mapped_column(BigInteger, doc="dHash of the uploaded photo")
+    result: Mapped[dict | None] = mapped_column(JSONB, doc="Products and sports as one document")
+    kind: Mapped[str | None] = mapped_column(doc="meal or sport")
+    parent_id: Mapped[UUID | None] = mapped_column(
+        ForeignKey("tasks.id", ondelete="SET NULL"), index=True, doc="The task this one edits"
+    )
+
+    products: Mapped[list['TaskProductDB']] = relationship(
+        back_populates="task", lazy="selectin", order_by="TaskProductDB.position"
+    )
+    sports: Mapped[list['TaskSportDB']] = relationship(
+        back_populates="task", lazy="selectin", order_by="TaskSportDB.position"
+    )
     user: Mapped["UserDB"] = relationship(back_populates="tasks")
+
+    __table_args__ = (
+        Index("tasks_user_id_created_at_id_idx", "user_id", text("created_at DESC"), text("id DESC")),
+        Index("tasks_user_id_kind_created_at_id_idx", "user_id", "kind", text("created_at DESC"), text("id DESC")),
+        Index(
+            "tasks_user_id_created_at_image_hash_idx",
+            "user_id",
+            text("created_at DESC"),
+            postgresql_where=text("image_hash IS NOT NULL"),
+        ),
+    )
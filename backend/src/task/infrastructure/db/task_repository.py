@@ -1,14 +1,20 @@
+import uuid
+import datetime as dt
 from uuid import UUID
 
-from sqlalchemy import delete, update
-from sqlalchemy.exc import IntegrityError, MissingGreenlet
+from pydantic import TypeAdapter
+from sqlalchemy import ColumnElement, cast, delete, func, insert, literal, literal_column, select, tuple_, update
+from sqlalchemy.dialects.postgresql import BIT, JSONB, aggregate_order_by
+from sqlalchemy.exc import IntegrityError
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy.orm import selectinload
 
+from src.core.config import settings
 from src.db.exceptions import DBModelConflictException, DBModelNotFoundException
 from src.task.domain.entities import (
     Task,
     TaskCreate,
+    TaskCursor,
+    TaskKind,
     TaskProduct,
     TaskProductIngredient,
     TaskSport,
@@ -19,9 +25,66 @@ from src.task.infrastructure.db.orm import TaskDB, TaskProductDB, TaskProductIng
 from src.task.application.interfaces.task_repository import ITaskRepository
 
 
+RESULT_FIELDS = {"products", "sports"}
+TASK_COLUMNS = (
+    TaskDB.id,
+    TaskDB.user_id,
+    TaskDB.app_bundle,
+    TaskDB.status,
+    TaskDB.error,
+    TaskDB.request_text,
+    TaskDB.request_filename,
+    TaskDB.kind,
+    TaskDB.parent_id,
+    TaskDB.created_at,
+)
+RESULT_ADAPTERS = {"products": TypeAdapter(list[TaskProduct]), "sports": TypeAdapter(list[TaskSport])}
+
+
+def _json_object(model, fields, **nested: ColumnElement) -> ColumnElement:
+    pairs = [(field, getattr(model, field)) for field in fields] + list(nested.items())
+    return func.jsonb_build_object(*(part for key, value in pairs for part in (literal_column(f"'{key}'"), value)))
+
+
+def _json_array(model, element: ColumnElement, where: ColumnElement) -> ColumnElement:
+    """Correlated subquery: the matching rows as one JSON array, in the order they were written"""
+    aggregated = func.jsonb_agg(aggregate_order_by(element, model.position, model.id))
+    return (
+        select(func.coalesce(aggregated, literal_column("'[]'::jsonb"), type_=JSONB)).where(where).scalar_subquery()
+    )
+
+
+# The same shape as the TaskProduct and TaskSport dumps, so one statement reads a whole result
+RESULT_JSON = {
+    "products": _json_array(
+        TaskProductDB,
+        _json_object(
+            TaskProductDB,
+            [field for field in TaskProduct.model_fields if field != "ingredients"],
+            ingredients=_json_array(
+                TaskProductIngredientDB,
+                _json_object(TaskProductIngredientDB, TaskProductIngredient.model_fields),
+                TaskProductIngredientDB.product_id == TaskProductDB.id,
+            ),
+        ),
+        TaskProductDB.task_id == TaskDB.id,
+    ),
+    "sports": _json_array(
+        TaskSportDB, _json_object(TaskSportDB, TaskSport.model_fields), TaskSportDB.task_id == TaskDB.id
+    ),
+}
+
+
 class PGTaskRepository(ITaskRepository):
-    def __init__(self, session: AsyncSession) -> None:
+    """Results are stored in the normalized tables, in the `tasks.result` document, or in both
+
+    `dual` writes both and reads the document, falling back to the tables for rows not backfilled yet;
+    `document` stops writing the tables.
+    """
+
+    def __init__(self, session: AsyncSession, storage: str | None = None) -> None:
         self.session = session
+        self.storage = settings.TASK_RESULT_STORAGE if storage is None else storage
 
     async def _flush(self):
         try:
@@ -31,98 +94,182 @@ class PGTaskRepository(ITaskRepository):
             raise DBModelConflictException(detail) from e
 
     async def create(self, data: TaskCreate) -> Task:
-        model = TaskDB(**(data.model_dump() | {"status": "queued"}))
+        # A new task has no results: empty collections spare the selectin loads after the flush
+        model = TaskDB(**(data.model_dump() | {"status": "queued"}), products=[], sports=[])
         self.session.add(model)
         await self._flush()
         return self._to_domain(model)
 
+    def _result_column(self, field: str) -> ColumnElement:
+        """The document part when it is there, the normalized rows aggregated otherwise"""
+        if self.storage == "normalized":
+            return RESULT_JSON[field].label(field)
+        return func.coalesce(TaskDB.result[field], RESULT_JSON[field], type_=JSONB).label(field)
+
+    @staticmethod
+    def _row_to_domain(row, **known) -> Task:
+        fields = row._asdict()
+        for field, adapter in RESULT_ADAPTERS.items():
+            if field in fields:
+                fields[field] = adapter.validate_python(fields[field])
+        return Task(**fields, **known)
+
     async def get_by_pk(self, pk: UUID) -> Task:
-        model = await self.session.get(
-            TaskDB,
-            pk,
-            options=[
-                selectinload(TaskDB.products).selectinload(TaskProductDB.ingredients),
-                selectinload(TaskDB.sports),
-            ],
+        """One round trip: the result comes aggregated to JSON by the database, no ORM objects are built"""
+        query = select(*TASK_COLUMNS, *(self._result_column(field) for field in RESULT_FIELDS)).filter_by(id=pk)
+        row = (await self.session.execute(query)).one_or_none()
+        if row is None:
+            raise DBModelNotFoundException()
+        return self._row_to_domain(row)
+
+    async def get_by_user_id(
+        self, user_id: UUID, before: TaskCursor | None = None, limit: int = 20, kind: TaskKind | None = None
+    ) -> list[Task]:
+        """Keyset page on (created_at, id): an index range scan from the cursor, as fast on page 1000 as on page 1
+
+        The results come with the page rows, aggregated by the same subqueries as `get_by_pk`.
+        """
+        query = select(*TASK_COLUMNS, *(self._result_column(field) for field in RESULT_FIELDS)).filter_by(
+            user_id=user_id
+        )
+        if kind is not None:
+            query = query.filter_by(kind=kind.value)
+        if before is not None:
+            query = query.where(tuple_(TaskDB.created_at, TaskDB.id) < tuple_(before.created_at, before.id))
+        query = query.order_by(TaskDB.created_at.desc(), TaskDB.id.desc()).limit(limit)
+        return [self._row_to_domain(row) for row in await self.session.execute(query)]
+
+    async def get_edit_chain(self, pk: UUID) -> list[Task]:
+        """Locking the root first makes results of one chain, finishing together, take turns"""
+        ancestors = select(TaskDB.id, TaskDB.parent_id).filter_by(id=pk).cte("ancestors", recursive=True)
+        ancestors = ancestors.union_all(
+            select(TaskDB.id, TaskDB.parent_id).join(ancestors, TaskDB.id == ancestors.c.parent_id)
         )
-        if model is None:
+        root_query = (
+            select(TaskDB.id)
+            .where(TaskDB.id.in_(select(ancestors.c.id).where(ancestors.c.parent_id.is_(None))))
+            .with_for_update()
+        )
+        root_id = (await self.session.execute(root_query)).scalar_one_or_none()
+        if root_id is None:
             raise DBModelNotFoundException()
-        return self._to_domain(model)
 
-    async def update_by_pk(self, pk: UUID, data: TaskUpdate) -> Task:
+        chain = select(TaskDB.id).filter_by(id=root_id).cte("chain", recursive=True)
+        chain = chain.union_all(select(TaskDB.id).join(chain, TaskDB.parent_id == chain.c.id))
         query = (
-            update(TaskDB)
-            .filter_by(id=pk)
-            .values(**data.model_dump(mode="json", exclude_none=True, exclude={"products", "sports"}))
+            select(*TASK_COLUMNS, *(self._result_column(field) for field in RESULT_FIELDS))
+            .where(TaskDB.id.in_(select(chain.c.id)))
+            .order_by(TaskDB.created_at, TaskDB.id)
         )
-        await self.session.execute(query)
-
-        if data.products:
-            await self.session.execute(delete(TaskProductDB).filter_by(task_id=pk))
-            self.session.add_all(
-                [
-                    TaskProductDB(
-                        task_id=pk,
-                        **product.model_dump(mode="json", exclude={"ingredients"}),
-                        ingredients=[
-                            TaskProductIngredientDB(**ing.model_dump(mode="json")) for ing in product.ingredients
-                        ],
-                    )
-                    for product in data.products
-                ]
+        return [self._row_to_domain(row) for row in await self.session.execute(query)]
+
+    async def get_image_duplicate(
+        self, pk: UUID, image_hash: int, max_distance: int, lookback: int, window_seconds: float
+    ) -> Task | None:
+        """A range scan of the (user_id, created_at) photo index, bounded by the window and the lookback"""
+        owner = select(TaskDB.user_id).filter_by(id=pk).scalar_subquery()
+        since = dt.datetime.now() - dt.timedelta(seconds=window_seconds)
+        recent = (
+            select(TaskDB.id, TaskDB.image_hash)
+            .where(
+                TaskDB.user_id == owner,
+                TaskDB.image_hash.is_not(None),
+                TaskDB.created_at >= since,
+                TaskDB.status == TaskStatus.finished.value,
+                TaskDB.id != pk,
             )
-        if data.sports:
-            await self.session.execute(delete(TaskSportDB).filter_by(task_id=pk))
-            self.session.add_all(
-                [
-                    TaskSportDB(
-                        task_id=pk,
-                        **sport.model_dump(mode="json"),
-                    )
-                    for sport in data.sports
-                ]
+            .order_by(TaskDB.created_at.desc())
+            .limit(lookback)
+            .subquery()
+        )
+        distance = func.bit_count(cast(recent.c.image_hash.op("#")(image_hash), BIT(64)))
+        query = select(recent.c.id).where(distance <= max_distance).order_by(distance).limit(1)
+        duplicate_id = (await self.session.execute(query)).scalar_one_or_none()
+        if duplicate_id is None:
+            return None
+        return await self.get_by_pk(duplicate_id)
+
+    async def update_by_pk(self, pk: UUID, data: TaskUpdate) -> Task:
+        """Bulk writes whatever the result size: products and ingredients go in one multi-row INSERT each"""
+        values = data.model_dump(mode="json", exclude_none=True, exclude=RESULT_FIELDS)
+        document = data.model_dump(mode="json", exclude_none=True, include=RESULT_FIELDS)
+        if self.storage != "normalized" and document:
+            # Merged in place, an update with only sports keeps the stored products
+            values["result"] = func.coalesce(TaskDB.result, literal({}, JSONB)).op("||", return_type=JSONB)(
+                literal(document, JSONB)
             )
 
-        await self._flush()
-        return await self.get_by_pk(pk)
+        # Parts written to the tables below are known already, the rest comes back with the update
+        replaced = {} if self.storage == "document" else {f: v for f in RESULT_FIELDS if (v := getattr(data, f))}
+        returned = [self._result_column(field) for field in RESULT_FIELDS if field not in replaced]
+        query = update(TaskDB).filter_by(id=pk).values(**values).returning(*TASK_COLUMNS, *returned)
+        try:
+            row = (await self.session.execute(query)).one_or_none()
+        except IntegrityError as e:
+            raise DBModelConflictException("Model can't be updated. " + str(e)) from e
+        if row is None:
+            raise DBModelNotFoundException()
+
+        if "products" in replaced:
+            await self._replace_products(pk, data.products)
+        if "sports" in replaced:
+            await self._replace_sports(pk, data.sports)
+        return self._row_to_domain(row, **replaced)
+
+    async def _replace_products(self, pk: UUID, products: list[TaskProduct]) -> None:
+        await self.session.execute(delete(TaskProductDB).filter_by(task_id=pk))
+        # Ids made here: with gen_random_uuid() defaults SQLAlchemy can only match RETURNING rows to products
+        # by inserting them one at a time
+        product_ids = [uuid.uuid4() for _ in products]
+        rows = [
+            {"id": product_id, "task_id": pk, "position": i, **product.model_dump(mode="json", exclude={"ingredients"})}
+            for i, (product_id, product) in enumerate(zip(product_ids, products, strict=True))
+        ]
+        await self.session.execute(insert(TaskProductDB), rows)
+        ingredients = [
+            {"product_id": product_id, "position": i, **ingredient.model_dump(mode="json")}
+            for product_id, product in zip(product_ids, products, strict=True)
+            for i, ingredient in enumerate(product.ingredients)
+        ]
+        if ingredients:
+            await self.session.execute(insert(TaskProductIngredientDB), ingredients)
+
+    async def _replace_sports(self, pk: UUID, sports: list[TaskSport]) -> None:
+        await self.session.execute(delete(TaskSportDB).filter_by(task_id=pk))
+        rows = [{"task_id": pk, "position": i, **sport.model_dump(mode="json")} for i, sport in enumerate(sports)]
+        await self.session.execute(insert(TaskSportDB), rows)
 
     @staticmethod
-    def _to_domain(model: TaskDB) -> Task:
-        try:
-            products = [
-                TaskProduct(
-                    name=product.name,
-                    weight=product.weight,
-                    calories=product.calories,
-                    proteins=product.proteins,
-                    fiber=product.fiber,
-                    carbohydrates=product.carbohydrates,
-                    fats=product.fats,
-                    ingredients=[
-                        TaskProductIngredient(
-                            name=ing.name,
-                            weight=ing.weight,
-                            calories=ing.calories,
-                            proteins=ing.proteins,
-                            fiber=ing.fiber,
-                            carbohydrates=ing.carbohydrates,
-                            fats=ing.fats,
-                        )
-                        for ing in product.ingredients
-                    ],
+    def _product_to_domain(product: TaskProductDB) -> TaskProduct:
+        return TaskProduct(
+            name=product.name,
+            weight=product.weight,
+            calories=product.calories,
+            proteins=product.proteins,
+            fiber=product.fiber,
+            carbohydrates=product.carbohydrates,
+            fats=product.fats,
+            commentary=product.commentary,
+            ingredients=[
+                TaskProductIngredient(
+                    name=ing.name,
+                    weight=ing.weight,
+                    calories=ing.calories,
+                    proteins=ing.proteins,
+                    fiber=ing.fiber,
+                    carbohydrates=ing.carbohydrates,
+                    fats=ing.fats,
                 )
-                for product in model.products
-            ]
-        except MissingGreenlet:
-            products = []
+                for ing in product.ingredients
+            ],
+        )
 
-        try:
-            sports = [
-                TaskSport(name=sport.name, calories=sport.calories, length=sport.length) for sport in model.sports
-            ]
-        except MissingGreenlet:
-            sports = []
+    @staticmethod
+    def _sport_to_domain(sport: TaskSportDB) -> TaskSport:
+        return TaskSport(name=sport.name, calories=sport.calories, length=sport.length)
 
+    @classmethod
+    def _to_domain(cls, model: TaskDB) -> Task:
         return Task(
             id=model.id,
             user_id=model.user_id,
@@ -131,6 +278,9 @@ class PGTaskRepository(ITaskRepository):
             error=model.error,
             request_text=model.request_text,
             request_filename=model.request_filename,
-            products=products,
-            sports=sports,
+            kind=model.kind,
+            parent_id=model.parent_id,
+            created_at=model.created_at,
+            products=[cls._product_to_domain(product) for product in model.products],
+            sports=[cls._sport_to_domain(sport) for sport in model.sports],
         )
@@ -1,28 +1,68 @@
+from uuid import UUID
+
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from src.db.engine import async_session_maker
+from src.db.replica import ReplicaRouter, replica_router
 from src.task.application.interfaces.task_uow import ITaskUnitOfWork
 from src.task.infrastructure.db.task_repository import PGTaskRepository
 from src.user.infrastructure.repository import UserRepository
 
 
 class TaskUnitOfWork(ITaskUnitOfWork):
-    def __init__(self, session_getter=async_session_maker) -> None:
+    """Nested blocks join the open one's session and transaction, only the outermost commits, rolls back and closes"""
+
+    def __init__(
+        self, session_getter=async_session_maker, user_id: UUID | None = None, router: ReplicaRouter = replica_router
+    ) -> None:
+        """`user_id` is the user making the request, whose reads follow their commits to the primary for a while"""
         super().__init__()
         self.session_getter = session_getter
+        self.user_id = user_id
+        self.router = router
+        self._depth = 0
 
     async def __aenter__(self):
+        self._depth += 1
+        if self._depth > 1:
+            return self
         self.session: AsyncSession = self.session_getter()
         self.tasks = PGTaskRepository(self.session)
         self.users = UserRepository(self.session)
         return await super().__aenter__()
 
     async def __aexit__(self, *args):
+        self._depth -= 1
+        if self._depth:
+            return
         await super().__aexit__(*args)
         await self.session.close()
 
+    async def commit(self):
+        """A no-op in a nested block: the use cases it runs commit together, when the outermost block does"""
+        if self._depth > 1:
+            return
+        await super().commit()
+
     async def _commit(self):
         await self.session.commit()
+        if self.user_id is not None:
+            self.router.record_write(self.user_id)
 
     async def _rollback(self):
         await self.session.rollback()
+
+
+class ReadOnlyTaskUnitOfWork(TaskUnitOfWork):
+    """Reads from the replica, or from the primary when the router says the replica may be stale"""
+
+    def __init__(self, user_id: UUID | None = None, router: ReplicaRouter = replica_router) -> None:
+        super().__init__(None, user_id, router)
+
+    async def __aenter__(self):
+        if not self._depth:
+            self.session_getter = self.router.session_maker(self.user_id)
+        return await super().__aenter__()
+
+    async def _commit(self):
+        raise RuntimeError("Read-only unit of work can't commit")
@@ -0,0 +1,80 @@
+import os
+import asyncio
+import resource
+
+from loguru import logger
+from prometheus_client import Gauge, Counter
+
+from src.core.config import settings
+from src.task.domain.exceptions import TaskInputBudgetExceededException
+from src.task.application.interfaces.task_input_budget import ITaskInputBudget
+
+task_input_bytes = Gauge("task_input_bytes", "Bytes of task inputs held between upload and run end", ["placement"])
+task_inputs = Counter("task_inputs_total", "Task inputs by where they wait for the run", ["placement"])
+worker_rss = Gauge("worker_resident_memory_bytes", "Resident set size of the worker process", ["pid"])
+
+_PAGE_SIZE = os.sysconf("SC_PAGE_SIZE")
+
+
+def _rss_bytes() -> int:
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * _PAGE_SIZE
+    except OSError:
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024  # peak, not current
+
+
+class TaskInputBudget(ITaskInputBudget):
+    """Bytes of uploaded inputs held by this worker, from upload to the end of their run
+
+    Inputs that fit in `memory_limit` stay in memory, the rest are dropped after the upload is stored and read
+    back from disk by the run. Above `inflight_limit` new uploads wait for runs to finish, up to `wait_seconds`.
+    """
+
+    def __init__(self, memory_limit: int, inflight_limit: int, wait_seconds: float) -> None:
+        self.memory_limit = memory_limit
+        self.inflight_limit = inflight_limit
+        self.wait_seconds = wait_seconds
+        self.resident = 0
+        self.inflight = 0
+        self._released = asyncio.Condition()
+
+    def _has_room(self, size: int) -> bool:
+        # A single input larger than the limit still runs, alone
+        return self.inflight == 0 or self.inflight + size <= self.inflight_limit
+
+    async def acquire(self, size: int) -> bool:
+        async with self._released:
+            try:
+                await asyncio.wait_for(self._released.wait_for(lambda: self._has_room(size)), self.wait_seconds)
+            except TimeoutError as e:
+                task_inputs.labels(placement="rejected").inc()
+                raise TaskInputBudgetExceededException(f"{self.inflight} bytes of inputs in flight") from e
+
+            self.inflight += size
+            resident = self.resident + size <= self.memory_limit
+            if resident:
+                self.resident += size
+            else:
+                logger.debug(f"Task input of {size} bytes spills to disk, {self.resident} bytes resident")
+            task_inputs.labels(placement="memory" if resident else "disk").inc()
+            self._update_metrics()
+            return resident
+
+    async def release(self, size: int, resident: bool) -> None:
+        async with self._released:
+            self.inflight -= size
+            if resident:
+                self.resident -= size
+            self._update_metrics()
+            self._released.notify_all()
+
+    def _update_metrics(self) -> None:
+        task_input_bytes.labels(placement="memory").set(self.resident)
+        task_input_bytes.labels(placement="disk").set(self.inflight - self.resident)
+        worker_rss.labels(pid=str(os.getpid())).set(_rss_bytes())
+
+
+task_input_budget = TaskInputBudget(
+    settings.TASK_INPUT_MEMORY_BUDGET, settings.TASK_INPUT_INFLIGHT_LIMIT, settings.TASK_INPUT_WAIT_SECONDS
+)
@@ -0,0 +1,38 @@
+import time
+from uuid import UUID
+from collections import OrderedDict
+
+from src.core.config import settings
+from src.task.application.interfaces.task_rate_limiter import ITaskRateLimiter
+
+
+class TokenBucketRateLimiter(ITaskRateLimiter):
+    """Per-user bucket of model tokens in this worker, refilled continuously, idle buckets evicted LRU"""
+
+    def __init__(self, capacity: int, refill_per_second: float, max_users: int = 100_000) -> None:
+        self.capacity = capacity
+        self.refill_per_second = refill_per_second
+        self.max_users = max_users
+        self._buckets: OrderedDict[UUID, tuple[float, float]] = OrderedDict()
+
+    def _level(self, user_id: UUID, now: float) -> float:
+        level, updated_at = self._buckets.get(user_id, (self.capacity, now))
+        return min(self.capacity, level + (now - updated_at) * self.refill_per_second)
+
+    async def consume(self, user_id: UUID, cost: int) -> float:
+        now = time.monotonic()
+        level = self._level(user_id, now)
+        cost = min(cost, self.capacity)  # an input at the limits still gets through a full bucket
+        if level < cost:
+            return (cost - level) / self.refill_per_second
+
+        self._buckets[user_id] = (level - cost, now)
+        self._buckets.move_to_end(user_id)
+        while len(self._buckets) > self.max_users:
+            self._buckets.popitem(last=False)
+        return 0.0
+
+
+task_rate_limiter = TokenBucketRateLimiter(
+    settings.TASK_USER_TOKEN_BUCKET_CAPACITY, settings.TASK_USER_TOKEN_BUCKET_REFILL_PER_SECOND
+)
@@ -10,7 +10,9 @@ from src.user.infrastructure.models import UserDB
 class UserAdmin(ModelView, model=UserDB):
     details_template = "users.html"
     name = "User"
-    column_list = "__all__"
+    column_exclude_list = [UserDB.tasks]
+    column_details_exclude_list = [UserDB.tasks]
+    form_excluded_columns = [UserDB.tasks]
 
     def _build_url_for(self, name: str, request: Request, obj: Any) -> URL:
         if name == 'admin:user:tasks':
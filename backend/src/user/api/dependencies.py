@@ -1,14 +1,23 @@
+from uuid import UUID
 from typing import Annotated
 
 from fastapi import Depends
 
+from src.core.auth import get_current_user_id_optional
 from src.db.dependencies import DBAsyncSessionDep
-from src.user.infrastructure.uow import UserUnitOfWork
+from src.user.infrastructure.uow import ReadOnlyUserUnitOfWork, UserUnitOfWork
 from src.user.application.interfaces.user_uow import IUserUnitOfWork
 
 
-def get_user_uow(session: DBAsyncSessionDep) -> IUserUnitOfWork:
-    return UserUnitOfWork(session_factory=lambda: session)
+def get_user_uow(
+    session: DBAsyncSessionDep, user_id: UUID | None = Depends(get_current_user_id_optional)
+) -> IUserUnitOfWork:
+    return UserUnitOfWork(session_factory=lambda: session, user_id=user_id)
+
+
+def get_user_read_uow(user_id: UUID | None = Depends(get_current_user_id_optional)) -> IUserUnitOfWork:
+    return ReadOnlyUserUnitOfWork(user_id=user_id)
 
 
 UserUoWDepend = Annotated[IUserUnitOfWork, Depends(get_user_uow)]
+UserReadUoWDepend = Annotated[IUserUnitOfWork, Depends(get_user_read_uow)]
@@ -1,12 +1,21 @@
+import datetime as dt
 from uuid import UUID
 
-from fastapi import Depends, APIRouter
+from fastapi import Query, Depends, APIRouter
 
 from src.core.auth import get_current_user_id
 from src.user.application.use_cases.update_user import UpdateUserUseCase
-from src.user.domain.dtos import UserReadDTO, UserCreateDTO, TokenResponseDTO, UserAuthorizeDTO, UserUpdateDTO
-from src.user.api.dependencies import UserUoWDepend
+from src.user.domain.dtos import (
+    DailyTotalsDTO,
+    UserReadDTO,
+    UserCreateDTO,
+    TokenResponseDTO,
+    UserAuthorizeDTO,
+    UserUpdateDTO,
+)
+from src.user.api.dependencies import UserReadUoWDepend, UserUoWDepend
 from src.user.application.use_cases.get_user import GetUserUseCase
+from src.user.application.use_cases.get_daily_totals import GetDailyTotalsUseCase
 from src.user.application.use_cases.create_user import CreateUserUseCase
 from src.user.application.use_cases.authorize_user import AuthorizeUserUseCase
 
@@ -24,10 +33,20 @@ async def update_me(dto: UserUpdateDTO, uow: UserUoWDepend, current_user_id: UUI
 
 
 @router.get("/me", response_model=UserReadDTO)
-async def get_me(uow: UserUoWDepend, current_user_id: UUID = Depends(get_current_user_id)):
+async def get_me(uow: UserReadUoWDepend, current_user_id: UUID = Depends(get_current_user_id)):
     return await GetUserUseCase(uow).execute(current_user_id)
 
 
+@router.get("/me/daily", response_model=list[DailyTotalsDTO])
+async def get_my_daily_totals(
+    uow: UserReadUoWDepend,
+    date_from: dt.date = Query(alias="from"),
+    date_to: dt.date = Query(alias="to"),
+    current_user_id: UUID = Depends(get_current_user_id),
+):
+    return await GetDailyTotalsUseCase(uow).execute(current_user_id, date_from, date_to)
+
+
 @router.post("/authorize", response_model=TokenResponseDTO)
 async def authorize_user(dto: UserAuthorizeDTO, uow: UserUoWDepend):
     return await AuthorizeUserUseCase(uow).execute(dto)
@@ -1,7 +1,8 @@
 import abc
+import datetime as dt
 from uuid import UUID
 
-from src.user.domain.entities import User, UserFilters, UserUpdate
+from src.user.domain.entities import DailyTotals, User, UserFilters, UserUpdate
 
 
 class IUserRepository(abc.ABC):
@@ -22,3 +23,11 @@ class IUserRepository(abc.ABC):
 
     @abc.abstractmethod
     async def delete_by_pk(self, pk: UUID) -> None: ...
+
+    @abc.abstractmethod
+    async def add_daily_totals(self, pk: UUID, delta: DailyTotals) -> None:
+        """Adds `delta`, negative parts included, to the user's totals of `delta.day`"""
+
+    @abc.abstractmethod
+    async def get_daily_totals(self, pk: UUID, date_from: dt.date, date_to: dt.date) -> list[DailyTotals]:
+        """Stored days of the range, inclusive, in order"""
@@ -0,0 +1,27 @@
+import datetime as dt
+from uuid import UUID
+
+from fastapi import HTTPException
+
+from src.user.domain.dtos import DailyTotalsDTO
+from src.user.application.interfaces.user_uow import IUserUnitOfWork
+
+
+class GetDailyTotalsUseCase:
+    MAX_DAYS = 366
+
+    def __init__(self, uow: IUserUnitOfWork) -> None:
+        self.uow = uow
+
+    async def execute(self, user_id: UUID, date_from: dt.date, date_to: dt.date) -> list[DailyTotalsDTO]:
+        """Every day of the range, days without results as zeros"""
+        days = (date_to - date_from).days + 1
+        if not 0 < days <= self.MAX_DAYS:
+            raise HTTPException(400, f"The range must be 1 to {self.MAX_DAYS} days, `from` not after `to`")
+        async with self.uow:
+            totals = await self.uow.users.get_daily_totals(user_id, date_from, date_to)
+        stored = {day_totals.day: day_totals for day_totals in totals}
+        return [
+            DailyTotalsDTO(**stored[day].model_dump()) if day in stored else DailyTotalsDTO(day=day)
+            for day in (date_from + dt.timedelta(days=i) for i in range(days))
+        ]
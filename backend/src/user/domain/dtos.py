@@ -1,3 +1,4 @@
+import datetime as dt
 from uuid import UUID
 
 from pydantic import BaseModel
@@ -36,3 +37,13 @@ class UserAuthorizeDTO(BaseModel):
 class TokenResponseDTO(BaseModel):
     access_token: str
     token_type: str = "bearer"
+
+
+class DailyTotalsDTO(BaseModel):
+    day: dt.date
+    calories: float = 0
+    proteins: float = 0
+    fats: float = 0
+    carbohydrates: float = 0
+    fiber: float = 0
+    sport_calories: float = 0
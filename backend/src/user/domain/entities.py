@@ -1,3 +1,4 @@
+import datetime as dt
 from typing import Literal
 from uuid import UUID
 
@@ -25,3 +26,15 @@ class UserUpdate(BaseModel):
 class UserFilters(BaseModel):
     count: int
     offset: int
+
+
+class DailyTotals(BaseModel):
+    """Nutrition eaten and sport calories burned by a user in a day"""
+
+    day: dt.date
+    calories: float = 0
+    proteins: float = 0
+    fats: float = 0
+    carbohydrates: float = 0
+    fiber: float = 0
+    sport_calories: float = 0
@@ -1,6 +1,6 @@
-from .uow import UserUnitOfWork
+from .uow import ReadOnlyUserUnitOfWork, UserUnitOfWork
 from .models import UserDB
 from .repository import UserRepository
 
-__all__ = ["UserDB", "UserRepository", "UserUnitOfWork"]
+__all__ = ["UserDB", "UserRepository", "UserUnitOfWork", "ReadOnlyUserUnitOfWork"]
 
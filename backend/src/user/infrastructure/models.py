@@ -1,4 +1,7 @@
-from sqlalchemy import String
+import datetime as dt
+from uuid import UUID
+
+from sqlalchemy import ForeignKey, String, UniqueConstraint, text
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 
 from src.db.base import Base, BaseMixin
@@ -13,4 +16,22 @@ class UserDB(Base, BaseMixin):
     height: Mapped[int | None]
     target: Mapped[str | None]
 
-    tasks: Mapped[list["TaskDB"]] = relationship(back_populates="user", lazy="selectin")
+    # The history grows without bound: it is read page by page through the task repository, never loaded here
+    tasks: Mapped[list["TaskDB"]] = relationship(back_populates="user", lazy="raise_on_sql", passive_deletes=True)
+
+
+class UserDailyTotalsDB(Base, BaseMixin):
+    """Running sums per user and day, changed by every stored task result in its own transaction"""
+
+    __tablename__ = "user_daily_totals"
+
+    user_id: Mapped[UUID] = mapped_column(ForeignKey("users.id", ondelete="CASCADE"))
+    day: Mapped[dt.date]
+    calories: Mapped[float] = mapped_column(server_default=text("0"))
+    proteins: Mapped[float] = mapped_column(server_default=text("0"))
+    fats: Mapped[float] = mapped_column(server_default=text("0"))
+    carbohydrates: Mapped[float] = mapped_column(server_default=text("0"))
+    fiber: Mapped[float] = mapped_column(server_default=text("0"), doc="Клетчатка")
+    sport_calories: Mapped[float] = mapped_column(server_default=text("0"), doc="Burned")
+
+    __table_args__ = (UniqueConstraint("user_id", "day"),)
@@ -1,12 +1,13 @@
+import datetime as dt
 from uuid import UUID
 
 from sqlalchemy import exc, delete, select
+from sqlalchemy.dialects.postgresql import insert
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy.orm import selectinload
 
 from src.db.exceptions import DBModelConflictException, DBModelNotFoundException
-from src.user.domain.entities import User, UserFilters, UserUpdate
-from src.user.infrastructure.models import UserDB
+from src.user.domain.entities import DailyTotals, User, UserFilters, UserUpdate
+from src.user.infrastructure.models import UserDailyTotalsDB, UserDB
 from src.user.application.interfaces.user_repository import IUserRepository
 
 
@@ -24,7 +25,7 @@ class UserRepository(IUserRepository):
         return self._model_to_entity(model)
 
     async def get_by_pk(self, pk: UUID) -> User:
-        result = await self.session.execute(select(UserDB).where(UserDB.id == pk).options(selectinload(UserDB.tasks)))
+        result = await self.session.execute(select(UserDB).where(UserDB.id == pk))
         model = result.scalar_one_or_none()
         if not model:
             raise DBModelNotFoundException(f"User with id {pk} not found")
@@ -59,6 +60,35 @@ class UserRepository(IUserRepository):
     async def delete_by_pk(self, pk: UUID) -> None:
         await self.session.execute(delete(UserDB).where(UserDB.id == pk))
 
+    async def add_daily_totals(self, pk: UUID, delta: DailyTotals) -> None:
+        values = delta.model_dump(exclude={"day"})
+        query = insert(UserDailyTotalsDB).values(user_id=pk, day=delta.day, **values)
+        # Row-level upsert: concurrent results of one user and day add up instead of overwriting each other
+        query = query.on_conflict_do_update(
+            index_elements=[UserDailyTotalsDB.user_id, UserDailyTotalsDB.day],
+            set_={key: getattr(UserDailyTotalsDB, key) + getattr(query.excluded, key) for key in values},
+        )
+        await self.session.execute(query)
+
+    async def get_daily_totals(self, pk: UUID, date_from: dt.date, date_to: dt.date) -> list[DailyTotals]:
+        query = (
+            select(UserDailyTotalsDB)
+            .where(UserDailyTotalsDB.user_id == pk, UserDailyTotalsDB.day.between(date_from, date_to))
+            .order_by(UserDailyTotalsDB.day)
+        )
+        return [
+            DailyTotals(
+                day=model.day,
+                calories=model.calories,
+                proteins=model.proteins,
+                fats=model.fats,
+                carbohydrates=model.carbohydrates,
+                fiber=model.fiber,
+                sport_calories=model.sport_calories,
+            )
+            for model in await self.session.scalars(query)
+        ]
+
     def _model_to_entity(self, model: UserDB) -> User:
         if model.gender != "f" and model.gender != "m":
             raise ValueError(f"Invalid user gender {model.gender}")
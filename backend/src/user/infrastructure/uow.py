@@ -1,13 +1,20 @@
+from uuid import UUID
+
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from src.db.engine import async_session_maker
+from src.db.replica import ReplicaRouter, replica_router
 from src.user.infrastructure.repository import UserRepository
 from src.user.application.interfaces.user_uow import IUserUnitOfWork
 
 
 class UserUnitOfWork(IUserUnitOfWork):
-    def __init__(self, session_factory=async_session_maker) -> None:
+    def __init__(
+        self, session_factory=async_session_maker, user_id: UUID | None = None, router: ReplicaRouter = replica_router
+    ) -> None:
         self.session_factory = session_factory
+        self.user_id = user_id
+        self.router = router
 
     async def __aenter__(self):
         self.session: AsyncSession = self.session_factory()
@@ -16,7 +23,26 @@ class UserUnitOfWork(IUserUnitOfWork):
 
     async def commit(self) -> None:
         await self.session.commit()
+        if self.user_id is not None:
+            self.router.record_write(self.user_id)
 
     async def _rollback(self) -> None:
         await self.session.rollback()
 
+
+class ReadOnlyUserUnitOfWork(UserUnitOfWork):
+    """Reads from the replica, or from the primary when the router says the replica may be stale"""
+
+    def __init__(self, user_id: UUID | None = None, router: ReplicaRouter = replica_router) -> None:
+        super().__init__(None, user_id, router)
+
+    async def __aenter__(self):
+        self.session_factory = self.router.session_maker(self.user_id)
+        return await super().__aenter__()
+
+    async def __aexit__(self, *args):
+        await super().__aexit__(*args)
+        await self.session.close()
+
+    async def commit(self) -> None:
+        raise RuntimeError("Read-only unit of work can't commit")
@@ -1,8 +1,46 @@
+import os
+import tempfile
+
 import pytest
+import pytest_asyncio
 from httpx import AsyncClient, ASGITransport
 
+os.environ.setdefault("ENVIRONMENT", "test")
+os.environ.setdefault("DOMAIN", "localhost")
+os.environ.setdefault("OPENAI_API_TOKEN", "test")
+os.environ.setdefault("DB_TYPE", "ASYNC_POSTGRESQL")
+os.environ.setdefault("DB_NAME", "db")
+os.environ.setdefault("DB_USER", "postgres")
+os.environ.setdefault("DB_PASSWORD", "postgres")
+os.environ.setdefault("DB_HOST", "localhost")
+os.environ.setdefault("DB_PORT", "5432")
+os.environ.setdefault("FOOD_DATABASE_PATH", os.path.join(tempfile.mkdtemp(), "foods.bin"))
+os.environ.setdefault("SEMANTIC_CACHE_PATH", tempfile.mkdtemp())
+os.environ.setdefault("SEMANTIC_CACHE_EMBEDDER", "hashing")
+
 
 @pytest.fixture(scope="session")
 async def test_client(app):
     async with AsyncClient(transport=ASGITransport(app=app), base_url="http://test") as client:
         yield client
+
+
+@pytest_asyncio.fixture
+async def db_connection():
+    """Connection to a migrated database inside a transaction that is rolled back, skips without one"""
+    from sqlalchemy import text
+    from sqlalchemy.ext.asyncio import create_async_engine
+
+    from src.core.config import settings
+
+    engine = create_async_engine(settings.DATABASE_URI)
+    try:
+        async with engine.connect() as connection:
+            if not (await connection.execute(text("SELECT to_regclass('tasks')"))).scalar():
+                pytest.skip("Database is not migrated")
+            yield connection
+            await connection.rollback()
+    except (OSError, ConnectionError) as error:
+        pytest.skip(f"No database: {error}")
+    finally:
+        await engine.dispose()
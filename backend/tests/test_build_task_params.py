@@ -0,0 +1,117 @@
+from uuid import uuid4
+
+import pytest
+from fastapi import HTTPException
+
+from src.db.exceptions import DBModelNotFoundException
+from src.task.domain.dtos import TaskCreateWithTextDTO
+from src.task.domain.entities import Task, TaskProduct, TaskStatus, TaskProductIngredient
+from src.task.application.use_cases.build_task_params import BuildTaskParamsUseCase
+from src.task.infrastructure.cache.task_result_cache import InMemoryTaskResultCache
+
+
+class _FakeTasks:
+    def __init__(self, task: Task) -> None:
+        self.task = task
+        self.calls = 0
+
+    async def get_by_pk(self, _pk):
+        self.calls += 1
+        return self.task
+
+
+class _BrokenUsers:
+    def __init__(self, error: Exception) -> None:
+        self.error = error
+
+    async def get_by_pk(self, _pk):
+        raise self.error
+
+
+class _FakeUoW:
+    def __init__(self, task: Task | None = None, users_error: Exception | None = None) -> None:
+        self.tasks = _FakeTasks(task)
+        self.users = _BrokenUsers(users_error)
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *args):
+        pass
+
+
+def _make_task() -> Task:
+    return Task(
+        id=uuid4(),
+        user_id=uuid4(),
+        app_bundle="test",
+        status=TaskStatus.finished,
+        products=[
+            TaskProduct(
+                name="Oatmeal",
+                weight=250,
+                calories=300,
+                ingredients=[TaskProductIngredient(name="Oats", weight=50, calories=190)],
+            )
+        ],
+        sports=[],
+    )
+
+
+@pytest.mark.asyncio
+async def test_edit_params_use_cached_previous_result():
+    task = _make_task()
+    uow, cache = _FakeUoW(task), InMemoryTaskResultCache(maxsize=10)
+    dto = TaskCreateWithTextDTO(app_bundle="test", language="english", text="remove oats")
+
+    first = await BuildTaskParamsUseCase(uow, cache).execute(dto, task.id)
+    second = await BuildTaskParamsUseCase(uow, cache).execute(dto, task.id)
+
+    assert uow.tasks.calls == 1
+    assert first.text == "remove oats"
+    assert first.previous_result == second.previous_result == {
+        "products": [
+            {
+                "name": "Oatmeal",
+                "weight": 250,
+                "calories": 300,
+                "ingredients": [{"name": "Oats", "weight": 50, "calories": 190}],
+            }
+        ]
+    }
+
+
+@pytest.mark.asyncio
+async def test_someone_elses_task_can_not_be_edited():
+    task = _make_task()
+    uow, cache = _FakeUoW(task), InMemoryTaskResultCache(maxsize=10)
+    dto = TaskCreateWithTextDTO(app_bundle="test", language="english", text="remove oats")
+
+    for _ in range(2):  # read from the database, then from the cache
+        with pytest.raises(HTTPException) as error:
+            await BuildTaskParamsUseCase(uow, cache).execute(dto, task.id, owner_id=uuid4())
+        assert error.value.status_code == 404
+
+    command = await BuildTaskParamsUseCase(uow, cache).execute(dto, task.id, owner_id=task.user_id)
+    assert command.previous_result["products"][0]["name"] == "Oatmeal"
+
+
+@pytest.mark.asyncio
+async def test_cache_evicts_least_recently_used():
+    cache = InMemoryTaskResultCache(maxsize=2)
+    tasks = [_make_task() for _ in range(3)]
+    for task in tasks:
+        await cache.set(task)
+
+    assert await cache.get(tasks[0].id) is None
+    assert await cache.get(tasks[2].id) is tasks[2]
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("error", [DBModelNotFoundException(), ValueError("Invalid user gender None")])
+async def test_prompt_goes_without_a_profile_that_cant_be_loaded(error):
+    data = TaskCreateWithTextDTO(app_bundle="test", text="бег 30 минут", language="russian")
+
+    command = await BuildTaskParamsUseCase(_FakeUoW(users_error=error), None).execute(data, user_id=uuid4())
+
+    assert command.profile is None and command.text == "бег 30 минут"
@@ -0,0 +1,139 @@
+import uuid
+import datetime as dt
+
+import pytest
+from fastapi import HTTPException
+
+from src.task.domain.entities import Task, TaskProduct, TaskSport, TaskStatus
+from src.task.application.use_cases.run_task import RunTaskUseCase
+from src.user.domain.entities import DailyTotals
+from src.user.application.use_cases.get_daily_totals import GetDailyTotalsUseCase
+
+
+class FakeTasks:
+    def __init__(self, *tasks: Task) -> None:
+        self.tasks = {task.id: task for task in tasks}
+
+    async def get_edit_chain(self, pk):
+        root = self.tasks[pk]
+        while root.parent_id is not None:
+            root = self.tasks[root.parent_id]
+        chain, ids = [root], {root.id}
+        for task in sorted(self.tasks.values(), key=lambda task: task.created_at):
+            if task.parent_id in ids:
+                chain.append(task)
+                ids.add(task.id)
+        return chain
+
+
+class FakeUsers:
+    def __init__(self, totals: list[DailyTotals] | None = None) -> None:
+        self.added = []
+        self.totals = totals or []
+
+    async def add_daily_totals(self, _pk, delta):
+        self.added.append(delta)
+
+    async def get_daily_totals(self, _pk, _date_from, _date_to):
+        return self.totals
+
+
+class FakeUnitOfWork:
+    def __init__(self, tasks: FakeTasks, users: FakeUsers) -> None:
+        self.tasks = tasks
+        self.users = users
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *args):
+        pass
+
+
+def make_task(
+    calories: float, created_at: dt.datetime, parent_id=None, sport_calories: float = 0, status=TaskStatus.finished
+) -> Task:
+    return Task(
+        id=uuid.uuid4(),
+        user_id=uuid.uuid4(),
+        app_bundle="test",
+        status=status,
+        parent_id=parent_id,
+        created_at=created_at,
+        products=[TaskProduct(calories=calories, proteins=10, ingredients=[]), TaskProduct(ingredients=[])],
+        sports=[TaskSport(calories=sport_calories)] if sport_calories else [],
+    )
+
+
+async def finish(tasks: FakeTasks, users: FakeUsers, task: Task) -> None:
+    tasks.tasks[task.id] = task = task.model_copy(update={"status": TaskStatus.finished})
+    await RunTaskUseCase(FakeUnitOfWork(tasks, users), None, None, None)._add_daily_totals(task)
+
+
+def booked_calories(users: FakeUsers) -> dict[dt.date, float]:
+    calories = {}
+    for delta in users.added:
+        calories[delta.day] = calories.get(delta.day, 0) + delta.calories
+    return calories
+
+
+@pytest.mark.asyncio
+async def test_result_is_added_to_its_day():
+    task = make_task(400, dt.datetime(2026, 3, 1, 9), sport_calories=150)
+    users = FakeUsers()
+
+    await finish(FakeTasks(task), users, task)
+
+    assert users.added == [DailyTotals(day=dt.date(2026, 3, 1), calories=400, proteins=10, sport_calories=150)]
+
+
+@pytest.mark.asyncio
+async def test_each_edit_replaces_the_newest_counted_result():
+    parent = make_task(500, dt.datetime(2026, 3, 1, 9))
+    first = make_task(400, dt.datetime(2026, 3, 2, 8), parent_id=parent.id, status=TaskStatus.queued)
+    second = make_task(300, dt.datetime(2026, 3, 2, 9), parent_id=parent.id, status=TaskStatus.queued)
+    tasks, users = FakeTasks(parent, first, second), FakeUsers()
+
+    for task in (parent, first, second):
+        await finish(tasks, users, task)
+
+    assert booked_calories(users) == {dt.date(2026, 3, 1): 300}
+
+
+@pytest.mark.asyncio
+async def test_edits_of_edits_are_booked_on_the_first_meal_day():
+    parent = make_task(500, dt.datetime(2026, 3, 1, 9))
+    first = make_task(400, dt.datetime(2026, 3, 2, 8), parent_id=parent.id, status=TaskStatus.queued)
+    second = make_task(450, dt.datetime(2026, 3, 3, 8), parent_id=first.id, status=TaskStatus.queued)
+    tasks, users = FakeTasks(parent, first, second), FakeUsers()
+
+    for task in (parent, first, second):
+        await finish(tasks, users, task)
+
+    assert booked_calories(users) == {dt.date(2026, 3, 1): 450}
+
+
+@pytest.mark.asyncio
+async def test_result_finished_after_a_newer_edit_is_not_counted():
+    parent = make_task(500, dt.datetime(2026, 3, 1, 9), status=TaskStatus.queued)
+    edit = make_task(400, dt.datetime(2026, 3, 1, 9, 1), parent_id=parent.id, status=TaskStatus.queued)
+    tasks, users = FakeTasks(parent, edit), FakeUsers()
+
+    await finish(tasks, users, edit)
+    await finish(tasks, users, parent)
+
+    assert booked_calories(users) == {dt.date(2026, 3, 1): 400}
+
+
+@pytest.mark.asyncio
+async def test_missing_days_read_as_zero():
+    day = dt.date(2026, 3, 1)
+    users = FakeUsers([DailyTotals(day=day + dt.timedelta(days=1), calories=800)])
+
+    use_case = GetDailyTotalsUseCase(FakeUnitOfWork(FakeTasks(), users))
+
+    totals = await use_case.execute(uuid.uuid4(), day, day + dt.timedelta(days=2))
+
+    assert [(total.day.day, total.calories) for total in totals] == [(1, 0), (2, 800), (3, 0)]
+    with pytest.raises(HTTPException):
+        await use_case.execute(uuid.uuid4(), day, day - dt.timedelta(days=1))
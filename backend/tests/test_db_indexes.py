@@ -0,0 +1,77 @@
+"""EXPLAIN checks of the task indexes against a migrated database, skipped when none is reachable
+
+    DATABASE_URI=postgresql+asyncpg://... alembic upgrade head && pytest tests/test_db_indexes.py
+"""
+
+import uuid
+
+import pytest
+import pytest_asyncio
+from sqlalchemy import text
+
+
+@pytest_asyncio.fixture
+async def connection(db_connection):
+    # Test tables are tiny, the planner would scan them whatever the indexes
+    await db_connection.execute(text("SET LOCAL enable_seqscan = off"))
+    return db_connection
+
+
+async def explain(connection, query: str, **params) -> str:
+    rows = await connection.execute(text(f"EXPLAIN (COSTS OFF) {query}"), params)
+    return "\n".join(row[0] for row in rows)
+
+
+@pytest.mark.asyncio
+async def test_duplicate_primary_key_indexes_are_gone(connection):
+    rows = await connection.execute(
+        text("SELECT indexname FROM pg_indexes WHERE schemaname = current_schema() AND indexname = ANY(:names)"),
+        {"names": [f"{t}_id_idx" for t in ("users", "tasks", "task_products", "task_sports", "task_ingredients")]},
+    )
+    assert rows.all() == []
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize(
+    "table,column,index",
+    [
+        ("task_products", "task_id", "task_products_task_id_idx"),
+        ("task_sports", "task_id", "task_sports_task_id_idx"),
+        ("task_ingredients", "product_id", "task_ingredients_product_id_idx"),
+        ("tasks", "user_id", "tasks_user_id_"),
+    ],
+)
+async def test_foreign_key_lookups_use_an_index(connection, table, column, index):
+    plan = await explain(connection, f"SELECT * FROM {table} WHERE {column} = ANY(:ids)", ids=[uuid.uuid4()])
+    assert index in plan
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize(
+    "kind_filter,index",
+    [("", "tasks_user_id_created_at_id_idx"), ("AND kind = 'meal'", "tasks_user_id_kind_created_at_id_idx")],
+)
+async def test_history_pages_are_read_in_index_order(connection, kind_filter, index):
+    await connection.execute(text("SET LOCAL enable_bitmapscan = off"))
+    # Both kinds in the statistics, otherwise the two indexes cost the same on an empty table
+    user = await connection.execute(
+        text("INSERT INTO users (apphud_id) VALUES (:apphud_id) RETURNING id"), {"apphud_id": str(uuid.uuid4())}
+    )
+    user_id = user.scalar_one()
+    await connection.execute(
+        text(
+            "INSERT INTO tasks (user_id, app_bundle, status, kind)"
+            " SELECT :user_id, 'test', 'finished', CASE WHEN i % 2 = 0 THEN 'meal' ELSE 'sport' END"
+            " FROM generate_series(1, 200) i"
+        ),
+        {"user_id": user_id},
+    )
+    await connection.execute(text("ANALYZE tasks"))
+    plan = await explain(
+        connection,
+        f"SELECT * FROM tasks WHERE user_id = :user_id {kind_filter} AND (created_at, id) < (now()::timestamp, :id)"
+        " ORDER BY created_at DESC, id DESC LIMIT 20",
+        user_id=uuid.uuid4(),
+        id=uuid.uuid4(),
+    )
+    assert index in plan and "Sort" not in plan
@@ -0,0 +1,51 @@
+import uuid
+
+import pytest
+from prometheus_client import REGISTRY
+from sqlalchemy import exc, text
+from sqlalchemy.ext.asyncio import create_async_engine
+
+from src.core.config import settings
+from src.db.engine import _connect_args
+from src.db.pool import InstrumentedAsyncAdaptedQueuePool
+
+
+def test_pgbouncer_mode_turns_off_prepared_statement_caching(monkeypatch):
+    monkeypatch.setattr("src.db.engine.settings.DATABASE_PGBOUNCER", False)
+    assert _connect_args("postgresql+asyncpg://localhost/db") == {}
+
+    monkeypatch.setattr("src.db.engine.settings.DATABASE_PGBOUNCER", True)
+    args = _connect_args("postgresql+asyncpg://localhost/db")
+
+    assert args["statement_cache_size"] == 0 and args["prepared_statement_cache_size"] == 0
+    assert args["prepared_statement_name_func"]() != args["prepared_statement_name_func"]()
+    assert _connect_args("postgresql+psycopg://localhost/db") == {"prepare_threshold": None}
+
+
+@pytest.mark.asyncio
+async def test_pool_exports_wait_time_and_checked_out_connections():
+    engine = create_async_engine(
+        settings.DATABASE_URI,
+        poolclass=InstrumentedAsyncAdaptedQueuePool,
+        pool_logging_name="test",
+        pool_size=1,
+        max_overflow=0,
+        pool_timeout=0.1,
+        connect_args=_connect_args(settings.DATABASE_URI),
+    )
+    sample = lambda name: REGISTRY.get_sample_value(name, {"pool": "test"})  # noqa: E731
+    waits = sample("db_pool_wait_seconds_count") or 0
+    try:
+        async with engine.connect() as connection:
+            await connection.execute(text("SELECT id FROM users WHERE id = :id"), {"id": uuid.uuid4()})
+            assert sample("db_pool_checked_out") == 1
+            with pytest.raises(exc.TimeoutError):
+                await engine.connect().__aenter__()
+    except (OSError, ConnectionError) as error:
+        pytest.skip(f"No database: {error}")
+    finally:
+        await engine.dispose()
+
+    assert sample("db_pool_checked_out") == 0
+    assert sample("db_pool_wait_seconds_count") == waits + 2
+    assert sample("db_pool_wait_seconds_sum") >= 0.1
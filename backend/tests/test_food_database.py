@@ -0,0 +1,66 @@
+import pytest
+
+from src.integration.infrastructure.food_database import (
+    FOODS_SOURCE_PATH,
+    FoodDatabase,
+    LocalMealRecognizer,
+    parse_food_input,
+)
+
+
+@pytest.fixture(scope="module")
+def recognizer(tmp_path_factory) -> LocalMealRecognizer:
+    database = FoodDatabase.open(FOODS_SOURCE_PATH, tmp_path_factory.mktemp("food") / "foods.bin")
+    return LocalMealRecognizer(database, min_score=0.8, min_margin=0.1)
+
+
+@pytest.mark.parametrize(
+    ("text", "name", "amount", "unit"),
+    [
+        ("banana", "banana", 1, None),
+        ("200g chicken breast", "chicken breast", 200, "g"),
+        ("Рис 150 г", "рис", 150, "г"),
+        ("два яйца", "яйца", 2, None),
+    ],
+)
+def test_parse_food_input(text, name, amount, unit):
+    assert parse_food_input(text) == (name, amount, unit)
+
+
+def test_compound_input_is_left_to_the_model(recognizer):
+    assert parse_food_input("chicken with rice") is None
+    assert recognizer.recognize("200g rice, 100g chicken", "english") is None
+
+
+def test_recognize_scales_macros_by_weight(recognizer):
+    [dish] = recognizer.recognize("200 г куриной грудки", "russian")
+
+    assert dish["name"] == "Куриная грудка"
+    assert dish["weight"] == 200
+    assert (dish["calories"], dish["proteins"], dish["fats"]) == (330, 62, 7.2)
+    assert dish["ingredients"] == [{k: v for k, v in dish.items() if k not in ("ingredients", "commentary")}]
+    assert dish["commentary"] == "Рассчитано по базе продуктов для 200 г."
+
+
+def test_recognize_counts_pieces(recognizer):
+    [dish] = recognizer.recognize("2 eggs", "english")
+
+    assert (dish["name"], dish["weight"], dish["calories"]) == ("Egg", 110, 170.5)
+
+
+@pytest.mark.parametrize(
+    "text", ["grandma's special casserole", "chocolate cake", "banana bread", "fried chicken breast"]
+)
+def test_unknown_food_is_left_to_the_model(recognizer, text):
+    assert recognizer.recognize(text, "english") is None
+
+
+def test_food_named_by_several_words_is_answered_locally(recognizer):
+    [dish] = recognizer.recognize("green tea", "english")
+
+    assert (dish["name"], dish["weight"]) == ("Tea", 250)
+
+
+@pytest.mark.parametrize("text", ["no banana", "without rice", "без банана", "не ел рис", "200 ml milk", "0.5 л молока"])
+def test_negated_or_volume_input_is_left_to_the_model(recognizer, text):
+    assert recognizer.recognize(text, "english") is None
@@ -0,0 +1,167 @@
+from io import BytesIO
+
+import pytest
+import pytest_asyncio
+from aiohttp import web
+from aiohttp.test_utils import TestServer
+
+from src.core.config import HttpUpstreamSettings, Settings
+from src.core.http.api_client import HttpApiClient, HttpApiRequestException
+from src.core.http.client import AsyncHttpClient
+from src.core.http.httpx_client import Http2Client
+from src.core.http.streaming_body import StreamingJsonBody
+
+
+@pytest_asyncio.fixture
+async def server():
+    async def ok(_: web.Request) -> web.Response:
+        return web.json_response({"ok": True})
+
+    async def echo(request: web.Request) -> web.Response:
+        return web.json_response({"json": await request.json(), "query": dict(request.query)})
+
+    async def upload(request: web.Request) -> web.Response:
+        form = await request.post()
+        return web.json_response({
+            "prompt": form["prompt"],
+            "filename": form["image"].filename,
+            "size": len(form["image"].file.read()),
+        })
+
+    async def size(request: web.Request) -> web.Response:
+        body = await request.json()
+        return web.json_response({"length": request.content_length, "image": len(body["image"])})
+
+    async def fail(_: web.Request) -> web.Response:
+        return web.Response(status=502, text="upstream down")
+
+    app = web.Application()
+    app.router.add_route("*", "/", ok)
+    app.router.add_post("/echo", echo)
+    app.router.add_post("/upload", upload)
+    app.router.add_post("/size", size)
+    app.router.add_get("/fail", fail)
+    async with TestServer(app, host="127.0.0.1") as test_server:
+        yield test_server
+
+
+@pytest.fixture
+def upstreams(monkeypatch):
+    upstreams = {
+        "default": HttpUpstreamSettings(),
+        "127.0.0.1": HttpUpstreamSettings(limit_per_host=7, keepalive_timeout=60, read_timeout=5),
+    }
+    monkeypatch.setattr(AsyncHttpClient, "upstreams", upstreams)
+    monkeypatch.setattr(AsyncHttpClient, "sessions", {})
+    yield upstreams
+
+
+@pytest.mark.asyncio
+@pytest.mark.usefixtures("upstreams")
+async def test_configured_host_gets_its_own_session(server):
+    await AsyncHttpClient.open_clients()
+    try:
+        session = AsyncHttpClient.get_aiohttp_client(str(server.make_url("/")))
+
+        assert session is AsyncHttpClient.sessions["127.0.0.1"]
+        assert session is not AsyncHttpClient.get_aiohttp_client("http://example.com/hook")
+        assert session.connector.limit_per_host == 7
+        assert session.timeout.sock_read == 5
+    finally:
+        await AsyncHttpClient.close_aiohttp_client()
+
+    assert AsyncHttpClient.sessions == {}
+    assert session.closed
+
+
+@pytest.mark.asyncio
+@pytest.mark.usefixtures("upstreams")
+async def test_warm_up_leaves_open_connections_in_the_pool(server):
+    url = str(server.make_url("/"))
+    try:
+        await AsyncHttpClient.warm_up(url, connections=3)
+        connector = AsyncHttpClient.get_aiohttp_client(url).connector
+
+        assert sum(len(connections) for connections in connector._conns.values()) == 3
+
+        response = await AsyncHttpClient.get(url)
+        assert await response.json() == {"ok": True}
+    finally:
+        await AsyncHttpClient.close_aiohttp_client()
+
+
+@pytest.mark.asyncio
+async def test_only_the_proxied_upstream_goes_through_the_proxy(server, upstreams):
+    upstreams["api.example.test"] = HttpUpstreamSettings(proxy=str(server.make_url("/")))
+    try:
+        response = await AsyncHttpClient.get("http://api.example.test/")
+
+        assert await response.json() == {"ok": True}
+        assert AsyncHttpClient.get_aiohttp_client("http://127.0.0.1/")._default_proxy is None
+    finally:
+        await AsyncHttpClient.close_aiohttp_client()
+
+
+def test_blank_proxy_urls_mean_no_proxy():
+    config = Settings(OPENAI_PROXY_URL="", HTTP_UPSTREAMS={"default": {"proxy": ""}})
+
+    assert config.OPENAI_PROXY_URL is None
+    assert all(upstream.proxy is None for upstream in config.HTTP_UPSTREAMS.values())
+    assert Settings(OPENAI_PROXY_URL="http://proxy:3128").HTTP_UPSTREAMS["api.openai.com"].proxy == "http://proxy:3128"
+
+
+@pytest_asyncio.fixture(params=[AsyncHttpClient, Http2Client])
+async def backend(request, monkeypatch):
+    monkeypatch.setattr(request.param, "upstreams", {"default": HttpUpstreamSettings()})
+    monkeypatch.setattr(request.param, "sessions" if request.param is AsyncHttpClient else "clients", {})
+    await request.param.open_clients()
+    yield request.param
+    await request.param.close_clients()
+
+
+@pytest.mark.asyncio
+async def test_backends_send_json_and_query(server, backend):
+    api = HttpApiClient(backend(), str(server.make_url("/")))
+
+    response = await api.request("POST", "/echo", json={"text": "борщ"}, params={"lang": "ru"})
+
+    assert response.data == {"json": {"text": "борщ"}, "query": {"lang": "ru"}}
+
+
+@pytest.mark.asyncio
+async def test_backends_send_multipart(server, backend):
+    api = HttpApiClient(backend(), str(server.make_url("/")))
+    image = BytesIO(b"\xff\xd8" + b"0" * 1000)
+    image.seek(500)
+
+    response = await api.multipart_request("POST", "/upload", data={"prompt": "meal"}, files=[("image", image)])
+
+    assert response.data == {"prompt": "meal", "filename": "image.jpg", "size": 1002}
+
+
+@pytest.mark.asyncio
+async def test_backends_raise_on_error_status(server, backend):
+    api = HttpApiClient(backend(), str(server.make_url("/")))
+
+    with pytest.raises(HttpApiRequestException, match="upstream down"):
+        await api.request("GET", "/fail")
+
+
+@pytest.mark.asyncio
+async def test_backends_warm_up(server, backend):
+    await backend.warm_up(str(server.make_url("/")), connections=2)
+
+    response = await backend.get(str(server.make_url("/")))
+
+    assert response.ok and await response.json() == {"ok": True}
+
+
+@pytest.mark.asyncio
+async def test_backends_stream_content(server, backend):
+    api = HttpApiClient(backend(), str(server.make_url("/")))
+    marker = StreamingJsonBody.new_marker()
+    body = StreamingJsonBody({"image": marker}, {marker: BytesIO(b"0" * 300_000)})
+
+    response = await api.request("POST", "/size", content=body.chunks(), headers=body.headers)
+
+    assert response.data == {"length": len(body), "image": 400_000}
@@ -0,0 +1,44 @@
+from io import BytesIO
+
+from PIL import Image, ImageDraw
+
+from src.core.image_hash import dhash, hamming_distance
+
+
+def _plate(size: tuple[int, int] = (640, 480), crop: int = 0, mirrored: bool = False) -> Image.Image:
+    image = Image.new("RGB", size, (235, 230, 220))
+    draw = ImageDraw.Draw(image)
+    draw.ellipse((80, 40, 560, 440), fill=(250, 250, 250))
+    draw.ellipse((160, 120, 330, 300), fill=(190, 120, 60))
+    draw.rectangle((350, 180, 480, 360), fill=(70, 150, 60))
+    if mirrored:
+        image = image.transpose(Image.Transpose.FLIP_LEFT_RIGHT)
+    return image.crop((crop, crop, size[0] - crop, size[1] - crop))
+
+
+def _jpeg(image: Image.Image, quality: int = 90) -> BytesIO:
+    buffer = BytesIO()
+    image.save(buffer, format="JPEG", quality=quality)
+    buffer.seek(0)
+    return buffer
+
+
+def test_recompressed_and_slightly_cropped_photo_is_near_duplicate():
+    original = dhash(_jpeg(_plate()))
+    retaken = dhash(_jpeg(_plate(crop=12).resize((480, 360)), quality=60))
+
+    assert hamming_distance(original, retaken) <= 6
+
+
+def test_different_photo_is_far():
+    assert hamming_distance(dhash(_jpeg(_plate())), dhash(_jpeg(_plate(mirrored=True)))) > 6
+
+
+def test_hash_fits_bigint_and_keeps_buffer_position():
+    buffer = _jpeg(_plate())
+    buffer.seek(5)
+
+    value = dhash(buffer)
+
+    assert -(2**63) <= value < 2**63
+    assert buffer.tell() == 5
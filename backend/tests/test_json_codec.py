@@ -0,0 +1,73 @@
+import io
+import json
+
+from loguru import logger
+
+from src.core import json_codec
+from src.core.logging_setup import TEXT_FORMAT, serialize_record
+from src.core.responses import FastJSONResponse
+
+DOCUMENT = {"dishes": [{"name": "Борщ", "weight": 250.5, "ingredients": [{"name": "свёкла", "calories": 43}]}]}
+
+
+def test_dumps_matches_compact_stdlib_output():
+    expected = json.dumps(DOCUMENT, ensure_ascii=False, separators=(",", ":"))
+
+    assert json_codec.dumps_str(DOCUMENT) == expected
+    assert json_codec.loads(json_codec.dumps(DOCUMENT)) == DOCUMENT
+    assert json_codec.dumps_str({"b": 1, "a": {2: None}}, sort_keys=True) == '{"a":{"2":null},"b":1}'
+
+
+def test_invalid_input_raises_stdlib_decode_error():
+    for data in (b"", b"{", "not json"):
+        try:
+            json_codec.loads(data)
+        except json_codec.JSONDecodeError:
+            continue
+        raise AssertionError(f"{data!r} was decoded")
+
+
+def test_response_class_renders_with_codec():
+    response = FastJSONResponse(DOCUMENT)
+
+    assert json.loads(response.body) == DOCUMENT
+    assert response.headers["content-type"] == "application/json"
+
+
+def test_serialized_log_record_matches_loguru():
+    fast, stdlib = io.StringIO(), io.StringIO()
+    handlers = [logger.add(fast, format=serialize_record), logger.add(stdlib, format=TEXT_FORMAT, serialize=True)]
+    try:
+        logger.bind(http={"method": "GET"}).warning("Сломалось {x}")
+    finally:
+        for handler in handlers:
+            logger.remove(handler)
+
+    fast_record, stdlib_record = json.loads(fast.getvalue()), json.loads(stdlib.getvalue())
+    stdlib_record["record"]["extra"].pop("_serialized")
+
+    assert fast_record == stdlib_record
+
+
+def test_serialized_log_record_keeps_the_traceback():
+    fast, stdlib = io.StringIO(), io.StringIO()
+    handlers = [logger.add(fast, format=serialize_record), logger.add(stdlib, format=TEXT_FORMAT, serialize=True)]
+    try:
+        try:
+            _divide_by_zero()
+        except ZeroDivisionError:
+            logger.exception("Сломалось")
+    finally:
+        for handler in handlers:
+            logger.remove(handler)
+
+    fast_record, stdlib_record = json.loads(fast.getvalue()), json.loads(stdlib.getvalue())
+
+    assert fast_record["text"].startswith(stdlib_record["text"].splitlines()[0] + "\nTraceback (most recent call last):")
+    assert "in _divide_by_zero" in fast_record["text"]
+    assert fast_record["text"].rstrip().endswith("ZeroDivisionError: division by zero")
+    assert fast_record["record"]["exception"] == stdlib_record["record"]["exception"]
+
+
+def _divide_by_zero() -> float:
+    return 1 / 0
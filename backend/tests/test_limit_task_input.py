@@ -0,0 +1,76 @@
+import uuid
+
+import pytest
+from fastapi import HTTPException
+
+from src.core.config import TokenLimitSettings
+from src.core.tokens import estimate_tokens, truncate_to_tokens
+from src.task.domain.entities import TaskRun
+from src.task.application.use_cases.limit_task_input import LimitTaskInputUseCase
+from src.task.infrastructure.rate_limit.token_bucket import TokenBucketRateLimiter
+
+
+def make_previous_result(products: int, ingredients: int) -> dict:
+    ingredient = {"name": "Картофель", "weight": 120, "calories": 98, "proteins": 2.1, "fats": 0.4, "carbohydrates": 20}
+    product = {**ingredient, "name": "Пюре", "commentary": "Порция среднего размера " * 5}
+    return {"products": [{**product, "ingredients": [ingredient] * ingredients}] * products}
+
+
+def test_estimate_and_truncate():
+    assert estimate_tokens("") == 0
+    assert estimate_tokens("apple") == 2 and estimate_tokens(" apple 123") == 3
+    assert estimate_tokens("гречка") == 2
+
+    text = "Овсянка на молоке с бананом и орехами " * 20
+    truncated = truncate_to_tokens(text, 30)
+    assert estimate_tokens(truncated) <= 30 < estimate_tokens(text)
+    assert text.startswith(truncated) and truncated.endswith(("а", "и", "м", "е", "с"))
+    assert truncate_to_tokens("short", 30) == "short"
+
+
+@pytest.mark.asyncio
+async def test_input_limit_actions():
+    limiter = TokenBucketRateLimiter(capacity=100_000, refill_per_second=1)
+    limits = {
+        "meal_text": TokenLimitSettings(max_tokens=20),
+        "sport_text": TokenLimitSettings(max_tokens=20, action="reject"),
+        "meal_edit": TokenLimitSettings(max_tokens=400, action="summarize"),
+    }
+    use_case = LimitTaskInputUseCase(limiter, limits)
+    user_id = uuid.uuid4()
+    text = "Съел тарелку борща со сметаной и хлебом " * 10
+
+    truncated = await use_case.execute("meal_text", user_id, TaskRun(language="russian", text=text))
+    assert estimate_tokens(truncated.text) <= 20 and text.startswith(truncated.text)
+    assert (await use_case.execute("meal_text", user_id, TaskRun(language="russian", text="борщ"))).text == "борщ"
+
+    with pytest.raises(HTTPException) as error:
+        await use_case.execute("sport_text", user_id, TaskRun(language="russian", text=text))
+    assert error.value.status_code == 413
+
+    previous_result = make_previous_result(products=3, ingredients=10)
+    command = TaskRun(language="russian", text="убери хлеб", previous_result=previous_result)
+    summarized = await use_case.execute("meal_edit", user_id, command)
+    assert summarized.text == "убери хлеб"
+    assert len(summarized.previous_result["products"]) == 3
+    product = summarized.previous_result["products"][0]
+    assert "commentary" not in product and product["calories"] == 98
+    assert all(set(ingredient) <= {"name", "weight"} for ingredient in product.get("ingredients", []))
+    assert use_case._estimate(summarized) <= 400
+
+
+@pytest.mark.asyncio
+async def test_token_bucket_rejects_then_refills():
+    limiter = TokenBucketRateLimiter(capacity=100, refill_per_second=1000, max_users=1)
+    use_case = LimitTaskInputUseCase(limiter, {})
+    user_id = uuid.uuid4()
+
+    assert await limiter.consume(user_id, 80) == 0
+    assert await limiter.consume(user_id, 80) > 0
+    with pytest.raises(HTTPException) as error:
+        await use_case.execute("meal_text", user_id, TaskRun(language="russian", text="слово " * 400))
+    assert error.value.status_code == 429 and error.value.headers["Retry-After"] == "1"
+
+    assert await limiter.consume(uuid.uuid4(), 100) == 0  # another user has a full bucket
+    limiter._buckets.clear()
+    assert await limiter.consume(user_id, 10_000) == 0  # clamped to the capacity
@@ -0,0 +1,88 @@
+import pytest
+
+from src.integration.infrastructure.meal_edit_interpreter import MealEditInterpreter
+
+
+@pytest.fixture
+def interpreter() -> MealEditInterpreter:
+    return MealEditInterpreter(min_score=0.6, min_margin=0.1)
+
+
+@pytest.fixture
+def previous_result() -> dict:
+    return {
+        "products": [
+            {
+                "name": "Chicken with rice",
+                "weight": 350,
+                "calories": 500,
+                "proteins": 40,
+                "ingredients": [
+                    {"name": "Chicken breast", "weight": 150, "calories": 250, "proteins": 35},
+                    {"name": "Rice", "weight": 200, "calories": 250, "proteins": 5},
+                ],
+            },
+            {
+                "name": "White bread",
+                "weight": 30,
+                "calories": 80,
+                "ingredients": [{"name": "White bread", "weight": 30, "calories": 80}],
+            },
+        ]
+    }
+
+
+def test_remove_drops_product_with_its_only_ingredient(interpreter, previous_result):
+    result = interpreter.apply("remove bread", previous_result)
+
+    assert [product["name"] for product in result] == ["Chicken with rice"]
+
+
+def test_instead_of_rescales_ingredient_and_product_totals(interpreter, previous_result):
+    [dish, _] = interpreter.apply("150g instead of 200g", previous_result)
+
+    assert dish["ingredients"][1] == {"name": "Rice", "weight": 150, "calories": 187.5, "proteins": 3.8}
+    assert (dish["weight"], dish["calories"], dish["proteins"]) == (300, 437.5, 38.8)
+
+
+def test_several_clauses_apply_in_order(interpreter, previous_result):
+    result = interpreter.apply("double the rice and remove bread", previous_result)
+
+    assert len(result) == 1
+    assert (result[0]["weight"], result[0]["calories"]) == (550, 750)
+    assert previous_result["products"][0]["weight"] == 350
+
+
+@pytest.mark.parametrize("text", ["add a salad", "remove pepper", "200g chicken and some sauce", "150g instead of 100g"])
+def test_unparsed_or_unresolved_edits_are_left_to_the_model(interpreter, previous_result, text):
+    assert interpreter.apply(text, previous_result) is None
+
+
+@pytest.mark.parametrize(
+    "text",
+    ["add rice 100g", "plus rice 50 g", "extra rice 100 g", "more rice 300g", "another 100g of rice", "+ rice 50g"],
+)
+def test_additive_edits_are_left_to_the_model(interpreter, previous_result, text):
+    assert interpreter.apply(text, previous_result) is None
+
+
+@pytest.mark.parametrize("text", ["добавь рис 100 г", "ещё рис 50 г", "плюс 50 г риса", "больше риса 300 г"])
+def test_additive_russian_edits_are_left_to_the_model(interpreter, text):
+    previous_result = {"products": [{"name": "Рис", "weight": 200, "calories": 250}]}
+
+    assert interpreter.apply("рис 100 г", previous_result)[0]["weight"] == 100
+    assert interpreter.apply(text, previous_result) is None
+
+
+def test_set_weight_needs_the_target_to_name_an_item(interpreter, previous_result):
+    assert interpreter.apply("fried rice 100g", previous_result) is None
+    [dish, _] = interpreter.apply("rice 100g", previous_result)
+    assert dish["ingredients"][1]["weight"] == 100
+
+
+def test_summarized_ingredients_are_left_to_the_model(interpreter, previous_result):
+    for product in previous_result["products"]:
+        product["ingredients"] = [{"name": i["name"], "weight": i["weight"]} for i in product["ingredients"]]
+
+    assert interpreter.apply("remove rice", previous_result) is None
+    assert interpreter.apply("100g of chicken breast instead of 150g", previous_result) is None
@@ -0,0 +1,16 @@
+import pytest
+from httpx import AsyncClient, ASGITransport
+
+from src.core.config import settings
+from src.main import app
+
+
+@pytest.mark.asyncio
+async def test_metrics_need_the_api_token():
+    async with AsyncClient(transport=ASGITransport(app=app), base_url="http://test") as client:
+        anonymous = await client.get("/metrics")
+        wrong = await client.get("/metrics", headers={"Authorization": "Bearer wrong"})
+        scraped = await client.get("/metrics", headers={"Authorization": f"Bearer {settings.API_TOKEN}"})
+
+    assert anonymous.status_code == 403 and wrong.status_code == 401
+    assert scraped.status_code == 200 and "openai_model_route_decisions_total" in scraped.text
@@ -0,0 +1,115 @@
+import time
+
+import pytest
+
+from src.core.http.exceptions import HttpApiRequestException
+from src.integration.infrastructure.model_router import ModelRouter, InputModality
+
+
+def _make_router(**kwargs) -> ModelRouter:
+    params = dict(
+        primary_model="primary",
+        light_model="light",
+        fallback_model="fallback",
+        light_max_input={"sport_text": 100},
+        p95_budget_seconds=10.0,
+        failure_threshold=2,
+        reset_seconds=60.0,
+        latency_window_seconds=300.0,
+        half_open_probes=1,
+    )
+    return ModelRouter(**(params | kwargs))
+
+
+def test_small_text_routed_to_light_model():
+    router = _make_router()
+    assert router.choose("sport_text", InputModality.text, 20).model == "light"
+    assert router.choose("sport_text", InputModality.text, 500).model == "primary"
+    assert router.choose("meal_text", InputModality.text, 20).model == "primary"
+
+
+def test_image_always_routed_to_primary_model():
+    router = _make_router(light_max_input={"meal_image": 10**9})
+    assert router.choose("meal_image", InputModality.image, 1).model == "primary"
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize(
+    "error", [HttpApiRequestException("", status=503), HttpApiRequestException("", status=429), TimeoutError()]
+)
+async def test_open_circuit_falls_back(error):
+    router = _make_router()
+    for _ in range(2):
+        with pytest.raises(type(error)):
+            async with router.track("primary"):
+                raise error
+
+    route = router.choose("meal_image", InputModality.image, 1)
+    assert route.model == "fallback"
+    assert route.reason == "primary_circuit_open"
+
+
+def test_slow_p95_falls_back():
+    router = _make_router()
+    for _ in range(router.health("primary").MIN_SAMPLES):
+        router.health("primary").record_success(30.0)
+
+    route = router.choose("meal_image", InputModality.image, 1)
+    assert route.model == "fallback"
+    assert route.reason == "primary_p95_over_budget"
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("error", [HttpApiRequestException("", status=400), ValueError("Empty output")])
+async def test_rejected_requests_do_not_open_the_circuit(error):
+    router = _make_router()
+    for _ in range(5):
+        with pytest.raises(type(error)):
+            async with router.track("primary"):
+                raise error
+
+    assert router.choose("meal_image", InputModality.image, 1).model == "primary"
+
+
+def test_slow_model_is_retried_once_its_samples_expire(monkeypatch):
+    router = _make_router()
+    for _ in range(router.health("primary").MIN_SAMPLES):
+        router.health("primary").record_success(30.0)
+    assert router.choose("meal_image", InputModality.image, 1).model == "fallback"
+
+    now = time.monotonic()
+    monkeypatch.setattr(time, "monotonic", lambda: now + 301)
+
+    assert router.choose("meal_image", InputModality.image, 1).model == "primary"
+
+
+@pytest.mark.parametrize("probes", [1, 2])
+def test_half_open_circuit_lets_only_the_probes_through(monkeypatch, probes):
+    router = _make_router(half_open_probes=probes)
+    for _ in range(2):
+        router.health("primary").record_failure(1.0)
+    now = time.monotonic()
+    monkeypatch.setattr(time, "monotonic", lambda: now + 61)
+
+    models = [router.choose("meal_image", InputModality.image, 1).model for _ in range(probes + 2)]
+    assert models == ["primary"] * probes + ["fallback"] * 2
+
+    # A probe that never reports back frees its slot after another reset period
+    monkeypatch.setattr(time, "monotonic", lambda: now + 122)
+    assert router.choose("meal_image", InputModality.image, 1).model == "primary"
+
+    router.health("primary").record_success(1.0)
+    assert [router.choose("meal_image", InputModality.image, 1).model for _ in range(3)] == ["primary"] * 3
+
+
+def test_failed_probe_opens_the_circuit_again(monkeypatch):
+    router = _make_router()
+    for _ in range(2):
+        router.health("primary").record_failure(1.0)
+    now = time.monotonic()
+    monkeypatch.setattr(time, "monotonic", lambda: now + 61)
+    assert router.choose("meal_image", InputModality.image, 1).model == "primary"
+
+    router.health("primary").record_failure(1.0)
+
+    assert router.choose("meal_image", InputModality.image, 1).reason == "primary_circuit_open"
@@ -0,0 +1,70 @@
+import uuid
+
+import pytest
+
+from src.db.replica import ReplicaRouter
+from src.task.infrastructure.db.unit_of_work import ReadOnlyTaskUnitOfWork, TaskUnitOfWork
+
+PRIMARY, REPLICA = object(), object()
+
+
+class FakeSession:
+    async def commit(self):
+        pass
+
+    async def rollback(self):
+        pass
+
+    async def close(self):
+        pass
+
+
+def test_without_a_replica_everything_reads_from_the_primary():
+    router = ReplicaRouter(PRIMARY, None, window=5, max_lag=10)
+    router.lag = 0.0
+    router.record_write(uuid.uuid4())
+
+    assert router.session_maker() is PRIMARY
+    assert not router._writes
+
+
+def test_replica_is_used_only_while_its_lag_is_known_and_small():
+    router = ReplicaRouter(PRIMARY, REPLICA, window=5, max_lag=10)
+    assert router.route() == "replica_lag"
+
+    router.lag = 0.5
+    assert router.session_maker() is REPLICA
+
+    router.lag = 30.0
+    assert router.session_maker() is PRIMARY
+
+
+def test_users_read_their_own_writes(monkeypatch):
+    now = 1000.0
+    monkeypatch.setattr("src.db.replica.time.monotonic", lambda: now)
+    router = ReplicaRouter(PRIMARY, REPLICA, window=5, max_lag=10)
+    router.lag = 0.5
+    writer, reader = uuid.uuid4(), uuid.uuid4()
+
+    router.record_write(writer)
+
+    assert (router.route(writer), router.route(reader)) == ("recent_write", "replica")
+    now += 6
+    assert router.route(writer) == "replica"
+    router.lag = 8.0  # a lagging replica keeps the writer on the primary past the window
+    assert router.route(writer) == "recent_write"
+
+
+@pytest.mark.asyncio
+async def test_commits_open_the_window_and_read_only_units_of_work_cant_commit():
+    router = ReplicaRouter(lambda: FakeSession(), lambda: FakeSession(), window=5, max_lag=10)
+    router.lag = 0.0
+    user_id = uuid.uuid4()
+
+    async with TaskUnitOfWork(lambda: FakeSession(), user_id=user_id, router=router) as uow:
+        await uow.commit()
+
+    assert router.route(user_id) == "recent_write"
+    with pytest.raises(RuntimeError):
+        async with ReadOnlyTaskUnitOfWork(user_id, router=router) as uow:
+            await uow.commit()
@@ -0,0 +1,87 @@
+import pytest
+from pydantic import ValidationError
+
+from src.core import json_codec
+from src.integration.domain.dtos import (
+    IntegrationResultKind,
+    IntegrationTaskStatus,
+    IntegrationTaskResultDTO,
+    TaskProductDTO,
+    TaskSportDTO,
+)
+from src.integration.domain.schemas import OutputText, meal_output_adapter, openai_output_adapter
+from src.task.domain.entities import TaskRun
+from src.task.domain.mappers import IntegrationResponseToDomainMapper
+from src.task.application.use_cases.run_task import RunTaskUseCase
+
+DISH = TaskProductDTO(name="Борщ", weight=300, calories=180, ingredients=[{"name": "Свёкла", "weight": 80}])
+SPORT = TaskSportDTO(name="Бег", calories=320, length=1800)
+
+
+def _result(kind: IntegrationResultKind | None, result: list) -> IntegrationTaskResultDTO:
+    return IntegrationTaskResultDTO(status=IntegrationTaskStatus.finished, kind=kind, result=result)
+
+
+def test_items_are_mapped_only_as_the_declared_kind():
+    mapper = IntegrationResponseToDomainMapper()
+
+    meal = mapper.map_one(_result(IntegrationResultKind.products, [DISH]))
+    sport = mapper.map_one(_result(IntegrationResultKind.sports, [SPORT]))
+
+    assert [p.name for p in meal.products] == ["Борщ"] and meal.sports == []
+    assert meal.products[0].ingredients[0].weight == 80
+    assert sport.products == [] and sport.sports[0].length == 1800
+
+
+def test_invalid_or_undeclared_items_are_rejected():
+    mapper = IntegrationResponseToDomainMapper()
+
+    with pytest.raises(ValidationError):
+        mapper.map_one(_result(IntegrationResultKind.products, [SPORT]))
+    with pytest.raises(ValueError, match="Unknown result"):
+        mapper.map_one(_result(None, [DISH]))
+    assert mapper.map_one(_result(None, [])).products == []
+
+
+class MalformedRunner:
+    async def start(self, _data):
+        answer = meal_output_adapter.validate_json('{"dishes": [{"name": "Борщ", "weight": "a lot"}]}')
+        return _result(IntegrationResultKind.products, answer.dishes)
+
+
+@pytest.mark.asyncio
+async def test_malformed_model_answer_fails_the_task():
+    use_case = RunTaskUseCase(None, MalformedRunner(), None, None)
+
+    assert await use_case._run(TaskRun(language="russian")) == (None, "Internal exception")
+
+
+def test_openai_body_is_parsed_with_only_the_read_fields():
+    body = json_codec.dumps({
+        "id": "resp_1",
+        "object": "response",
+        "reasoning": {"effort": None},
+        "tools": [],
+        "output": [{
+            "id": "msg_1",
+            "type": "message",
+            "role": "assistant",
+            "content": [{"type": "output_text", "text": '{"dishes": []}', "annotations": []}],
+        }],
+        "usage": {"input_tokens": 10, "output_tokens": 5},
+    })
+
+    response = openai_output_adapter.validate_json(body)
+
+    assert isinstance(response.output[0].content[0], OutputText)
+    assert response.output[0].content[0].text == '{"dishes": []}'
+
+
+def test_output_text_is_parsed_straight_into_result_items():
+    text = json_codec.dumps_str({"dishes": [DISH.model_dump(), {**DISH.model_dump(), "commentary": "ok"}]})
+
+    answer = meal_output_adapter.validate_json(text)
+
+    mapped = IntegrationResponseToDomainMapper().map_one(_result(IntegrationResultKind.products, answer.dishes))
+    assert answer.dishes == [DISH, DISH]
+    assert mapped.products[0] is answer.dishes[0]
@@ -0,0 +1,76 @@
+import numpy as np
+import pytest
+
+from src.integration.infrastructure.embeddings import HashingEmbedder
+from src.integration.infrastructure.semantic_cache import SemanticCache, VectorIndex
+
+OATMEAL = [{"name": "Овсянка с бананом", "calories": 320}]
+BORSCHT = [{"name": "Борщ", "calories": 250}]
+
+
+def _make_cache(directory, capacity: int = 10) -> SemanticCache:
+    return SemanticCache(HashingEmbedder(256), directory, capacity=capacity, threshold=0.8)
+
+
+@pytest.mark.asyncio
+async def test_paraphrase_hits_and_other_meal_misses(tmp_path):
+    cache = _make_cache(tmp_path)
+    [vector] = await cache.embed(["овсянка с бананом"])
+    cache.add(vector, "russian", "овсянка с бананом", OATMEAL)
+
+    texts = ["Овсянка с бананами", "тарелка борща"]
+    queries = await cache.embed(texts)
+
+    assert cache.search(queries, "russian", texts) == [OATMEAL, None]
+    assert cache.search(queries[:1], "english", texts[:1]) == [None]
+
+
+@pytest.mark.asyncio
+async def test_least_recently_used_entry_is_evicted_at_capacity(tmp_path):
+    cache = _make_cache(tmp_path, capacity=2)
+    texts = ["овсянка с бананом", "борщ со сметаной", "гречка с курицей"]
+    vectors = await cache.embed(texts)
+    cache.add(vectors[0], "russian", texts[0], OATMEAL)
+    cache.add(vectors[1], "russian", texts[1], BORSCHT)
+    cache.search(vectors[:1], "russian", texts[:1])  # oatmeal is now the most recently used
+
+    cache.add(vectors[2], "russian", texts[2], [])
+
+    assert cache.search(vectors[:2], "russian", texts[:2]) == [OATMEAL, None]
+
+
+@pytest.mark.asyncio
+async def test_entries_survive_reopening(tmp_path):
+    cache = _make_cache(tmp_path)
+    [vector] = await cache.embed(["борщ со сметаной"])
+    cache.add(vector, "russian", "борщ со сметаной", BORSCHT)
+    cache.close()
+
+    reopened = _make_cache(tmp_path)
+
+    assert reopened.search(vector[None, :], "russian", ["борщ со сметаной"]) == [BORSCHT]
+
+
+@pytest.mark.asyncio
+async def test_other_amounts_miss(tmp_path):
+    cache = _make_cache(tmp_path)
+    [vector] = await cache.embed(["2 яйца и 200 г гречки"])
+    cache.add(vector, "russian", "2 яйца и 200 г гречки", BORSCHT)
+    texts = ["2 яйца и 200г гречки", "3 яйца и 200 г гречки", "2 яйца и 300 г гречки", "2 яйца и 200 мл гречки"]
+
+    results = cache.search(await cache.embed(texts), "russian", texts)
+
+    assert results == [BORSCHT, None, None, None]
+
+
+def test_second_process_opens_the_index_read_only(tmp_path):
+    writer = VectorIndex(tmp_path / "index", capacity=4, dimensions=2)
+    writer.add(np.array([1.0, 0.0], dtype=np.float32), {"text": "борщ", "result": BORSCHT})
+
+    reader = VectorIndex(tmp_path / "index", capacity=4, dimensions=2)
+
+    assert (writer.writable, reader.writable) == (True, False)
+    assert reader.add(np.array([0.0, 1.0], dtype=np.float32), {"text": "суп", "result": []}) is None
+    assert len(reader) == 1
+    reader.close()
+    writer.close()
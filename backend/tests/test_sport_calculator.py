@@ -0,0 +1,68 @@
+import pytest
+
+from src.integration.domain.dtos import IntegrationUserProfileDTO
+from src.integration.infrastructure.sport_calculator import (
+    ACTIVITIES_SOURCE_PATH,
+    ActivityTable,
+    LocalSportRecognizer,
+    parse_sport_input,
+)
+
+
+@pytest.fixture(scope="module")
+def recognizer() -> LocalSportRecognizer:
+    return LocalSportRecognizer(ActivityTable.load(ACTIVITIES_SOURCE_PATH), min_score=0.75, min_margin=0.1)
+
+
+@pytest.mark.parametrize(
+    ("text", "activity", "minutes"),
+    [
+        ("running 30 minutes", "running", 30),
+        ("1h30min cycling", "cycling", 90),
+        ("полчаса йоги", "йоги", 30),
+        ("силовая тренировка 1,5 часа", "силовая тренировка", 90),
+    ],
+)
+def test_parse_sport_input(text, activity, minutes):
+    assert parse_sport_input(text) == (activity, minutes)
+
+
+@pytest.mark.parametrize(
+    "text",
+    [
+        "football",
+        "бег 30 минут и йога 20 минут",
+        "ran 5 km",
+        "running 30 minutes at 15 km/h",
+        "bench press 45 min",
+        "easy cycling 30 min",
+        "cycling fast 30 min",
+        "бег трусцой 30 минут",
+    ],
+)
+def test_inputs_the_met_table_can_not_answer_are_left_to_the_model(recognizer, text):
+    assert recognizer.recognize(text, "english", None) is None
+
+
+def test_plain_activity_with_a_duration_is_answered_locally(recognizer):
+    [sport] = recognizer.recognize("1h30min cycling", "english", None)
+
+    assert (sport["name"], sport["length"]) == ("Cycling", 5400)
+
+
+def test_recognize_uses_standard_weight_without_profile(recognizer):
+    [sport] = recognizer.recognize("running 30 minutes", "english", None)
+
+    # 8.3 MET * 3.5 * 72 kg / 200 * 30 min
+    assert sport == {"name": "Running", "length": 1800, "calories": 313.7}
+
+
+def test_recognize_uses_profile_resting_rate(recognizer):
+    young = IntegrationUserProfileDTO(gender="f", age=25, height=165)
+    older = young.model_copy(update={"age": 60})
+
+    [young_sport] = recognizer.recognize("бегала 30 минут", "russian", young)
+    [older_sport] = recognizer.recognize("бегала 30 минут", "russian", older)
+
+    assert young_sport["name"] == "Бег"
+    assert young_sport["calories"] > older_sport["calories"]
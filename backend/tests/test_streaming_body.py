@@ -0,0 +1,45 @@
+import base64
+from io import BytesIO
+
+import pytest
+
+from src.core import json_codec
+from src.core.http.streaming_body import StreamingJsonBody
+
+PHOTO = bytes(range(256)) * 4001  # not a multiple of the chunk size nor of 3
+
+
+def _payload(markers: list[str]) -> dict:
+    return {
+        "model": "gpt-4.1-mini",
+        "input": [{"content": [{"type": "input_text", "text": "Что на фото?"}] + [
+            {"type": "input_image", "image_url": f"data:image/jpeg;base64,{marker}"} for marker in markers
+        ]}],
+    }
+
+
+async def _collect(body: StreamingJsonBody) -> list[bytes]:
+    return [chunk async for chunk in body.chunks()]
+
+
+@pytest.mark.asyncio
+async def test_streamed_body_equals_eagerly_built_one(tmp_path):
+    on_disk = tmp_path / "photo.jpg"
+    on_disk.write_bytes(PHOTO[::-1])
+    markers = [StreamingJsonBody.new_marker(), StreamingJsonBody.new_marker()]
+
+    with open(on_disk, "rb") as disk_file:
+        body = StreamingJsonBody(_payload(markers), {markers[1]: disk_file, markers[0]: BytesIO(PHOTO)})
+        chunks = await _collect(body)
+        length = len(body)
+
+    encoded = [base64.b64encode(PHOTO).decode(), base64.b64encode(PHOTO[::-1]).decode()]
+    expected = json_codec.dumps(_payload(encoded))
+    assert b"".join(chunks) == expected
+    assert length == len(expected)
+    assert max(map(len, chunks)) <= max(StreamingJsonBody.CHUNK_SIZE // 3 * 4, len(chunks[0]))
+
+
+def test_missing_marker_is_rejected():
+    with pytest.raises(ValueError, match="not in the payload"):
+        StreamingJsonBody(_payload([]), {StreamingJsonBody.new_marker(): BytesIO(PHOTO)})
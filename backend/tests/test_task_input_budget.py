@@ -0,0 +1,76 @@
+import asyncio
+from io import BytesIO
+
+import pytest
+from starlette.datastructures import UploadFile
+
+from src.task.domain.entities import TaskInput, TaskRun
+from src.task.domain.exceptions import TaskInputBudgetExceededException
+from src.task.application.use_cases.run_task import RunTaskUseCase
+from src.task.application.use_cases.admit_task_input import AdmitTaskInputUseCase
+from src.task.application.use_cases.create_task import CreateTaskUseCase
+from src.task.application.use_cases.build_task_params import BuildTaskParamsUseCase
+from src.task.infrastructure.memory.task_input_budget import TaskInputBudget
+
+
+@pytest.mark.asyncio
+async def test_inputs_over_memory_budget_spill():
+    budget = TaskInputBudget(memory_limit=100, inflight_limit=1000, wait_seconds=0.1)
+
+    assert [await budget.acquire(60), await budget.acquire(60), await budget.acquire(40)] == [True, False, True]
+    assert (budget.resident, budget.inflight) == (100, 160)
+
+    await budget.release(60, resident=True)
+    await budget.release(60, resident=False)
+    assert (budget.resident, budget.inflight) == (40, 40)
+
+
+@pytest.mark.asyncio
+async def test_uploads_wait_for_room_then_give_up():
+    budget = TaskInputBudget(memory_limit=100, inflight_limit=100, wait_seconds=0.2)
+    await budget.acquire(80)
+
+    waiting = asyncio.create_task(budget.acquire(50))
+    await asyncio.sleep(0.05)
+    assert not waiting.done()
+    await budget.release(80, resident=True)
+    assert await waiting is True
+
+    with pytest.raises(TaskInputBudgetExceededException):
+        await budget.acquire(60)
+    assert await TaskInputBudget(10, 10, 0.1).acquire(500) is False  # alone, even an oversized input runs
+
+
+def test_spilled_input_is_read_from_its_stored_copy(tmp_path, monkeypatch):
+    monkeypatch.setattr("src.task.application.use_cases.build_task_params.settings.STORAGE_PATH", str(tmp_path))
+    file = BytesIO(b"photo")
+    file.name = "stored.jpg"
+    (tmp_path / "stored.jpg").write_bytes(b"photo")
+
+    params = BuildTaskParamsUseCase._build_input(TaskInput(file=file, size=5, resident=False))
+    command = TaskRun(language="russian", **params)
+
+    assert command.file is None and command.input_size == 5
+    with RunTaskUseCase._open_input(command) as opened:
+        assert opened.file.read() == b"photo"
+    assert opened.file.closed
+
+
+@pytest.mark.asyncio
+async def test_upload_over_memory_budget_is_streamed_to_storage(tmp_path, monkeypatch):
+    monkeypatch.setattr("src.task.application.use_cases.admit_task_input.settings.STORAGE_PATH", str(tmp_path))
+    budget = TaskInputBudget(memory_limit=100, inflight_limit=1000, wait_seconds=0.1)
+    upload = UploadFile(BytesIO(b"x" * 500), size=500, filename="photo.jpg")
+
+    async def read_whole_file(*_):
+        raise AssertionError("the upload is not read into memory")
+
+    monkeypatch.setattr(upload, "read", read_whole_file)
+
+    task_input = await AdmitTaskInputUseCase(budget).execute(upload)
+
+    assert not task_input.resident and budget.resident == 0
+    [stored] = tmp_path.iterdir()
+    assert stored.suffix == ".jpg" and stored.read_bytes() == task_input.file.read() == b"x" * 500
+    assert CreateTaskUseCase(None)._save_file(task_input.file) == stored.name
+    task_input.file.close()
@@ -0,0 +1,233 @@
+import uuid
+import datetime as dt
+
+import pytest
+import pytest_asyncio
+from fastapi import HTTPException
+from sqlalchemy import event, update
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from src.db.exceptions import DBModelNotFoundException
+from src.task.domain.entities import (
+    TaskCreate,
+    TaskCursor,
+    TaskKind,
+    TaskProduct,
+    TaskProductIngredient,
+    TaskSport,
+    TaskStatus,
+    TaskUpdate,
+)
+from src.task.application.use_cases.list_tasks import ListTasksUseCase
+from src.task.infrastructure.db.orm import TaskDB
+from src.task.infrastructure.db.task_repository import PGTaskRepository
+from src.user.infrastructure.models import UserDB
+
+
+@pytest_asyncio.fixture
+async def session(db_connection):
+    async with AsyncSession(bind=db_connection, expire_on_commit=False) as session:
+        yield session
+
+
+@pytest_asyncio.fixture
+async def user_id(session) -> uuid.UUID:
+    user = UserDB(apphud_id=str(uuid.uuid4()))
+    session.add(user)
+    await session.flush()
+    return user.id
+
+
+def make_products(count: int, ingredients: int) -> list[TaskProduct]:
+    return [
+        TaskProduct(
+            name=f"Product {i}",
+            weight=100 + i,
+            calories=200,
+            commentary="ok",
+            ingredients=[TaskProductIngredient(name=f"Ingredient {i}.{j}", weight=10 + j) for j in range(ingredients)],
+        )
+        for i in range(count)
+    ]
+
+
+STORAGES = ["normalized", "dual", "document"]
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("storage", STORAGES)
+async def test_stored_result_matches_a_fresh_read(session, user_id, storage):
+    repository = PGTaskRepository(session, storage)
+    task = await repository.create(TaskCreate(user_id=user_id, app_bundle="test"))
+    products = make_products(3, 4)
+
+    stored = await repository.update_by_pk(task.id, TaskUpdate(status=TaskStatus.finished, products=products))
+    session.expunge_all()
+    read = await repository.get_by_pk(task.id)
+
+    assert stored.status == TaskStatus.finished and stored.products == products and stored.sports == []
+    assert read.products == stored.products
+    assert read.model_copy(update={"products": stored.products}) == stored
+
+    sports = [TaskSport(name="Run", calories=300, length=30)]
+    updated = await repository.update_by_pk(task.id, TaskUpdate(status=TaskStatus.finished, sports=sports))
+    assert updated.sports == sports and updated.products == products
+
+    with pytest.raises(DBModelNotFoundException):
+        await repository.update_by_pk(uuid.uuid4(), TaskUpdate(status=TaskStatus.failed))
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("storage", STORAGES)
+async def test_round_trips_do_not_grow_with_the_result(session, user_id, storage):
+    repository = PGTaskRepository(session, storage)
+    statements = []
+    event.listen(session.bind.sync_connection, "before_cursor_execute", lambda *args: statements.append(args[2]))
+
+    round_trips = []
+    for products, ingredients in ((1, 1), (20, 15)):
+        task = await repository.create(TaskCreate(user_id=user_id, app_bundle="test"))
+        statements.clear()
+        data = TaskUpdate(status=TaskStatus.finished, products=make_products(products, ingredients), sports=[])
+        await repository.update_by_pk(task.id, data)
+        round_trips.append(len(statements))
+
+    assert round_trips[0] == round_trips[1] <= 5
+
+
+@pytest.mark.asyncio
+async def test_document_reads_fall_back_to_tables_until_backfilled(session, user_id):
+    normalized, document = PGTaskRepository(session, "normalized"), PGTaskRepository(session, "document")
+    task = await normalized.create(TaskCreate(user_id=user_id, app_bundle="test"))
+    products = make_products(2, 2)
+    await normalized.update_by_pk(task.id, TaskUpdate(status=TaskStatus.finished, products=products))
+    session.expunge_all()
+
+    assert (await document.get_by_pk(task.id)).products == products
+
+    sports = [TaskSport(name="Swim", calories=200, length=20)]
+    await document.update_by_pk(task.id, TaskUpdate(status=TaskStatus.finished, products=products[:1], sports=sports))
+    session.expunge_all()
+    read = await document.get_by_pk(task.id)
+    assert read.products == products[:1] and read.sports == sports
+    assert (await normalized.get_by_pk(task.id)).sports == []  # the tables are no longer written
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("storage", STORAGES)
+async def test_task_is_read_in_one_statement(session, user_id, storage):
+    repository = PGTaskRepository(session, storage)
+    task = await repository.create(TaskCreate(user_id=user_id, app_bundle="test"))
+    sports = [TaskSport(name="Run", calories=300, length=30), TaskSport(name="Walk", calories=100, length=60)]
+    await repository.update_by_pk(task.id, TaskUpdate(status=TaskStatus.finished, products=make_products(4, 3)))
+    await repository.update_by_pk(task.id, TaskUpdate(status=TaskStatus.finished, sports=sports))
+    statements = []
+    event.listen(session.bind.sync_connection, "before_cursor_execute", lambda *args: statements.append(args[2]))
+
+    read = await repository.get_by_pk(task.id)
+
+    assert len(statements) == 1
+    assert read.products == make_products(4, 3) and read.sports == sports
+    with pytest.raises(DBModelNotFoundException):
+        await repository.get_by_pk(uuid.uuid4())
+
+
+@pytest.mark.asyncio
+async def test_history_pages_by_cursor(session, user_id):
+    repository = PGTaskRepository(session)
+    created = []
+    for i in range(25):
+        kind = TaskKind.sport if i % 5 == 0 else TaskKind.meal
+        created.append(await repository.create(TaskCreate(user_id=user_id, app_bundle="test", kind=kind)))
+    # Ties on created_at are ordered by id
+    same_time = update(TaskDB).where(TaskDB.id.in_([t.id for t in created[:10]]))
+    await session.execute(same_time.values(created_at=created[0].created_at))
+    await repository.update_by_pk(created[-1].id, TaskUpdate(status=TaskStatus.finished, products=make_products(2, 2)))
+    statements = []
+    event.listen(session.bind.sync_connection, "before_cursor_execute", lambda *args: statements.append(args[2]))
+
+    pages, before = [], None
+    while page := await repository.get_by_user_id(user_id, before, limit=10):
+        pages.append(page)
+        before = TaskCursor(created_at=page[-1].created_at, id=page[-1].id)
+
+    listed = [task for page in pages for task in page]
+    assert [len(page) for page in pages] == [10, 10, 5] and len(statements) == 4
+    assert {task.id for task in listed} == {task.id for task in created}
+    assert [(t.created_at, t.id) for t in listed] == sorted(((t.created_at, t.id) for t in listed), reverse=True)
+    assert listed[0].products == make_products(2, 2)
+
+    sports = await repository.get_by_user_id(user_id, kind=TaskKind.sport)
+    assert [task.id for task in sports] == [task.id for task in listed if task.kind == TaskKind.sport]
+    assert len(sports) == 5
+
+
+def test_history_cursor_is_opaque_and_validated():
+    cursor = TaskCursor(created_at="2026-10-19T12:00:00.123456", id=uuid.uuid4())
+    encoded = ListTasksUseCase._encode_cursor(cursor)
+
+    assert "=" not in encoded and ListTasksUseCase._decode_cursor(encoded) == cursor
+    for invalid in ("not a cursor", "e30", encoded[:-3]):
+        with pytest.raises(HTTPException) as error:
+            ListTasksUseCase._decode_cursor(invalid)
+        assert error.value.status_code == 400
+
+
+@pytest.mark.asyncio
+async def test_edit_chain_is_read_from_any_of_its_tasks(session, user_id):
+    repository = PGTaskRepository(session)
+    root = await repository.create(TaskCreate(user_id=user_id, app_bundle="test"))
+    edit = await repository.create(TaskCreate(user_id=user_id, app_bundle="test", parent_id=root.id))
+    edit_of_edit = await repository.create(TaskCreate(user_id=user_id, app_bundle="test", parent_id=edit.id))
+    await repository.create(TaskCreate(user_id=user_id, app_bundle="test"))
+
+    for task in (root, edit, edit_of_edit):
+        chain = await repository.get_edit_chain(task.id)
+        assert [t.id for t in chain] == [root.id, edit.id, edit_of_edit.id]
+
+
+def _flip(image_hash: int, bits: int) -> int:
+    """Hash with its lowest `bits` bits (64 is the sign bit too) flipped, as a signed BIGINT"""
+    value = (image_hash ^ ((1 << bits) - 1)) & ((1 << 64) - 1)
+    return value - (1 << 64) if value >= 1 << 63 else value
+
+
+@pytest.mark.asyncio
+async def test_image_duplicate_is_the_closest_recent_finished_photo(session, user_id):
+    repository = PGTaskRepository(session)
+    image_hash = -0x5A5A5A5A5A5A5A5B
+    current = await repository.create(TaskCreate(user_id=user_id, app_bundle="test", image_hash=image_hash))
+    other_user = UserDB(apphud_id=str(uuid.uuid4()))
+    session.add(other_user)
+    await session.flush()
+    other_task = await repository.create(TaskCreate(user_id=other_user.id, app_bundle="test", image_hash=image_hash))
+    await session.execute(update(TaskDB).where(TaskDB.id == other_task.id).values(status=TaskStatus.finished.value))
+    candidates = {}
+    for name, hours_ago, status, bits in [
+        ("near", 1, TaskStatus.finished, 3),
+        ("failed", 2, TaskStatus.failed, 0),
+        ("far", 3, TaskStatus.finished, 20),
+        ("sign_bit", 4, TaskStatus.finished, 64),
+        ("closest", 5, TaskStatus.finished, 1),
+    ]:
+        similar = _flip(image_hash, bits)
+        task = await repository.create(TaskCreate(user_id=user_id, app_bundle="test", image_hash=similar))
+        await session.execute(
+            update(TaskDB)
+            .where(TaskDB.id == task.id)
+            .values(status=status.value, created_at=TaskDB.created_at - dt.timedelta(hours=hours_ago))
+        )
+        candidates[name] = task.id
+
+    async def duplicate(max_distance: int, lookback: int, window_hours: float = 24) -> uuid.UUID | None:
+        task = await repository.get_image_duplicate(current.id, image_hash, max_distance, lookback, window_hours * 3600)
+        return task.id if task else None
+
+    assert await duplicate(max_distance=6, lookback=10) == candidates["closest"]
+    assert await duplicate(max_distance=6, lookback=3) == candidates["near"]
+    assert await duplicate(max_distance=0, lookback=10) is None
+    # The failed task is not counted against the lookback
+    assert await duplicate(max_distance=64, lookback=4) == candidates["closest"]
+    assert await duplicate(max_distance=64, lookback=3) == candidates["near"]
+    assert await duplicate(max_distance=6, lookback=10, window_hours=4.5) == candidates["near"]
+    assert await duplicate(max_distance=6, lookback=10, window_hours=0.5) is None
@@ -0,0 +1,73 @@
+import uuid
+
+import pytest
+from sqlalchemy import event
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from src.task.domain.dtos import TaskCreateWithTextDTO
+from src.task.domain.entities import TaskCreate
+from src.task.application.use_cases.create_task import CreateTaskUseCase
+from src.task.application.use_cases.build_task_params import BuildTaskParamsUseCase
+from src.task.infrastructure.db.unit_of_work import TaskUnitOfWork
+from src.task.infrastructure.db.task_repository import PGTaskRepository
+from src.user.infrastructure.models import UserDB
+
+
+class FakeSession:
+    def __init__(self) -> None:
+        self.calls = []
+
+    async def commit(self):
+        self.calls.append("commit")
+
+    async def rollback(self):
+        self.calls.append("rollback")
+
+    async def close(self):
+        self.calls.append("close")
+
+
+class NoCache:
+    async def get(self, _task_id):
+        return None
+
+    async def set(self, _task):
+        pass
+
+
+@pytest.mark.asyncio
+async def test_nested_blocks_join_the_open_one():
+    sessions = []
+    uow = TaskUnitOfWork(lambda: sessions.append(FakeSession()) or sessions[-1])
+
+    async with uow:
+        async with uow:
+            await uow.commit()
+        async with uow:
+            pass
+        assert sessions[0].calls == []
+        await uow.commit()
+
+    assert len(sessions) == 1 and sessions[0].calls == ["commit", "rollback", "close"]
+
+
+@pytest.mark.asyncio
+async def test_edit_reads_its_parent_and_is_inserted_in_one_transaction(db_connection):
+    session = AsyncSession(bind=db_connection, expire_on_commit=False, join_transaction_mode="create_savepoint")
+    user = UserDB(apphud_id=str(uuid.uuid4()), gender="f")
+    session.add(user)
+    await session.flush()
+    parent = await PGTaskRepository(session).create(TaskCreate(user_id=user.id, app_bundle="test"))
+    statements = []
+    event.listen(db_connection.sync_connection, "before_cursor_execute", lambda *args: statements.append(args[2]))
+    uow = TaskUnitOfWork(lambda: session)
+    data = TaskCreateWithTextDTO(app_bundle="test", text="без сахара", language="russian")
+
+    async with uow:
+        await BuildTaskParamsUseCase(uow, NoCache()).execute(data, parent.id)
+        task = await CreateTaskUseCase(uow).execute(user.id, data, None, parent_id=parent.id)
+        await uow.commit()
+
+    queries = [s.split()[0] for s in statements if not s.startswith(("SAVEPOINT", "RELEASE", "ROLLBACK"))]
+    assert queries == ["SELECT", "INSERT"]
+    assert (await PGTaskRepository(session).get_by_pk(task.id)).parent_id == parent.id
@@ -0,0 +1,50 @@
+import uuid
+import datetime as dt
+
+import pytest
+from sqlalchemy import event, insert
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from src.task.infrastructure.db.orm import TaskDB
+from src.user.domain.entities import DailyTotals
+from src.user.infrastructure.models import UserDB
+from src.user.infrastructure.repository import UserRepository
+
+
+@pytest.mark.asyncio
+async def test_user_read_does_not_touch_the_task_history(db_connection):
+    async with AsyncSession(bind=db_connection, expire_on_commit=False) as session:
+        user = UserDB(apphud_id=str(uuid.uuid4()), gender="f")
+        session.add(user)
+        await session.flush()
+        await session.execute(insert(TaskDB), [{"user_id": user.id, "app_bundle": "test", "status": "finished"}] * 50)
+        session.expunge_all()
+        statements = []
+        event.listen(db_connection.sync_connection, "before_cursor_execute", lambda *args: statements.append(args[2]))
+
+        read = await UserRepository(session).get_by_pk(user.id)
+
+        assert read.id == user.id
+        assert len(statements) == 1 and "tasks" not in statements[0]
+
+
+@pytest.mark.asyncio
+async def test_daily_totals_add_up_per_day(db_connection):
+    async with AsyncSession(bind=db_connection, expire_on_commit=False) as session:
+        user = UserDB(apphud_id=str(uuid.uuid4()), gender="m")
+        session.add(user)
+        await session.flush()
+        repository = UserRepository(session)
+        day = dt.date(2026, 3, 1)
+
+        await repository.add_daily_totals(user.id, DailyTotals(day=day, calories=500, proteins=20))
+        await repository.add_daily_totals(user.id, DailyTotals(day=day, calories=-120, fiber=3))
+        await repository.add_daily_totals(user.id, DailyTotals(day=day + dt.timedelta(days=1), sport_calories=300))
+        await repository.add_daily_totals(user.id, DailyTotals(day=day + dt.timedelta(days=5), calories=1))
+
+        totals = await repository.get_daily_totals(user.id, day, day + dt.timedelta(days=1))
+
+        assert totals == [
+            DailyTotals(day=day, calories=380, proteins=20, fiber=3),
+            DailyTotals(day=day + dt.timedelta(days=1), sport_calories=300),
+        ]
@@ -29,4 +29,4 @@ echo "Running database migrations..."
 alembic upgrade head
 
 echo "Starting application..."
-exec proxychains4 gunicorn src.main:app -w 1 -k uvicorn.workers.UvicornWorker -b 0.0.0.0:80 --forwarded-allow-ips="*"
+exec gunicorn src.main:app -w 1 -k uvicorn.workers.UvicornWorker -b 0.0.0.0:80 --forwarded-allow-ips="*"